@@ -19,6 +19,7 @@ from configs.configs import SimulationConfig, ModelType, TopologyType
 from simulation.SimulationRunner import SimulationRunner
 from interactions.DialogueSimulation import DialogueSimulator
 from utils.event_handler import EventHandler, AgentSpoke
+from metrics.NetworkMetrics import network_metrics
 
 class ColoredOutput:
     """ANSI color codes for terminal output."""
@@ -256,6 +257,15 @@ class InteractiveSimulationRunner:
         topology = self.config.topology if hasattr(self.config, 'topology') else "unknown"
         print(f"\n{ColoredOutput.BOLD}Network Effect ({topology}):{ColoredOutput.RESET}")
         
+        environment = self.runner.interaction_model.environment
+        node_opinions = [data["agent"].get_opinion() for _, data in environment.graph.nodes(data=True)]
+        metrics = network_metrics(environment, node_opinions, environment.communities())
+        print(f"  Opinion Assortativity: {ColoredOutput.CYAN}{metrics['assortativity']:+.3f}{ColoredOutput.RESET}")
+        print(f"  Echo-Chamber Index: {ColoredOutput.CYAN}{metrics['echo_chamber']:+.3f}{ColoredOutput.RESET}")
+        print(f"  Cross-Camp Edges: {ColoredOutput.CYAN}{metrics['discordant_fraction']:.1%}{ColoredOutput.RESET}")
+        print(f"  Bimodality Coefficient: {ColoredOutput.CYAN}{metrics['bimodality']:.3f}{ColoredOutput.RESET}")
+        print(f"  Community Alignment: {ColoredOutput.CYAN}{metrics['community_alignment']:.3f}{ColoredOutput.RESET}")
+        
         if hasattr(self.runner.interaction_model, 'opinion_analyzer'):
             if self.runner.interaction_model.opinion_analyzer:
                 update_freq = self.runner.interaction_model.opinion_analyzer.update_frequency
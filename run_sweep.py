@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Command-line parameter sweep over simulation configurations.
+
+Every combination of the given values is run once on a process pool and
+stored in a local SQLite file. Running the same command again skips the
+points already stored, so an interrupted sweep resumes where it stopped.
+"""
+
+import argparse
+import sys
+import os
+
+# Add src to path so we can import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from configs.configs import SimulationConfig, ModelType, TopologyType, InteractionType
+from simulation.ParameterSweep import ParameterSweep, SweepStore
+
+def create_grid_from_args(args):
+    """Swept values per SimulationConfig field."""
+    return {
+        'num_agents': args.agents,
+        'topology': [TopologyType(value) for value in args.topology],
+        'small_world_k': args.small_world_k,
+        'small_world_p': args.small_world_p,
+        'temperature': args.temperature,
+        'opinion_update_frequency': args.opinion_frequency,
+    }
+
+def main():
+    """Main entry point for the sweep runner."""
+    parser = argparse.ArgumentParser(
+        description="Run a parameter sweep of embodied agents simulations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --topic "climate change" --interaction voter --agents 50 100 --topology star small-world
+  %(prog)s --topic "AI ethics" --temperature 0.3 0.7 1.0 --workers 8 --llm-concurrency 2
+        """
+    )
+
+    parser.add_argument('--topic', '-t', required=True,
+                       help='Discussion topic for the simulations')
+    parser.add_argument('--rounds', '-r', type=int, default=5,
+                       help='Number of simulation rounds (default: 5)')
+    parser.add_argument('--model', '-m', default='gpt-3.5-turbo',
+                       help='LLM model to use (default: gpt-3.5-turbo)')
+    parser.add_argument('--interaction', default='dialogue',
+                       choices=[value.value for value in InteractionType],
+                       help='Interaction model (default: dialogue)')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='Root seed of every point (default: 0)')
+
+    # Swept fields: one run per combination of the values given
+    parser.add_argument('--agents', '-a', type=int, nargs='+', default=[3],
+                       help='Numbers of agents (default: 3)')
+    parser.add_argument('--topology', nargs='+', default=['star'],
+                       choices=[value.value for value in TopologyType],
+                       help='Network topologies (default: star)')
+    parser.add_argument('--small-world-k', type=int, nargs='+', default=[4],
+                       help='Small-world neighbour counts (default: 4)')
+    parser.add_argument('--small-world-p', type=float, nargs='+', default=[0.3],
+                       help='Small-world rewiring probabilities (default: 0.3)')
+    parser.add_argument('--temperature', type=float, nargs='+', default=[0.7],
+                       help='LLM temperatures (default: 0.7)')
+    parser.add_argument('--opinion-frequency', type=int, nargs='+', default=[5],
+                       help='Opinion update intervals in rounds (default: 5)')
+
+    parser.add_argument('--replicas', type=int, default=1,
+                       help='Replicas per point (default: 1)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: CPU count)')
+    parser.add_argument('--llm-concurrency', type=int, default=1,
+                       help='Most LLM-backed points running at once (default: 1)')
+    parser.add_argument('--store', default='sweep.sqlite',
+                       help='Result store (default: sweep.sqlite)')
+
+    args = parser.parse_args()
+
+    try:
+        base = SimulationConfig(
+            num_agents=args.agents[0],
+            topic=args.topic,
+            num_rounds=args.rounds,
+            model_type=ModelType(args.model),
+            interaction_type=InteractionType(args.interaction),
+            seed=args.seed
+        )
+    except ValueError as e:
+        print(f"Error creating sweep: {e}")
+        sys.exit(1)
+
+    uses_openai = base.model_type in [ModelType.GPT3, ModelType.GPT3BIS]
+    if base.interaction_type == InteractionType.DIALOGUE and uses_openai:
+        if not os.environ.get('OPENAI_API_KEY'):
+            print("Error: OPENAI_API_KEY environment variable is required for OpenAI models")
+            sys.exit(1)
+
+    store = SweepStore(args.store)
+    try:
+        try:
+            sweep = ParameterSweep(
+                base,
+                create_grid_from_args(args),
+                store,
+                replicas=args.replicas,
+                max_workers=args.workers,
+                llm_concurrency=args.llm_concurrency
+            )
+        except ValueError as e:
+            print(f"Error creating sweep: {e}")
+            sys.exit(1)
+
+        pending = len(sweep.pending())
+        print(f"Sweep of {len(sweep.configs)} points, {pending} to run, results in {args.store}")
+        counts = sweep.run()
+        print(f"Completed {counts['completed']}, skipped {counts['skipped']}, "
+              f"failed {counts['failed']}")
+        for key, error in sweep.failures.items():
+            print(f"  {key}: {error}")
+    finally:
+        store.close()
+    sys.exit(1 if counts['failed'] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,6 @@ from personas.generate_personas import generate_persona, base_template
 
 from typing import List, Optional
 from llm.base import LLMClient
-from llm.openai_client import OpenAIClient
-from llm.ollama_client import OllamaClient
 
 
 from configs.configs import LLMConfig, ModelType
@@ -45,15 +43,20 @@ class SimpleAgent(BaseAgent):
         return values
 
     def set_model(self, model_config: LLMConfig):
+        # Client libraries are imported on first use; they are slow to load.
         if (
             model_config.model_type == ModelType.GPT3
             or model_config.model_type == ModelType.GPT3BIS
         ):
+            from llm.openai_client import OpenAIClient
+
             self.model = OpenAIClient(
                 model=model_config.model_type,
                 temperature=model_config.temperature,
             )
         else:
+            from llm.ollama_client import OllamaClient
+
             self.model = OllamaClient(
                 model=model_config.model_type, temperature=model_config.temperature
             )
@@ -70,6 +73,13 @@ class SimpleAgent(BaseAgent):
     def receive(self, name: str, message: str) -> None:
         self.message_history.append(f"{name}: {message}")
 
+    @staticmethod
+    def broadcast(receivers: List["SimpleAgent"], name: str, message: str) -> None:
+        """Deliver one message to many agents, formatting it only once."""
+        line = f"{name}: {message}"
+        for receiver in receivers:
+            receiver.message_history.append(line)
+
     def create_agent_description(self) -> None:
         if self.persona is None:
             self.persona = generate_persona(base_template)
@@ -1,6 +1,6 @@
 from enum import Enum
 from pydantic import BaseModel, field_validator, ConfigDict
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class ModelType(str, Enum):
@@ -17,6 +17,14 @@ class TopologyType(str, Enum):
     SCALE_FREE = "scale-free"
 
 
+class InteractionType(str, Enum):
+    DIALOGUE = "dialogue"
+    VOTER = "voter"
+    MAJORITY = "majority"
+    DEFFUANT = "deffuant"
+    HEGSELMANN_KRAUSE = "hegselmann-krause"
+
+
 class SimulationConfig(BaseModel):
     num_agents: int
     topic: str
@@ -28,6 +36,10 @@ class SimulationConfig(BaseModel):
     small_world_k: int = 4
     small_world_p: float = 0.3
     opinion_update_frequency: int = 5
+    opinion_batch_size: Optional[int] = None
+    opinion_incremental: bool = False
+    interaction_type: InteractionType = InteractionType.DIALOGUE
+    seed: Optional[int] = None
 
 
 class LLMConfig(BaseModel):
@@ -45,6 +57,7 @@ class GraphEnvironmentConfig(BaseModel):
     small_world_k: int = 2
     small_world_p: float = 0.3
     scale_free_m: int = 1
+    seed: Optional[int] = None
 
     @field_validator("topology")
     @classmethod
@@ -0,0 +1,191 @@
+import networkx as nx
+import numpy as np
+
+
+class CSRGraph:
+    """Read-only compressed sparse row adjacency of an undirected graph.
+
+    Nodes are the integers ``0..num_nodes-1``. Every undirected edge is stored
+    in both directions, so ``indices[indptr[i]:indptr[i + 1]]`` lists all the
+    neighbors of node ``i``.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int64)
+        self.num_nodes = len(self.indptr) - 1
+        self.degree = np.diff(self.indptr)
+        self.has_isolated_nodes = bool(self.num_nodes and self.degree.min() == 0)
+        self._matrix = None
+        self._edge_sources = None
+
+    @classmethod
+    def from_edges(
+        cls, num_nodes: int, sources: np.ndarray, targets: np.ndarray
+    ) -> "CSRGraph":
+        """
+        Build the adjacency from an undirected edge list.
+
+        Self-loops and duplicate edges are dropped.
+
+        Args:
+            num_nodes: Number of nodes in the graph
+            sources: First endpoint of every edge
+            targets: Second endpoint of every edge
+
+        Returns:
+            CSRGraph over ``num_nodes`` nodes
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keep = sources != targets
+        rows = np.concatenate([sources[keep], targets[keep]])
+        cols = np.concatenate([targets[keep], sources[keep]])
+
+        keys = np.sort(rows * num_nodes + cols)
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        rows, cols = np.divmod(keys, num_nodes)
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+        return cls(indptr, cols)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "CSRGraph":
+        """
+        Build the adjacency of a networkx graph.
+
+        Nodes are numbered in ``graph.nodes()`` order, which for the generators
+        used by ``GraphEnvironment`` is the identity mapping.
+
+        Args:
+            graph: Undirected networkx graph
+
+        Returns:
+            CSRGraph over ``graph.number_of_nodes()`` nodes
+        """
+        nodes = list(graph.nodes())
+        if nodes == list(range(len(nodes))):
+            edges = graph.edges()
+        else:
+            position = {node: i for i, node in enumerate(nodes)}
+            edges = ((position[u], position[v]) for u, v in graph.edges())
+        flat = np.fromiter(
+            (node for edge in edges for node in edge),
+            dtype=np.int64,
+            count=2 * graph.number_of_edges(),
+        )
+        return cls.from_edges(len(nodes), flat[0::2], flat[1::2])
+
+    @property
+    def num_edges(self) -> int:
+        """Number of undirected edges."""
+        return len(self.indices) // 2
+
+    @property
+    def matrix(self):
+        """The adjacency as a ``scipy.sparse.csr_array``, built on first use."""
+        if self._matrix is None:
+            from scipy.sparse import csr_array
+
+            self._matrix = csr_array(
+                (np.ones(len(self.indices), dtype=np.int8), self.indices, self.indptr),
+                shape=(self.num_nodes, self.num_nodes),
+            )
+        return self._matrix
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def edge_sources(self) -> np.ndarray:
+        """Source node of every stored (directed) edge, aligned with ``indices``."""
+        if self._edge_sources is None:
+            self._edge_sources = np.repeat(
+                np.arange(self.num_nodes, dtype=np.int64), self.degree
+            )
+        return self._edge_sources
+
+    def reverse_edges(self) -> np.ndarray:
+        """Position of the edge (j, i) for every stored edge (i, j)."""
+        keys = self.edge_sources() * self.num_nodes + self.indices
+        order = np.argsort(keys, kind="stable")
+        reverse_keys = self.indices * self.num_nodes + self.edge_sources()
+        return order[np.searchsorted(keys[order], reverse_keys)]
+
+    def neighbor_positions(self, nodes: np.ndarray):
+        """
+        Edge positions of the neighbors of every entry of ``nodes``.
+
+        Args:
+            nodes: Node indices; repeats are allowed
+
+        Returns:
+            ``(owners, positions)``: ``indices[positions[k]]`` is a neighbor of
+            ``nodes[owners[k]]``, grouped by owner in ``nodes`` order
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        degree = self.degree[nodes]
+        owners = np.repeat(np.arange(len(nodes), dtype=np.int64), degree)
+        shift = self.indptr[nodes] - (np.cumsum(degree) - degree)
+        positions = np.arange(len(owners), dtype=np.int64) + shift[owners]
+        return owners, positions
+
+    def neighbor_sum(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum ``values`` over the neighbors of every node.
+
+        Args:
+            values: Array of shape (num_nodes,) or (num_nodes, k)
+
+        Returns:
+            ``A @ values`` for the adjacency matrix ``A``
+        """
+        return self.matrix @ values
+
+    def sample_neighbors(
+        self, nodes: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Draw one uniformly random neighbor for each entry of ``nodes``.
+
+        Isolated nodes are returned as their own neighbor, so copying from the
+        sample leaves them unchanged.
+
+        Args:
+            nodes: Node indices to sample for
+            rng: Random generator to draw from
+
+        Returns:
+            Array of neighbor indices, aligned with ``nodes``
+        """
+        start = self.indptr[nodes]
+        degree = self.indptr[nodes + 1] - start
+        offsets = (rng.random(len(nodes)) * degree).astype(np.int64)
+        if not self.has_isolated_nodes:
+            return self.indices[start + offsets]
+        if len(self.indices) == 0:
+            return np.array(nodes, dtype=np.int64)
+        isolated = self.degree[nodes] == 0
+        positions = np.where(isolated, 0, start + offsets)
+        return np.where(isolated, nodes, self.indices[positions])
+
+
+def as_csr_graph(graph) -> CSRGraph:
+    """
+    Coerce a topology into a CSRGraph.
+
+    Args:
+        graph: A CSRGraph, a networkx graph, or anything with a ``to_csr()``
+            method such as ``GraphEnvironment``
+
+    Returns:
+        The CSRGraph view of ``graph``
+    """
+    if isinstance(graph, CSRGraph):
+        return graph
+    if hasattr(graph, "to_csr"):
+        return graph.to_csr()
+    if isinstance(graph, nx.Graph):
+        return CSRGraph.from_networkx(graph)
+    raise TypeError(f"Cannot build a CSRGraph from {type(graph).__name__}")
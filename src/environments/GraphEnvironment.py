@@ -1,10 +1,15 @@
+from typing import List, Optional
+
 import networkx as nx
-from faker import Faker
+import numpy as np
 from configs.configs import GraphEnvironmentConfig
+from environments.CSRGraph import CSRGraph
 
-import plotly.graph_objects as go
 
-fake = Faker()
+def attach_agents_to_nodes(graph: nx.Graph, agents: List) -> None:
+    """Store agent ``i`` on node ``i`` of ``graph``."""
+    for i, agent in enumerate(agents):
+        graph.nodes[i]["agent"] = agent
 
 
 class GraphEnvironment:
@@ -14,6 +19,22 @@ class GraphEnvironment:
     ):
         self.config = config
         self.graph = self.create_topology()
+        self._csr = None
+        self._agent_nodes = {}
+        self._communities = {}
+
+    @classmethod
+    def from_graph(
+        cls, graph: nx.Graph, config: Optional[GraphEnvironmentConfig] = None
+    ) -> "GraphEnvironment":
+        """Wrap an existing graph instead of generating a new topology."""
+        environment = cls.__new__(cls)
+        environment.config = config
+        environment.graph = graph
+        environment._csr = None
+        environment._agent_nodes = {}
+        environment._communities = {}
+        return environment
 
     def create_topology(self):
         if self.config.topology == "star":
@@ -23,20 +44,68 @@ class GraphEnvironment:
                 self.config.num_agents,
                 k=self.config.small_world_k,
                 p=self.config.small_world_p,
+                seed=self.config.seed,
             )
         elif self.config.topology == "scale-free":
             return nx.barabasi_albert_graph(
-                self.config.num_agents, m=self.config.scale_free_m
+                self.config.num_agents,
+                m=self.config.scale_free_m,
+                seed=self.config.seed,
             )
 
+    def node_of(self, agent) -> int:
+        """Node ``agent`` is attached to, looked up by identity in O(1)."""
+        node = self._agent_nodes.get(id(agent))
+        if node is None or self.graph.nodes[node].get("agent") is not agent:
+            # Agents were attached or moved since the index was built.
+            self._agent_nodes = {
+                id(data["agent"]): node
+                for node, data in self.graph.nodes(data=True)
+                if "agent" in data
+            }
+            node = self._agent_nodes.get(id(agent))
+        if node is None:
+            node = [
+                node
+                for node, data in self.graph.nodes(data=True)
+                if data["agent"] == agent
+            ][0]
+        return node
+
     def get_neighbors(self, agent):
-        agent_node = [
-            node for node, data in self.graph.nodes(data=True) if data["agent"] == agent
-        ][0]
+        agent_node = self.node_of(agent)
         neighbor_nodes = list(self.graph[agent_node])
         return [self.graph.nodes[node]["agent"] for node in neighbor_nodes]
 
+    def to_csr(self) -> CSRGraph:
+        """Return the topology as a CSRGraph, built once and then reused."""
+        if self._csr is None:
+            self._csr = CSRGraph.from_networkx(self.graph)
+        return self._csr
+
+    def communities(self, seed: Optional[int] = 0) -> np.ndarray:
+        """
+        Louvain community of every node, computed once per seed.
+
+        Args:
+            seed: Seed of the Louvain node order
+
+        Returns:
+            Integer label of every node, in ``to_csr`` node order
+        """
+        if seed not in self._communities:
+            labels = np.zeros(self.graph.number_of_nodes(), dtype=np.int64)
+            position = {node: i for i, node in enumerate(self.graph.nodes)}
+            for label, members in enumerate(
+                nx.community.louvain_communities(self.graph, seed=seed)
+            ):
+                labels[[position[node] for node in members]] = label
+            self._communities[seed] = labels
+        return self._communities[seed]
+
     def visualize_graph_plotly(self, dimension="2d", k=None):
+        import plotly.graph_objects as go
+
         if dimension == "2d":
             pos = nx.spring_layout(self.graph, k=k)
         else:
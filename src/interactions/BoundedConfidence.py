@@ -0,0 +1,475 @@
+import random
+from abc import abstractmethod
+from typing import List, Optional, Union
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from environments.CSRGraph import CSRGraph
+from interactions.base_interaction import ArrayInteraction
+
+DEFAULT_CONFIDENCE = 0.2
+
+# Multipliers of the confidence bound, keyed by persona trait.
+TRAIT_CONFIDENCE = {
+    "open-minded": 1.5,
+    "closed-minded": 0.5,
+    "weakly held": 1.25,
+    "strongly held": 0.75,
+    "fickle-minded": 1.5,
+}
+
+Confidence = Union[float, np.ndarray]
+
+# Rounds retiring fewer than 1 / MIN_READY_FRACTION of the pending Deffuant
+# encounters hand the rest to a sequential pass.
+MIN_READY_FRACTION = 8
+
+# Entry of the ``deffuant_encounters`` scratch array for agents that are in
+# no pending encounter.
+NO_ENCOUNTER = np.iinfo(np.int64).max
+
+
+def persona_confidence(agent: BaseAgent, base: float = DEFAULT_CONFIDENCE) -> float:
+    """
+    Confidence bound of an agent from its persona traits.
+
+    Every trait in TRAIT_CONFIDENCE the persona has scales ``base``.
+
+    Args:
+        agent: Agent whose persona sets the bound
+        base: Bound of an agent without matching traits
+
+    Returns:
+        The agent's confidence bound
+    """
+    persona = getattr(agent, "persona", None)
+    if persona is None or not persona.traits:
+        return base
+    traits = persona.traits.lower()
+    bound = base
+    for trait, multiplier in TRAIT_CONFIDENCE.items():
+        if trait in traits:
+            bound *= multiplier
+    return bound
+
+
+def confidence_bounds(
+    agents: List[BaseAgent], base: float = DEFAULT_CONFIDENCE
+) -> np.ndarray:
+    """Per-agent confidence bounds from persona traits, in agent order."""
+    return np.array([persona_confidence(agent, base) for agent in agents])
+
+
+def deffuant_encounters(
+    x: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+    left_bound: np.ndarray,
+    right_bound: np.ndarray,
+    convergence: float,
+    first: np.ndarray,
+) -> None:
+    """
+    Apply Deffuant encounters ``(left[t], right[t])`` to ``x`` in ``t`` order.
+
+    Encounters touching disjoint agents commute, so every round applies all
+    pending encounters whose agents appear in no earlier pending encounter.
+    When a round retires less than ``1 / MIN_READY_FRACTION`` of the pending
+    encounters (a hub takes part in most of them, as on a star), the rest
+    are applied one at a time instead; the rounds shrink the pending set
+    geometrically, so a batch costs O(len(left)) work in total. The result
+    is identical to the sequential loop. Each side moves toward the other
+    when their distance is below its own bound.
+
+    Args:
+        x: Opinions, updated in place
+        left: First agent of every encounter
+        right: Second agent of every encounter
+        left_bound: Confidence bound of every ``left`` agent
+        right_bound: Confidence bound of every ``right`` agent
+        convergence: Fraction of the distance an agent moves (mu)
+        first: Scratch array shaped like ``x`` filled with
+            ``NO_ENCOUNTER``; only the entries of ``left`` and ``right`` are
+            written, and they are restored before returning
+    """
+    pending = np.arange(len(left))
+    while pending.size:
+        u, v = left[pending], right[pending]
+        np.minimum.at(first, u, pending)
+        np.minimum.at(first, v, pending)
+        ready = (first[u] == pending) & (first[v] == pending)
+        first[u] = first[v] = NO_ENCOUNTER
+
+        u, v, ready_at = u[ready], v[ready], pending[ready]
+        distance = x[v] - x[u]
+        move_u = np.abs(distance) < left_bound[ready_at]
+        move_v = np.abs(distance) < right_bound[ready_at]
+        x[u] += np.where(move_u, convergence * distance, 0.0)
+        x[v] -= np.where(move_v, convergence * distance, 0.0)
+        pending = pending[~ready]
+        if len(ready_at) * MIN_READY_FRACTION < len(ready):
+            # Every pending encounter comes after the applied ones sharing
+            # its agents, so finishing in order keeps the result exact.
+            _sequential_encounters(
+                x,
+                left[pending],
+                right[pending],
+                left_bound[pending],
+                right_bound[pending],
+                convergence,
+            )
+            return
+
+
+def _sequential_encounters(x, left, right, left_bound, right_bound, convergence):
+    for u, v, bound_u, bound_v in zip(
+        left.tolist(), right.tolist(), left_bound.tolist(), right_bound.tolist()
+    ):
+        distance = x[v] - x[u]
+        if abs(distance) < bound_u:
+            x[u] += convergence * distance
+        if abs(distance) < bound_v:
+            x[v] -= convergence * distance
+
+
+def hk_means(
+    x: np.ndarray,
+    confidence: np.ndarray,
+    graph: Optional[CSRGraph] = None,
+    nodes: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Hegselmann-Krause targets: the mean opinion within each agent's bound.
+
+    With a graph, agents average themselves and the neighbors within their
+    bound in O(edges). Without one every agent sees everybody; each row is
+    sorted once and the window means come from prefix sums in O(N log N).
+
+    Args:
+        x: Opinions of shape (replicas, N)
+        confidence: Confidence bound of every node, shape (N,)
+        graph: Adjacency restricting whom agents see (everybody if omitted)
+        nodes: Nodes to compute targets for (all nodes if omitted)
+
+    Returns:
+        Targets of shape (replicas, len(nodes))
+    """
+    replicas, num_nodes = x.shape
+    if nodes is None:
+        nodes = np.arange(num_nodes)
+    own = x[:, nodes]
+    bound = confidence[nodes]
+
+    if graph is None:
+        # Shift row r by r times a width no window can span, so that all
+        # rows sort into one increasing array and windows stay in their row.
+        span = x.max(initial=0.0) - x.min(initial=0.0)
+        width = span + 2.0 * bound.max(initial=0.0) + 1.0
+        shift = width * np.arange(replicas)[:, None]
+        ordered = np.sort(x, axis=1)
+        prefix = np.concatenate(([0.0], np.cumsum(ordered)))
+        keys = (ordered + shift).ravel()
+        low = np.searchsorted(keys, (own - bound + shift).ravel(), side="left")
+        high = np.searchsorted(keys, (own + bound + shift).ravel(), side="right")
+        means = (prefix[high] - prefix[low]) / (high - low)
+        return means.reshape(own.shape)
+
+    if len(nodes) == num_nodes and (nodes == np.arange(num_nodes)).all():
+        owners, seen = graph.edge_sources(), x[:, graph.indices]
+    else:
+        owners, positions = graph.neighbor_positions(nodes)
+        seen = x[:, graph.indices[positions]]
+    near = np.abs(seen - own[:, owners]) <= bound[owners]
+    flat_owners = (np.arange(replicas)[:, None] * len(nodes) + owners).ravel()
+    size = replicas * len(nodes)
+    sums = np.bincount(
+        flat_owners, weights=np.where(near, seen, 0.0).ravel(), minlength=size
+    )
+    counts = np.bincount(flat_owners, weights=near.ravel(), minlength=size)
+    return (sums.reshape(own.shape) + own) / (counts.reshape(own.shape) + 1)
+
+
+def deffuant_frozen(
+    x: np.ndarray, confidence: np.ndarray, graph: CSRGraph, tolerance: float
+) -> np.ndarray:
+    """
+    Which replicas no Deffuant encounter can change by more than ``tolerance``.
+
+    Args:
+        x: Opinions of shape (replicas, N)
+        confidence: Confidence bound of every node, shape (N,)
+        graph: Adjacency the encounters run on
+        tolerance: Largest change still counted as no change
+
+    Returns:
+        Boolean array of shape (replicas,)
+    """
+    sources = graph.edge_sources()
+    distance = np.abs(x[:, graph.indices] - x[:, sources])
+    live = (distance < confidence[sources]) & (distance > tolerance)
+    return ~live.any(axis=1)
+
+
+class BoundedConfidenceModel(ArrayInteraction):
+    """
+    Base class for continuous opinions in [-1, 1] with confidence bounds.
+
+    Agents only take into account opinions within their confidence bound,
+    which can differ per agent (see ``confidence_bounds``). Runs stop at
+    consensus (opinion spread within ``tolerance``) or once the opinions are
+    frozen into clusters that can no longer influence each other.
+    """
+
+    def __init__(
+        self,
+        graph,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        confidence: Confidence = DEFAULT_CONFIDENCE,
+        tolerance: float = 1e-6,
+    ):
+        """
+        Initialize the bounded-confidence model.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on
+            opinions: Initial opinions in [-1, 1] (uniform if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            confidence: Confidence bound, shared or one per node. Agent-level
+                ``interact`` scales a shared bound by persona traits.
+            tolerance: Opinion differences treated as zero
+        """
+        super().__init__(graph, opinions=opinions, seed=seed)
+        self.opinions = self.opinions.astype(float)
+        self.confidence = np.broadcast_to(
+            np.asarray(confidence, dtype=float), (self.num_nodes,)
+        ).copy()
+        if (self.confidence < 0).any():
+            raise ValueError("Confidence bounds must be non-negative")
+        self.base_confidence = (
+            float(confidence) if np.ndim(confidence) == 0 else DEFAULT_CONFIDENCE
+        )
+        self.tolerance = tolerance
+
+    @classmethod
+    def from_agents(cls, graph, agents: List[BaseAgent], **kwargs):
+        """Create the model from agent opinions, with bounds from their personas."""
+        kwargs.setdefault("confidence", confidence_bounds(agents))
+        return super().from_agents(graph, agents, **kwargs)
+
+    def initial_opinions(self, num_nodes: int) -> np.ndarray:
+        """Draw opinions uniformly from [-1, 1]."""
+        return self.rng.uniform(-1.0, 1.0, num_nodes)
+
+    def is_consensus(self) -> bool:
+        return bool(np.ptp(self.opinions) <= self.tolerance)
+
+    @abstractmethod
+    def is_frozen(self) -> bool:
+        """True once no further update can move an opinion."""
+
+    def run(self, max_time: float, stop_at_consensus: bool = True) -> float:
+        """
+        Step the dynamics until ``max_time`` sweeps have elapsed.
+
+        Args:
+            max_time: Simulated time (in sweeps) to run for
+            stop_at_consensus: Stop at consensus or once the opinions froze
+
+        Returns:
+            Simulated time at which the run stopped
+        """
+        end = self.time + max_time
+        while self.time < end:
+            if stop_at_consensus and (self.is_consensus() or self.is_frozen()):
+                break
+            self.step()
+        if self.consensus_time is None and self.is_consensus():
+            self.consensus_time = self.time
+        return self.time
+
+
+class DeffuantModel(BoundedConfidenceModel):
+    """
+    Deffuant-Weisbuch bounded-confidence model on a graph.
+
+    An activated agent meets a random neighbor; each of the two moves a
+    fraction ``convergence`` toward the other if their distance is below its
+    own bound. Batches of encounters are applied with exactly the outcome of
+    performing them one at a time.
+    """
+
+    def __init__(
+        self,
+        graph,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        confidence: Confidence = DEFAULT_CONFIDENCE,
+        convergence: float = 0.5,
+        batch_size: Optional[int] = None,
+        tolerance: float = 1e-6,
+    ):
+        """
+        Initialize the Deffuant model.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on
+            opinions: Initial opinions in [-1, 1] (uniform if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            confidence: Confidence bound, shared or one per node
+            convergence: Fraction of the distance an agent moves, in (0, 0.5]
+            batch_size: Encounters per step (default: one sweep)
+            tolerance: Opinion differences treated as zero
+        """
+        super().__init__(
+            graph,
+            opinions=opinions,
+            seed=seed,
+            confidence=confidence,
+            tolerance=tolerance,
+        )
+        if not 0 < convergence <= 0.5:
+            raise ValueError("convergence must be in (0, 0.5]")
+        self.convergence = convergence
+        self.batch_size = batch_size or self.num_nodes
+        self._first = np.full(self.num_nodes, NO_ENCOUNTER, dtype=np.int64)
+
+    def interact(self, agent, neighbors):
+        other = random.choice(neighbors)
+        distance = other.get_opinion() - agent.get_opinion()
+        agent_moves = abs(distance) < persona_confidence(agent, self.base_confidence)
+        other_moves = abs(distance) < persona_confidence(other, self.base_confidence)
+        if agent_moves:
+            agent.set_opinion(agent.get_opinion() + self.convergence * distance)
+        if other_moves:
+            other.set_opinion(other.get_opinion() - self.convergence * distance)
+
+    def step(self) -> None:
+        self.update_nodes(self.rng.integers(0, self.num_nodes, self.batch_size))
+
+    def update_nodes(self, nodes: np.ndarray) -> None:
+        """
+        Let ``nodes`` each meet a random neighbor, one after another.
+
+        Args:
+            nodes: Activated nodes, in encounter order; repeats are allowed
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        partners = self.graph.sample_neighbors(nodes, self.rng)
+        # Isolated nodes are sampled as their own partner and meet nobody.
+        left, right = nodes[nodes != partners], partners[nodes != partners]
+        bounds = self.confidence
+        if self.frozen is not None:
+            # No distance is below a negative bound, so frozen nodes never move.
+            bounds = np.where(self.frozen, -1.0, bounds)
+        deffuant_encounters(
+            self.opinions,
+            left,
+            right,
+            bounds[left],
+            bounds[right],
+            self.convergence,
+            self._first,
+        )
+        self.num_updates += len(nodes)
+        self.time += len(nodes) / self.num_nodes
+
+    def is_frozen(self) -> bool:
+        return bool(
+            deffuant_frozen(
+                self.opinions[None], self.confidence, self.graph, self.tolerance
+            )[0]
+        )
+
+
+class HegselmannKrauseModel(BoundedConfidenceModel):
+    """
+    Hegselmann-Krause bounded-confidence model.
+
+    Every agent moves to the mean opinion of itself and the agents within its
+    bound. On a graph only neighbors count, at O(edges) per sweep. Without a
+    graph every agent sees everybody and the sorted-window algorithm of
+    ``hk_means`` replaces the O(N^2) all-pairs scan.
+    """
+
+    def __init__(
+        self,
+        graph=None,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        confidence: Confidence = DEFAULT_CONFIDENCE,
+        num_nodes: Optional[int] = None,
+        tolerance: float = 1e-6,
+    ):
+        """
+        Initialize the Hegselmann-Krause model.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on;
+                ``None`` lets every agent see everybody
+            opinions: Initial opinions in [-1, 1] (uniform if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            confidence: Confidence bound, shared or one per node
+            num_nodes: Number of agents when neither graph nor opinions are given
+            tolerance: Opinion differences treated as zero
+        """
+        self.mean_field = graph is None
+        if self.mean_field:
+            if opinions is not None:
+                num_nodes = len(opinions)
+            if num_nodes is None:
+                raise ValueError("Provide a graph, opinions or num_nodes")
+            # The edgeless graph only carries the node count.
+            graph = CSRGraph(np.zeros(num_nodes + 1), np.zeros(0))
+        super().__init__(
+            graph,
+            opinions=opinions,
+            seed=seed,
+            confidence=confidence,
+            tolerance=tolerance,
+        )
+        self.last_change = np.inf
+
+    def interact(self, agent, neighbors):
+        opinion = agent.get_opinion()
+        bound = persona_confidence(agent, self.base_confidence)
+        close = [opinion] + [
+            neighbor.get_opinion()
+            for neighbor in neighbors
+            if abs(neighbor.get_opinion() - opinion) <= bound
+        ]
+        agent.set_opinion(sum(close) / len(close))
+
+    def step(self) -> None:
+        self.update_nodes()
+
+    def update_nodes(self, nodes: Optional[np.ndarray] = None) -> None:
+        """
+        Move nodes to their local mean, all reading the current state.
+
+        Args:
+            nodes: Nodes to update (all nodes if omitted)
+        """
+        if nodes is not None:
+            nodes = np.asarray(nodes, dtype=np.int64)
+        graph = None if self.mean_field else self.graph
+        means = hk_means(self.opinions[None], self.confidence, graph, nodes)[0]
+        if self.frozen is not None:
+            index = slice(None) if nodes is None else nodes
+            means = np.where(self.frozen[index], self.opinions[index], means)
+        if nodes is None:
+            self.last_change = float(np.abs(means - self.opinions).max(initial=0.0))
+            self.opinions = means
+            num_updated = self.num_nodes
+        else:
+            # Partial updates say nothing about whether the rest has settled.
+            self.last_change = np.inf
+            self.opinions[nodes] = means
+            num_updated = len(nodes)
+        self.num_updates += num_updated
+        self.time += num_updated / self.num_nodes
+
+    def is_frozen(self) -> bool:
+        """True once the last synchronous sweep moved no opinion noticeably."""
+        return self.last_change <= self.tolerance
@@ -1,7 +1,14 @@
-from typing import List, Callable, Tuple, Optional
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import networkx as nx
+
 from environments.GraphEnvironment import GraphEnvironment
 from agents.SimpleAgent import SimpleAgent, MediatingAgent
 
+ROUND_STRATEGIES = ("coloring", "random")
+
 
 class DialogueSimulator:
     def __init__(
@@ -21,11 +28,18 @@ class DialogueSimulator:
         self.select_next_speaker = selection_function
         self.history = []
         self.opinion_analyzer = opinion_analyzer
+        self._round = 0
+        self._speaker_classes: Optional[List[List[int]]] = None
+        self._speakers: Optional[List[SimpleAgent]] = None
+        self._audiences: Optional[Dict[int, Tuple[SimpleAgent, list]]] = None
+        self.listeners: List[Callable[["DialogueSimulator"], None]] = []
 
         if mediating_agent:
             self.mediating_agent = mediating_agent
-            self.mediating_agent.set_topic(topic)
-            self.mediating_agent.set_system_message()
+            # A mediator already briefed on this topic keeps its description.
+            if mediating_agent.topic != topic or not mediating_agent.system_message:
+                self.mediating_agent.set_topic(topic)
+                self.mediating_agent.set_system_message()
         else:
             self.mediating_agent = MediatingAgent(
                 name="Mediator", topic="", agent_id=-1
@@ -37,6 +51,9 @@ class DialogueSimulator:
             agent.reset()
         self.history.clear()
         self._step = 0
+        self._round = 0
+        if self.opinion_analyzer:
+            self.opinion_analyzer.clear_pending()
 
     def inject(self, idx: Optional[int] = None, message: Optional[str] = ""):
         if idx is None:
@@ -44,31 +61,163 @@ class DialogueSimulator:
             message = self.mediating_agent.topic_description
         else:
             name = self.agents[idx].name
-        for agent in self.agents:
-            agent.receive(name, message)
+        SimpleAgent.broadcast(self.agents, name, message)
         self._log_interaction(name, message)
+        if self.opinion_analyzer and self.opinion_analyzer.incremental:
+            self.opinion_analyzer.record_delivery(self.history[-1], self.agents)
+
+    def add_listener(self, listener: Callable[["DialogueSimulator"], None]) -> None:
+        """Call ``listener(simulator)`` after every step, once opinions are updated."""
+        self.listeners.append(listener)
+
+    def invalidate_audiences(self) -> None:
+        """Drop cached speakers and audiences after agents or topology changed."""
+        self._speakers = None
+        self._audiences = None
+        self._speaker_classes = None
+
+    def audience(self, speaker: SimpleAgent) -> List[SimpleAgent]:
+        """
+        Receivers of a message from ``speaker``.
+
+        The mediator addresses every agent; any other speaker reaches its
+        neighbors and the mediator. Audiences are built for every attached
+        agent on first use and keyed by identity, so a lookup never compares
+        agents field by field. Do not modify the returned list.
 
-    def step(self) -> Tuple[str, str]:
-        combined_list = self.agents + [self.mediating_agent]
-        speaker_idx = self.select_next_speaker(combined_list)
+        Args:
+            speaker: Agent or mediator about to speak
+
+        Returns:
+            The cached audience of ``speaker``
+        """
+        if self._audiences is None:
+            self._audiences = self._build_audiences()
+        entry = self._audiences.get(id(speaker))
+        if entry is not None and entry[0] is speaker:
+            return entry[1]
+        # A speaker that was not attached when the cache was built.
+        receivers = self.environment.get_neighbors(speaker)
+        if not any(receiver is self.mediating_agent for receiver in receivers):
+            receivers.append(self.mediating_agent)
+        return receivers
+
+    def _build_audiences(self) -> Dict[int, Tuple[SimpleAgent, list]]:
+        graph = self.environment.graph
+        mediator = self.mediating_agent
+        audiences = {id(mediator): (mediator, list(self.agents))}
+        for node, data in graph.nodes(data=True):
+            agent = data.get("agent")
+            if agent is None:
+                continue
+            receivers = [graph.nodes[neighbor]["agent"] for neighbor in graph[node]]
+            if not any(receiver is mediator for receiver in receivers):
+                receivers.append(mediator)
+            audiences[id(agent)] = (agent, receivers)
+        return audiences
+
+    def step(self, speaker_idx: Optional[int] = None) -> Tuple[str, str]:
+        if self._speakers is None:
+            self._speakers = self.agents + [self.mediating_agent]
+        combined_list = self._speakers
+        if speaker_idx is None:
+            speaker_idx = self.select_next_speaker(combined_list)
         # speaker = self.agents[speaker_idx]
         speaker = combined_list[speaker_idx]
         message = speaker.send()
-        if isinstance(speaker, MediatingAgent):
-            # If the speaker is the mediating agent, all agents receive the message
-            receivers = self.agents
+        self._deliver(speaker, message)
+        return speaker.name, message
+
+    def speaker_classes(self) -> List[List[int]]:
+        """
+        Partition the agents into sets that can speak in the same round.
+
+        Two agents share a class only if they are at distance three or more,
+        so no agent hears two speakers of one round and no speaker hears
+        another. The classes come from a greedy coloring of the square of
+        the graph and are computed once.
+
+        Returns:
+            Agent indices of every class, each sorted
+        """
+        if self._speaker_classes is None:
+            coloring = nx.greedy_color(
+                nx.power(self.environment.graph, 2), strategy="largest_first"
+            )
+            classes = {}
+            for node, color in coloring.items():
+                classes.setdefault(color, []).append(node)
+            self._speaker_classes = [
+                sorted(classes[color]) for color in sorted(classes)
+            ]
+        return self._speaker_classes
+
+    def sample_speakers(self) -> List[int]:
+        """
+        Draw a random maximal set of agents that can speak in the same round.
+
+        Returns:
+            Sorted agent indices, pairwise at distance three or more
+        """
+        graph = self.environment.graph
+        nodes = list(graph.nodes())
+        random.shuffle(nodes)
+        blocked = set()
+        speakers = []
+        for node in nodes:
+            if node in blocked:
+                continue
+            speakers.append(node)
+            for neighbor in graph[node]:
+                blocked.add(neighbor)
+                blocked.update(graph[neighbor])
+        return sorted(speakers)
+
+    def step_round(
+        self, max_workers: Optional[int] = None, strategy: str = "coloring"
+    ) -> List[Tuple[str, str]]:
+        """
+        Let a set of agents with disjoint neighborhoods speak concurrently.
+
+        The ``send()`` calls run in a thread pool, so up to ``max_workers``
+        LLM requests are in flight at once. Messages are then delivered one
+        speaker at a time in agent index order, exactly as if the speakers
+        had taken consecutive steps, so the result does not depend on which
+        request finishes first.
+
+        Args:
+            max_workers: Concurrent ``send()`` calls (default: one per speaker)
+            strategy: "coloring" cycles through the classes of
+                ``speaker_classes``; "random" draws ``sample_speakers`` anew
+
+        Returns:
+            ``(speaker_name, message)`` for every speaker, in delivery order
+        """
+        if strategy == "coloring":
+            classes = self.speaker_classes()
+            speakers = classes[self._round % len(classes)]
+        elif strategy == "random":
+            speakers = self.sample_speakers()
         else:
-            # If a regular agent is speaking, only their neighbors receive the message
-            receivers = self.environment.get_neighbors(speaker)
-            # Ensure the MediatingAgent also receives the message
-            if self.mediating_agent not in receivers:
-                receivers.append(self.mediating_agent)
+            raise ValueError(f"Invalid strategy. Choose from {list(ROUND_STRATEGIES)}")
+        self._round += 1
 
-        for receiver in receivers:
-            receiver.receive(speaker.name, message)
+        agents = [self.agents[idx] for idx in speakers]
+        with ThreadPoolExecutor(max_workers=max_workers or len(agents)) as executor:
+            messages = list(executor.map(lambda agent: agent.send(), agents))
+
+        for speaker, message in zip(agents, messages):
+            self._deliver(speaker, message)
+        return [(speaker.name, message) for speaker, message in zip(agents, messages)]
+
+    def _deliver(self, speaker: SimpleAgent, message: str) -> None:
+        receivers = self.audience(speaker)
+        SimpleAgent.broadcast(receivers, speaker.name, message)
 
         # 4. Log interaction
         self._log_interaction(speaker.name, message)
+        if self.opinion_analyzer and self.opinion_analyzer.incremental:
+            self.opinion_analyzer.record_delivery(self.history[-1], receivers)
 
         # 5. Increment time step
         self._step += 1
@@ -77,10 +226,16 @@ class DialogueSimulator:
         if self.opinion_analyzer and self.opinion_analyzer.should_update_opinions(
             self._step
         ):
-            recent_history = self.get_recent_history(window=5)
-            self.opinion_analyzer.analyze_opinion_changes(recent_history, self.agents)
-
-        return speaker.name, message
+            if self.opinion_analyzer.incremental:
+                self.opinion_analyzer.analyze_pending(self.agents)
+            else:
+                recent_history = self.get_recent_history(window=5)
+                self.opinion_analyzer.analyze_opinion_changes(
+                    recent_history, self.agents
+                )
+
+        for listener in self.listeners:
+            listener(self)
 
     def _log_interaction(self, name: str, message: str):
         """Log interactions for future analysis."""
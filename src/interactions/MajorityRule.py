@@ -1,4 +1,54 @@
-from base_interaction import BaseInteraction
+from typing import Optional
+
+import numpy as np
+
+from interactions.base_interaction import ArrayInteraction, BaseInteraction
+
+TIE_BREAKS = ("random", "keep")
+
+
+def majority_opinions(
+    positive: np.ndarray,
+    negative: np.ndarray,
+    current: np.ndarray,
+    degree: np.ndarray,
+    rng: np.random.Generator,
+    tie_break: str = "random",
+    threshold: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Apply the majority rule to neighbor counts of any (broadcastable) shape.
+
+    Args:
+        positive: Number of positive neighbors
+        negative: Number of negative neighbors
+        current: Current opinions in {-1, 0, 1}
+        degree: Node degrees
+        rng: Generator for random tie breaks
+        tie_break: "random" or "keep", see VectorizedMajorityRule
+        threshold: Threshold (q-vote) fraction, see VectorizedMajorityRule
+
+    Returns:
+        New int8 opinions, shaped like ``current``
+    """
+    degree = np.broadcast_to(degree, current.shape)
+    if threshold is None:
+        new = np.sign(positive - negative).astype(np.int8)
+        isolated = degree == 0
+        tied = (new == 0) & ~isolated
+        new[isolated] = current[isolated]
+        if tie_break == "keep":
+            new[tied] = current[tied]
+        else:
+            new[tied] = rng.choice(
+                np.array([-1, 1], dtype=np.int8), size=int(tied.sum())
+            )
+        return new
+    bound = threshold * degree
+    new = current.astype(np.int8)
+    new[positive > bound] = 1
+    new[negative > bound] = -1
+    return new
 
 
 class MajorityRule(BaseInteraction):
@@ -12,3 +62,116 @@ class MajorityRule(BaseInteraction):
             agent.set_opinion(-1)
         else:
             agent.set_opinion(0)
+
+
+class VectorizedMajorityRule(ArrayInteraction, MajorityRule):
+    """
+    Majority rule over an opinion array in {-1, 0, 1} and CSR adjacency.
+
+    Synchronous sweeps count positive and negative neighbors with a single
+    sparse matrix-vector product: both indicators are packed into one int64
+    per node (positives in the low 32 bits, negatives in the high bits).
+    Asynchronous batches count over the CSR rows of their nodes only.
+    """
+
+    def __init__(
+        self,
+        graph,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        synchronous: bool = True,
+        tie_break: str = "random",
+        threshold: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Initialize the vectorized majority rule.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on
+            opinions: Initial opinions in {-1, 0, 1} (random {-1, 1} if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            synchronous: Update every node at once; otherwise update random
+                batches of nodes that all read the state at the batch start
+            tie_break: "random" to pick -1 or 1 uniformly on a tie, "keep" to
+                leave the node's opinion unchanged
+            threshold: Threshold (q-vote) variant; a node adopts a side only
+                when more than this fraction of all its neighbors hold it, and
+                keeps its opinion otherwise. ``None`` compares the two sides.
+            batch_size: Nodes per asynchronous step (default: 10% of nodes);
+                1 gives exact random-sequential updates
+        """
+        super().__init__(graph, opinions=opinions, seed=seed)
+        if not np.isin(self.opinions, (-1, 0, 1)).all():
+            raise ValueError("VectorizedMajorityRule requires opinions in {-1, 0, 1}")
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Invalid tie_break. Choose from {list(TIE_BREAKS)}")
+        if threshold is not None and not (0.5 <= threshold < 1):
+            raise ValueError("threshold must be in [0.5, 1)")
+        self.opinions = self.opinions.astype(np.int8)
+        self.synchronous = synchronous
+        self.tie_break = tie_break
+        self.threshold = threshold
+        self.batch_size = batch_size or max(1, self.num_nodes // 10)
+
+    def step(self) -> None:
+        if self.synchronous:
+            self.update_nodes()
+        else:
+            self.update_nodes(self.rng.integers(0, self.num_nodes, self.batch_size))
+
+    def neighbor_counts(self, nodes: Optional[np.ndarray] = None):
+        """
+        Count positive and negative neighbors.
+
+        All nodes are counted with one sparse product; a subset only reads
+        the CSR rows of its nodes, so a batch costs O(its edges), not O(N).
+
+        Args:
+            nodes: Nodes to count for (all nodes if omitted)
+
+        Returns:
+            ``(positive, negative)`` count arrays aligned with ``nodes``
+        """
+        if nodes is not None:
+            owners, positions = self.graph.neighbor_positions(nodes)
+            seen = self.opinions[self.graph.indices[positions]]
+            return (
+                np.bincount(owners[seen > 0], minlength=len(nodes)),
+                np.bincount(owners[seen < 0], minlength=len(nodes)),
+            )
+        packed = (self.opinions > 0).astype(np.int64)
+        packed |= (self.opinions < 0).astype(np.int64) << 32
+        counts = self.graph.matrix @ packed
+        return counts & 0xFFFFFFFF, counts >> 32
+
+    def update_nodes(self, nodes: Optional[np.ndarray] = None) -> None:
+        """
+        Move nodes to their local majority, all reading the current state.
+
+        Args:
+            nodes: Nodes to update (all nodes if omitted)
+        """
+        if nodes is None:
+            nodes = slice(None)
+            num_updated = self.num_nodes
+            positive, negative = self.neighbor_counts()
+        else:
+            nodes = np.asarray(nodes, dtype=np.int64)
+            num_updated = len(nodes)
+            positive, negative = self.neighbor_counts(nodes)
+        current = self.opinions[nodes]
+        new = majority_opinions(
+            positive,
+            negative,
+            current,
+            self.graph.degree[nodes],
+            self.rng,
+            tie_break=self.tie_break,
+            threshold=self.threshold,
+        )
+        if self.frozen is not None:
+            new = np.where(self.frozen[nodes], current, new)
+        self.opinions[nodes] = new
+        self.num_updates += num_updated
+        self.time += num_updated / self.num_nodes
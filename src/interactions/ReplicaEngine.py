@@ -0,0 +1,298 @@
+from typing import Optional
+
+import numpy as np
+
+from configs.configs import InteractionType
+from environments.CSRGraph import CSRGraph, as_csr_graph
+from interactions.BoundedConfidence import (
+    DEFAULT_CONFIDENCE,
+    NO_ENCOUNTER,
+    Confidence,
+    deffuant_encounters,
+    deffuant_frozen,
+    hk_means,
+)
+from interactions.MajorityRule import TIE_BREAKS, majority_opinions
+from interactions.VoterModel import SequentialCopier
+
+DISCRETE_MODELS = (InteractionType.VOTER, InteractionType.MAJORITY)
+CONTINUOUS_MODELS = (InteractionType.DEFFUANT, InteractionType.HEGSELMANN_KRAUSE)
+
+
+class ReplicaEngine:
+    """
+    Runs many independent replicas of a classical model in lock step.
+
+    Opinions are stored as one (replicas x nodes) array over a shared CSR
+    adjacency, so a step advances every replica with a handful of array
+    operations instead of one Python loop per replica. Replicas that reach
+    consensus, or whose continuous opinions froze into clusters, are dropped
+    from the active set and cost nothing afterwards. Each replica follows the
+    same dynamics as the single-replica engines (``VectorizedVoterModel``,
+    ``VectorizedMajorityRule``, ``DeffuantModel``, ``HegselmannKrauseModel``);
+    time is measured in sweeps.
+    """
+
+    def __init__(
+        self,
+        graph,
+        num_replicas: int,
+        model: InteractionType = InteractionType.VOTER,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        synchronous: Optional[bool] = None,
+        batch_size: Optional[int] = None,
+        tie_break: str = "random",
+        threshold: Optional[float] = None,
+        confidence: Confidence = DEFAULT_CONFIDENCE,
+        convergence: float = 0.5,
+        tolerance: float = 1e-6,
+        num_nodes: Optional[int] = None,
+    ):
+        """
+        Initialize the replica engine.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment shared by all
+                replicas; ``None`` runs Hegselmann-Krause with everybody
+                seeing everybody
+            num_replicas: Number of replicas R
+            model: Dynamics to run, an ``InteractionType`` other than dialogue
+            opinions: Initial opinions of shape (R, N) or (N,) for identical
+                starts (random {-1, 1}, or uniform on [-1, 1] for continuous
+                models, if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            synchronous: Update every node of a replica at once (default:
+                True for majority rule and Hegselmann-Krause, which only run
+                synchronously, and False for the voter and Deffuant models,
+                which only run asynchronously)
+            batch_size: Node updates per replica and asynchronous step
+                (default: one sweep, 10% of nodes for majority rule)
+            tie_break: Majority rule tie break, see VectorizedMajorityRule
+            threshold: Majority rule threshold, see VectorizedMajorityRule
+            confidence: Confidence bound, shared or one per node
+            convergence: Deffuant convergence parameter, see DeffuantModel
+            tolerance: Opinion differences treated as zero by continuous models
+            num_nodes: Number of agents when neither graph nor opinions are given
+        """
+        model = InteractionType(model)
+        if model not in DISCRETE_MODELS + CONTINUOUS_MODELS:
+            raise ValueError(f"ReplicaEngine does not support {model.value}")
+        if synchronous is None:
+            synchronous = model in (
+                InteractionType.MAJORITY,
+                InteractionType.HEGSELMANN_KRAUSE,
+            )
+        if model is InteractionType.DEFFUANT and synchronous:
+            raise ValueError("The Deffuant model only runs asynchronously")
+        if model is InteractionType.HEGSELMANN_KRAUSE and not synchronous:
+            raise ValueError("The Hegselmann-Krause model only runs synchronously")
+        if not 0 < convergence <= 0.5:
+            raise ValueError("convergence must be in (0, 0.5]")
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Invalid tie_break. Choose from {list(TIE_BREAKS)}")
+        if threshold is not None and not (0.5 <= threshold < 1):
+            raise ValueError("threshold must be in [0.5, 1)")
+
+        self.mean_field = graph is None
+        if self.mean_field:
+            if model is not InteractionType.HEGSELMANN_KRAUSE:
+                raise ValueError(f"{model.value} needs a graph")
+            if opinions is not None:
+                num_nodes = np.shape(opinions)[-1]
+            if num_nodes is None:
+                raise ValueError("Provide a graph, opinions or num_nodes")
+            # The edgeless graph only carries the node count.
+            graph = CSRGraph(np.zeros(num_nodes + 1), np.zeros(0))
+        self.graph = as_csr_graph(graph)
+        self.num_nodes = self.graph.num_nodes
+        self.num_replicas = num_replicas
+        self.model = model
+        self.rng = np.random.default_rng(seed)
+        self.tie_break = tie_break
+        self.threshold = threshold
+        self.confidence = np.broadcast_to(
+            np.asarray(confidence, dtype=float), (self.num_nodes,)
+        ).copy()
+        self.convergence = convergence
+        self.tolerance = tolerance
+
+        shape = (num_replicas, self.num_nodes)
+        if opinions is None and model in CONTINUOUS_MODELS:
+            opinions = self.rng.uniform(-1.0, 1.0, shape)
+        elif opinions is None:
+            opinions = self.rng.choice(np.array([-1, 1], dtype=np.int8), size=shape)
+        self.opinions = np.array(np.broadcast_to(opinions, shape), order="C")
+        if model in CONTINUOUS_MODELS:
+            self.opinions = self.opinions.astype(float)
+        elif not np.issubdtype(self.opinions.dtype, np.integer):
+            raise ValueError(f"The {model.value} model requires integer opinions")
+        if model is InteractionType.MAJORITY:
+            if not np.isin(self.opinions, (-1, 0, 1)).all():
+                raise ValueError("Majority rule requires opinions in {-1, 0, 1}")
+            self.opinions = self.opinions.astype(np.int8)
+
+        self.synchronous = synchronous
+        if batch_size is None:
+            batch_size = self.num_nodes
+            if model is InteractionType.MAJORITY:
+                batch_size = max(1, self.num_nodes // 10)
+        self.batch_size = batch_size
+        if model is InteractionType.VOTER and not synchronous:
+            self._copier = SequentialCopier(num_replicas * self.num_nodes)
+        if model is InteractionType.DEFFUANT:
+            self._first = np.full(
+                num_replicas * self.num_nodes, NO_ENCOUNTER, dtype=np.int64
+            )
+
+        self.time = 0.0
+        self.num_updates = 0
+        self.consensus_time = np.full(num_replicas, np.nan)
+        self.settle_time = np.full(num_replicas, np.nan)
+        self.active = np.arange(num_replicas)
+        frozen = None
+        if model is InteractionType.DEFFUANT:
+            frozen = self._deffuant_frozen(self.active)
+        self._retire(self.active, frozen)
+
+    def is_consensus(self) -> np.ndarray:
+        """Boolean mask of the replicas that have reached consensus."""
+        return ~np.isnan(self.consensus_time)
+
+    def is_settled(self) -> np.ndarray:
+        """Boolean mask of the replicas that stopped changing (and stopped running)."""
+        return ~np.isnan(self.settle_time)
+
+    def step(self) -> None:
+        """Advance every active replica by one batch of updates."""
+        if not len(self.active):
+            return
+        rows = self.active
+        frozen = None
+        if self.model is InteractionType.VOTER:
+            if self.synchronous:
+                self._voter_sweep(rows)
+            else:
+                self._voter_batch(rows)
+        elif self.model is InteractionType.MAJORITY:
+            self._majority_batch(rows)
+        elif self.model is InteractionType.DEFFUANT:
+            self._deffuant_batch(rows)
+            frozen = self._deffuant_frozen(rows)
+        else:
+            frozen = self._hk_sweep(rows)
+
+        updates = self.num_nodes if self.synchronous else self.batch_size
+        self.num_updates += updates * len(rows)
+        self.time += updates / self.num_nodes
+        self._retire(rows, frozen)
+
+    def run(self, max_time: float, stop_at_consensus: bool = True) -> float:
+        """
+        Step all replicas until ``max_time`` sweeps have elapsed.
+
+        Args:
+            max_time: Simulated time (in sweeps) to run for
+            stop_at_consensus: Stop once every replica has reached consensus
+
+        Returns:
+            Simulated time at which the run stopped
+        """
+        end = self.time + max_time
+        while self.time < end:
+            if not len(self.active):
+                # Retired replicas never change again, so the rest of the
+                # time passes without steps.
+                if not stop_at_consensus:
+                    self.time = end
+                break
+            self.step()
+        return self.time
+
+    def _retire(self, rows: np.ndarray, frozen: Optional[np.ndarray] = None) -> None:
+        block = self.opinions[rows]
+        if self.model in CONTINUOUS_MODELS:
+            consensus = np.ptp(block, axis=1) <= self.tolerance
+        else:
+            consensus = block.min(axis=1) == block.max(axis=1)
+        self.consensus_time[rows[consensus]] = self.time
+        done = consensus if frozen is None else consensus | frozen
+        if done.any():
+            self.settle_time[rows[done]] = self.time
+            self.active = self.active[~np.isin(self.active, rows[done])]
+
+    def _voter_sweep(self, rows: np.ndarray) -> None:
+        nodes = np.tile(np.arange(self.num_nodes), len(rows))
+        sources = self.graph.sample_neighbors(nodes, self.rng)
+        self.opinions[rows] = np.take_along_axis(
+            self.opinions[rows], sources.reshape(len(rows), -1), axis=1
+        )
+
+    def _voter_batch(self, rows: np.ndarray) -> None:
+        # Replicas occupy disjoint index ranges of the flattened array, so one
+        # copier resolves the random-sequential updates of all of them.
+        nodes = self.rng.integers(0, self.num_nodes, len(rows) * self.batch_size)
+        sources = self.graph.sample_neighbors(nodes, self.rng)
+        offset = np.repeat(rows * self.num_nodes, self.batch_size)
+        flat = self.opinions.reshape(-1)
+        written, values = self._copier.resolve(flat, nodes + offset, sources + offset)
+        flat[written] = values
+
+    def _majority_batch(self, rows: np.ndarray) -> None:
+        block = self.opinions[rows]
+        if self.synchronous:
+            packed = (block > 0).astype(np.int64)
+            packed |= (block < 0).astype(np.int64) << 32
+            counts = (self.graph.matrix @ packed.T).T
+            positive, negative = counts & 0xFFFFFFFF, counts >> 32
+            nodes = np.broadcast_to(np.arange(self.num_nodes), block.shape)
+        else:
+            # Only the sampled nodes' neighborhoods are read, replica by replica.
+            nodes = self.rng.integers(0, self.num_nodes, (len(rows), self.batch_size))
+            owners, positions = self.graph.neighbor_positions(nodes.reshape(-1))
+            seen = block[owners // self.batch_size, self.graph.indices[positions]]
+            positive = np.bincount(owners[seen > 0], minlength=nodes.size)
+            negative = np.bincount(owners[seen < 0], minlength=nodes.size)
+            positive = positive.reshape(nodes.shape)
+            negative = negative.reshape(nodes.shape)
+
+        local = np.arange(len(rows))[:, None]
+        block[local, nodes] = majority_opinions(
+            positive,
+            negative,
+            block[local, nodes],
+            self.graph.degree[nodes],
+            self.rng,
+            tie_break=self.tie_break,
+            threshold=self.threshold,
+        )
+        self.opinions[rows] = block
+
+    def _deffuant_batch(self, rows: np.ndarray) -> None:
+        nodes = self.rng.integers(0, self.num_nodes, len(rows) * self.batch_size)
+        partners = self.graph.sample_neighbors(nodes, self.rng)
+        offset = np.repeat(rows * self.num_nodes, self.batch_size)
+        # Isolated nodes are sampled as their own partner and meet nobody.
+        meet = nodes != partners
+        nodes, partners, offset = nodes[meet], partners[meet], offset[meet]
+        deffuant_encounters(
+            self.opinions.reshape(-1),
+            nodes + offset,
+            partners + offset,
+            self.confidence[nodes],
+            self.confidence[partners],
+            self.convergence,
+            self._first,
+        )
+
+    def _deffuant_frozen(self, rows: np.ndarray) -> np.ndarray:
+        return deffuant_frozen(
+            self.opinions[rows], self.confidence, self.graph, self.tolerance
+        )
+
+    def _hk_sweep(self, rows: np.ndarray) -> np.ndarray:
+        block = self.opinions[rows]
+        graph = None if self.mean_field else self.graph
+        means = hk_means(block, self.confidence, graph)
+        self.opinions[rows] = means
+        return np.abs(means - block).max(axis=1, initial=0.0) <= self.tolerance
@@ -1,4 +1,10 @@
-from interactions.base_interaction import BaseInteraction
+from array import array
+from typing import Optional, Tuple
+
+import numpy as np
+
+from interactions.base_interaction import ArrayInteraction, BaseInteraction
+from utils.indexed_set import IndexedSet
 import random
 
 
@@ -6,3 +12,321 @@ class VoterModel(BaseInteraction):
     def interact(self, agent, neighbors):
         chosen_neighbor = random.choice(neighbors)
         agent.set_opinion(chosen_neighbor.get_opinion())
+
+
+class SequentialCopier:
+    """
+    Resolves a sequence of copy updates ``x[targets[t]] = x[sources[t]]``.
+
+    Applying the copies one by one in ``t`` order is what random-sequential
+    voter dynamics prescribe. A copy only depends on earlier copies when its
+    source was itself written earlier in the same batch, so those few reads
+    are chased back through the batch while every other read comes straight
+    from the pre-batch state. The result is identical to the sequential loop.
+    """
+
+    def __init__(self, size: int):
+        self.last_write = np.full(size, -1, dtype=np.int64)
+        self.written = np.zeros(size, dtype=bool)
+        self.clock = 0
+
+    def resolve(
+        self, x: np.ndarray, targets: np.ndarray, sources: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the net effect of the copy sequence on ``x``.
+
+        Args:
+            x: Current values, indexed by ``targets`` and ``sources``
+            targets: Nodes written, in update order
+            sources: Node each target copies from, aligned with ``targets``
+
+        Returns:
+            ``(nodes, values)`` such that ``x[nodes] = values`` applies the batch
+        """
+        size = len(targets)
+        start = self.clock
+        times = np.arange(start, start + size)
+        self.clock += size
+        # Latest write time of every node; older batches never reach ``start``.
+        np.maximum.at(self.last_write, targets, times)
+        values = x[sources]
+
+        candidates = np.flatnonzero(self.last_write[sources] >= start)
+        if candidates.size:
+            self._chase_dependencies(targets, sources, candidates, values)
+
+        final = np.flatnonzero(self.last_write[targets] == times)
+        return targets[final], values[final]
+
+    def _chase_dependencies(self, targets, sources, candidates, values):
+        size = len(targets)
+        read_nodes = sources[candidates]
+        self.written[read_nodes] = True
+        writes = np.flatnonzero(self.written[targets])
+        self.written[read_nodes] = False
+
+        order = np.argsort(targets[writes], kind="stable")
+        writes = writes[order]
+        written_nodes = targets[writes]
+        # Find, for each read, the last write to the same node before it.
+        position = (
+            np.searchsorted(
+                written_nodes * size + writes, read_nodes * size + candidates
+            )
+            - 1
+        )
+        found = position >= 0
+        position[~found] = 0
+        found &= written_nodes[position] == read_nodes
+        candidates = candidates[found]
+        if not candidates.size:
+            return
+
+        origin = np.arange(size)
+        origin[candidates] = writes[position[found]]
+        # Follow chains of dependent copies back to a read of the old state.
+        while True:
+            jumped = origin[origin[candidates]]
+            if np.array_equal(jumped, origin[candidates]):
+                break
+            origin[candidates] = jumped
+        values[candidates] = values[origin[candidates]]
+
+
+class VectorizedVoterModel(ArrayInteraction, VoterModel):
+    """
+    Voter model over an opinion array and CSR adjacency.
+
+    In asynchronous mode each step applies ``batch_size`` random-sequential
+    updates (a random node copies a random neighbor) with exactly the same
+    outcome as performing them one at a time. In synchronous mode each step
+    is a full sweep in which every node copies a neighbor's previous opinion.
+    """
+
+    def __init__(
+        self,
+        graph,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        synchronous: bool = False,
+        batch_size: int = 2**14,
+    ):
+        """
+        Initialize the vectorized voter model.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on
+            opinions: Initial integer opinions (random {-1, 1} if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            synchronous: Update every node at once instead of random-sequentially
+            batch_size: Number of random-sequential updates per step
+        """
+        super().__init__(graph, opinions=opinions, seed=seed)
+        if not np.issubdtype(self.opinions.dtype, np.integer):
+            raise ValueError("VectorizedVoterModel requires integer opinions")
+        self.synchronous = synchronous
+        self.batch_size = batch_size
+        self._copier = SequentialCopier(self.num_nodes)
+        self._recount()
+
+    def _recount(self) -> None:
+        # Opinion counts make consensus checks O(#opinions) instead of O(N).
+        self._offset = int(self.opinions.min()) if self.num_nodes else 0
+        self._counts = np.bincount(self.opinions - self._offset)
+
+    def step(self) -> None:
+        if self.synchronous:
+            self.sweep()
+        else:
+            self.update_nodes(self.rng.integers(0, self.num_nodes, self.batch_size))
+
+    def sweep(self) -> None:
+        """Synchronously let every node copy a random neighbor's opinion."""
+        nodes = np.arange(self.num_nodes)
+        opinions = self.opinions[self.graph.sample_neighbors(nodes, self.rng)]
+        if self.frozen is not None:
+            opinions[self.frozen] = self.opinions[self.frozen]
+        self.opinions = opinions
+        self._counts = np.bincount(
+            self.opinions - self._offset, minlength=len(self._counts)
+        )
+        self.num_updates += self.num_nodes
+        self.time += 1.0
+
+    def update_nodes(self, nodes: np.ndarray) -> None:
+        """
+        Let ``nodes`` copy a random neighbor, one after another in array order.
+
+        Args:
+            nodes: Nodes to update; repeats are allowed
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        num_activated = len(nodes)
+        if self.frozen is not None:
+            nodes = nodes[~self.frozen[nodes]]
+        sources = self.graph.sample_neighbors(nodes, self.rng)
+        written, values = self._copier.resolve(self.opinions, nodes, sources)
+        self._counts -= np.bincount(
+            self.opinions[written] - self._offset, minlength=len(self._counts)
+        )
+        self._counts += np.bincount(values - self._offset, minlength=len(self._counts))
+        self.opinions[written] = values
+        self.num_updates += num_activated
+        self.time += num_activated / self.num_nodes
+
+    def set_opinions(self, nodes: np.ndarray, values: np.ndarray) -> None:
+        super().set_opinions(nodes, values)
+        self._recount()
+
+    def is_consensus(self) -> bool:
+        return bool(self._counts.max() == self.num_nodes)
+
+
+class ActiveLinkVoterModel(ArrayInteraction, VoterModel):
+    """
+    Continuous-time voter model that only samples discordant (active) edges.
+
+    In the node-update voter model every node activates at rate 1 and copies
+    a uniformly chosen neighbor, so the directed edge (i, j) fires at rate
+    1 / deg(i). Only edges whose endpoints disagree can change anything; they
+    are kept in an IndexedSet, proposed uniformly at rate 1 / min_degree each
+    and accepted with probability min_degree / deg(i). Waiting times between
+    proposals are exponential, so ``self.time`` (in sweeps) and every other
+    statistic match the naive model, while updates that cannot change an
+    opinion are never drawn.
+
+    Frozen nodes never copy, so their outgoing edges are never active;
+    ``freeze`` and ``set_opinions`` rebuild the entries of the edges they
+    touch.
+    """
+
+    def __init__(
+        self,
+        graph,
+        opinions: Optional[np.ndarray] = None,
+        seed=None,
+        block_size: int = 4096,
+    ):
+        """
+        Initialize the active-link voter model.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on
+            opinions: Initial opinions (random {-1, 1} if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+            block_size: Number of random variates drawn from NumPy at a time
+        """
+        super().__init__(graph, opinions=opinions, seed=seed)
+        sources = self.graph.edge_sources()
+        self._sources = array("q", sources.tobytes())
+        self._targets = array("q", self.graph.indices.tobytes())
+        self._reverse = array("q", self.graph.reverse_edges().tobytes())
+        self._indptr = array("q", self.graph.indptr.tobytes())
+        degree = self.graph.degree
+        self._degree = array("q", degree.tobytes())
+        self._min_degree = int(degree[degree > 0].min()) if degree.any() else 1
+        self._state = self.opinions.tolist()
+        self._frozen = bytearray(self.num_nodes)
+        discordant = self.opinions[sources] != self.opinions[self.graph.indices]
+        self.active = IndexedSet(
+            len(self._targets), np.flatnonzero(discordant).tolist()
+        )
+        self.block_size = block_size
+        self.num_proposals = 0
+
+    def freeze(self, nodes: np.ndarray) -> None:
+        previous = np.flatnonzero(self._frozen)
+        super().freeze(nodes)
+        self._frozen = bytearray(self.num_nodes)
+        if self.frozen is not None:
+            self._frozen = bytearray(self.frozen.astype(np.uint8).tobytes())
+        self._refresh(np.union1d(previous, np.asarray(nodes, dtype=np.int64)))
+
+    def set_opinions(self, nodes: np.ndarray, values: np.ndarray) -> None:
+        super().set_opinions(nodes, values)
+        nodes = np.asarray(nodes, dtype=np.int64)
+        for node, opinion in zip(nodes.tolist(), self.opinions[nodes].tolist()):
+            self._state[node] = opinion
+        self._refresh(nodes)
+
+    def _refresh(self, nodes: np.ndarray) -> None:
+        """Recompute whether every edge touching ``nodes`` is active."""
+        state, frozen, targets = self._state, self._frozen, self._targets
+        for node in np.unique(nodes).tolist():
+            for position in range(self._indptr[node], self._indptr[node + 1]):
+                target, reverse = targets[position], self._reverse[position]
+                discordant = state[node] != state[target]
+                for edge, source in ((position, node), (reverse, target)):
+                    if discordant and not frozen[source]:
+                        self.active.add(edge)
+                    else:
+                        self.active.remove(edge)
+
+    def step(self) -> None:
+        """Advance until one opinion has changed (or no active edge is left)."""
+        self._advance(float("inf"), max_flips=1)
+
+    def run(self, max_time: float, stop_at_consensus: bool = True) -> float:
+        end = self.time + max_time
+        self._advance(end, max_flips=None)
+        if not len(self.active):
+            if not self.is_consensus():
+                # Only frozen nodes disagree, so nothing can change any more.
+                self.time = end
+            else:
+                if self.consensus_time is None:
+                    self.consensus_time = self.time
+                if not stop_at_consensus:
+                    self.time = end
+        return self.time
+
+    def is_consensus(self) -> bool:
+        """True once no discordant edge is left (consensus on every component)."""
+        if len(self.active):
+            return False
+        if self.frozen is None:
+            return True
+        sources = self.graph.edge_sources()
+        return not (self.opinions[sources] != self.opinions[self.graph.indices]).any()
+
+    def _advance(self, end_time: float, max_flips: Optional[int]) -> None:
+        active, items = self.active, self.active.items
+        sources, targets, reverse = self._sources, self._targets, self._reverse
+        indptr, degree, state = self._indptr, self._degree, self._state
+        frozen = self._frozen
+        min_degree = self._min_degree
+        waits, uniforms = [], []
+        flips = 0
+
+        while len(items) and (max_flips is None or flips < max_flips):
+            if not waits:
+                waits = self.rng.standard_exponential(self.block_size).tolist()
+                uniforms = self.rng.random(2 * self.block_size).tolist()
+            wait = waits.pop() * min_degree / len(items)
+            if self.time + wait > end_time:
+                self.time = end_time
+                break
+            self.time += wait
+            self.num_proposals += 1
+
+            edge = items[int(uniforms.pop() * len(items))]
+            node = sources[edge]
+            if uniforms.pop() * degree[node] >= min_degree:
+                continue
+
+            opinion = state[targets[edge]]
+            state[node] = opinion
+            self.opinions[node] = opinion
+            for position in range(indptr[node], indptr[node + 1]):
+                target = targets[position]
+                if state[target] != opinion:
+                    active.add(position)
+                    if not frozen[target]:
+                        active.add(reverse[position])
+                else:
+                    active.remove(position)
+                    active.remove(reverse[position])
+            flips += 1
+
+        self.num_updates += flips
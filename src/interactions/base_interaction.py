@@ -1,7 +1,110 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from environments.CSRGraph import as_csr_graph
 
 
 class BaseInteraction(ABC):
     @abstractmethod
     def interact(self, agent, neighbors):
         pass
+
+
+class ArrayInteraction(BaseInteraction):
+    """
+    Base class for interaction models that keep every opinion in one array.
+
+    Subclasses advance ``self.opinions`` in place over a shared CSR adjacency
+    instead of going through agent objects. Time is measured in sweeps: one
+    unit of ``self.time`` corresponds to ``num_nodes`` node updates.
+    """
+
+    def __init__(self, graph, opinions: Optional[np.ndarray] = None, seed=None):
+        """
+        Initialize the array-backed interaction model.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment to run on
+            opinions: Initial opinions, one per node (drawn at random if omitted)
+            seed: Seed or ``numpy.random.Generator`` for all random draws
+        """
+        self.graph = as_csr_graph(graph)
+        self.num_nodes = self.graph.num_nodes
+        self.rng = np.random.default_rng(seed)
+        if opinions is None:
+            opinions = self.initial_opinions(self.num_nodes)
+        self.opinions = np.array(opinions)
+        if self.opinions.shape != (self.num_nodes,):
+            raise ValueError(
+                f"Expected {self.num_nodes} opinions, got shape {self.opinions.shape}"
+            )
+        self.time = 0.0
+        self.num_updates = 0
+        self.consensus_time: Optional[float] = None
+        self.frozen: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_agents(cls, graph, agents: List[BaseAgent], **kwargs):
+        """Create the model with opinions taken from ``agents``, in node order."""
+        opinions = np.array([agent.get_opinion() for agent in agents])
+        return cls(graph, opinions=opinions, **kwargs)
+
+    def update_agents(self, agents: List[BaseAgent]) -> None:
+        """Write the current opinions back onto ``agents``, in node order."""
+        for agent, opinion in zip(agents, self.opinions.tolist()):
+            agent.set_opinion(opinion)
+
+    def freeze(self, nodes: np.ndarray) -> None:
+        """
+        Keep the opinions of ``nodes`` fixed under the dynamics.
+
+        Frozen nodes still influence their neighbors; only ``set_opinions``
+        changes them. Freezing again replaces the previous set.
+
+        Args:
+            nodes: Nodes to freeze (an empty array unfreezes everything)
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if not len(nodes):
+            self.frozen = None
+            return
+        self.frozen = np.zeros(self.num_nodes, dtype=bool)
+        self.frozen[nodes] = True
+
+    def set_opinions(self, nodes: np.ndarray, values: np.ndarray) -> None:
+        """Overwrite the opinions of ``nodes`` from outside the dynamics."""
+        self.opinions[np.asarray(nodes, dtype=np.int64)] = values
+
+    def initial_opinions(self, num_nodes: int) -> np.ndarray:
+        """Draw uniformly random binary opinions in {-1, 1}."""
+        return self.rng.choice(np.array([-1, 1], dtype=np.int8), size=num_nodes)
+
+    @abstractmethod
+    def step(self) -> None:
+        """Advance the dynamics by one batch of updates."""
+
+    def is_consensus(self) -> bool:
+        return bool(self.opinions.min() == self.opinions.max())
+
+    def run(self, max_time: float, stop_at_consensus: bool = True) -> float:
+        """
+        Step the dynamics until ``max_time`` sweeps have elapsed.
+
+        Args:
+            max_time: Simulated time (in sweeps) to run for
+            stop_at_consensus: Stop as soon as all opinions agree
+
+        Returns:
+            Simulated time at which the run stopped
+        """
+        end = self.time + max_time
+        while self.time < end:
+            if stop_at_consensus and self.is_consensus():
+                break
+            self.step()
+        if self.consensus_time is None and self.is_consensus():
+            self.consensus_time = self.time
+        return self.time
@@ -1,7 +1,6 @@
 import json
 import os
 from urllib import request
-import ollama
 from typing import Dict, Any, Optional
 from .base import LLMClient
 
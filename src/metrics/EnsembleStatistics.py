@@ -0,0 +1,285 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Real
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from configs.configs import ModelType, SimulationConfig, TopologyType
+
+GroupKey = Tuple[TopologyType, ModelType]
+
+
+def _bootstrap_chunk(
+    values: np.ndarray, size: int, seed: np.random.SeedSequence
+) -> np.ndarray:
+    """Means of ``size`` resamples of ``values``, drawn as one index matrix."""
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(values), size=(size, len(values)))
+    return values[index].mean(axis=1)
+
+
+def _chunk_size(num_values: int, n_resamples: int) -> int:
+    # Keep each index matrix around a million entries.
+    return max(1, min(n_resamples, (1 << 20) // max(num_values, 1)))
+
+
+def bootstrap_means(
+    samples: Sequence[np.ndarray],
+    n_resamples: int = 2000,
+    seed: Optional[int] = 0,
+    max_workers: Optional[int] = 1,
+) -> List[np.ndarray]:
+    """
+    Bootstrap distributions of the mean of several samples.
+
+    Resamples are drawn in chunks of at most about a million indices, each
+    from its own seed spawned from ``seed``, and the chunks of all samples
+    are spread over one process pool. Results do not depend on
+    ``max_workers``.
+
+    Args:
+        samples: One array of observations per group
+        n_resamples: Resamples per group
+        seed: Root of the resampling seeds
+        max_workers: Worker processes (None: CPU count; 1 runs inline)
+
+    Returns:
+        The ``n_resamples`` resampled means of every sample; empty for an
+        empty sample
+    """
+    samples = [np.asarray(sample, dtype=np.float64) for sample in samples]
+    tasks = []
+    group_seeds = np.random.SeedSequence(seed).spawn(len(samples))
+    for group, values in enumerate(samples):
+        if not len(values):
+            continue
+        size = _chunk_size(len(values), n_resamples)
+        sizes = [size] * (n_resamples // size)
+        if n_resamples % size:
+            sizes.append(n_resamples % size)
+        seeds = group_seeds[group].spawn(len(sizes))
+        tasks.extend((group, values, size, s) for size, s in zip(sizes, seeds))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) < 2:
+        means = [_bootstrap_chunk(values, size, s) for _, values, size, s in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            means = list(
+                executor.map(
+                    _bootstrap_chunk,
+                    *zip(*((values, size, s) for _, values, size, s in tasks)),
+                )
+            )
+
+    chunks: Dict[int, List[np.ndarray]] = {}
+    for (group, *_), chunk in zip(tasks, means):
+        chunks.setdefault(group, []).append(chunk)
+    return [
+        np.concatenate(chunks[group]) if group in chunks else np.empty(0)
+        for group in range(len(samples))
+    ]
+
+
+class _StepMoments:
+    """Per-step count, sum and sum of squares across runs, grown on demand."""
+
+    def __init__(self):
+        self.count = np.zeros(0, dtype=np.int64)
+        self.sum = np.zeros(0)
+        self.squares = np.zeros(0)
+
+    def add(self, step: int, value: float) -> None:
+        if step >= len(self.count):
+            size = max(step + 1, 2 * len(self.count))
+            for name in ("count", "sum", "squares"):
+                column = getattr(self, name)
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[: len(column)] = column
+                setattr(self, name, grown)
+        self.count[step] += 1
+        self.sum[step] += value
+        self.squares[step] += value * value
+
+
+class EnsembleStatistics:
+    """
+    Cross-run statistics of simulation metrics, grouped by topology and model.
+
+    Runs are fed in as streams of metric records, such as
+    ``StreamingMetrics.snapshot`` or ``NetworkMetrics.snapshot`` dicts, or
+    as ``ReplicaResult`` objects from ``EnsembleRunner``. A stream is
+    consumed once and never stored: each run keeps only the last value of
+    every scalar metric, and the trajectories are folded into per-step sums
+    shared by all runs of a group. Memory thus grows with the number of runs
+    and steps, not with their product.
+
+    ``summary`` reports the mean, spread and quantiles of the final values
+    per (TopologyType, ModelType), with a percentile bootstrap confidence
+    interval of the mean computed by ``bootstrap_means``.
+    """
+
+    def __init__(
+        self,
+        quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+        n_resamples: int = 2000,
+        confidence: float = 0.95,
+        seed: Optional[int] = 0,
+        max_workers: Optional[int] = 1,
+    ):
+        """
+        Create an empty aggregate.
+
+        Args:
+            quantiles: Quantiles of the final values to report
+            n_resamples: Bootstrap resamples per group
+            confidence: Coverage of the bootstrap intervals
+            seed: Seed of the bootstrap resampling
+            max_workers: Processes for the bootstrap (None: CPU count)
+        """
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be in (0, 1)")
+        if n_resamples < 1:
+            raise ValueError("n_resamples must be at least 1")
+        self.quantiles = tuple(quantiles)
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.max_workers = max_workers
+        self.final_values: Dict[GroupKey, Dict[str, List[float]]] = {}
+        self._trajectories: Dict[GroupKey, Dict[str, _StepMoments]] = {}
+        self.runs: Dict[GroupKey, int] = {}
+
+    @staticmethod
+    def group_of(config: SimulationConfig) -> GroupKey:
+        return TopologyType(config.topology), ModelType(config.model_type)
+
+    def add_run(
+        self, config: SimulationConfig, records: Iterable[Mapping[str, object]]
+    ) -> None:
+        """
+        Consume the metric stream of one run.
+
+        Args:
+            config: Configuration of the run, which selects its group
+            records: Metric dicts in step order; the step is taken from a
+                ``"step"`` entry when present and from the position otherwise.
+                Non-scalar and missing (None) values are skipped.
+        """
+        group = self.group_of(config)
+        trajectories = self._trajectories.setdefault(group, {})
+        last: Dict[str, float] = {}
+        for position, record in enumerate(records):
+            step = record.get("step")
+            step = position if step is None else int(step)
+            for name, value in record.items():
+                if name == "step" or not isinstance(value, Real):
+                    continue
+                value = float(value)
+                if np.isnan(value):
+                    continue
+                last[name] = value
+                trajectories.setdefault(name, _StepMoments()).add(step, value)
+
+        finals = self.final_values.setdefault(group, {})
+        for name, value in last.items():
+            finals.setdefault(name, []).append(value)
+        self.runs[group] = self.runs.get(group, 0) + 1
+
+    def add_result(self, config: SimulationConfig, result) -> None:
+        """Add an ``EnsembleRunner`` ``ReplicaResult`` as a one-record run."""
+        self.add_run(
+            config,
+            [{name: value for name, value in result if name != "replica"}],
+        )
+
+    def collector(self, config: SimulationConfig) -> Callable:
+        """Callback for ``EnsembleRunner.run`` adding each replica of ``config``."""
+        return lambda result: self.add_result(config, result)
+
+    def metrics(self) -> List[str]:
+        names = {name for finals in self.final_values.values() for name in finals}
+        return sorted(names)
+
+    def trajectory(self, group: GroupKey, metric: str) -> Dict[str, np.ndarray]:
+        """
+        Mean trajectory of ``metric`` over the runs of ``group``.
+
+        Returns:
+            Arrays ``step``, ``count``, ``mean`` and ``std`` over the steps at
+            which at least one run recorded the metric
+        """
+        moments = self._trajectories.get(group, {}).get(metric, _StepMoments())
+        steps = np.flatnonzero(moments.count)
+        count = moments.count[steps]
+        mean = moments.sum[steps] / count
+        variance = np.maximum(moments.squares[steps] / count - mean**2, 0.0)
+        return {"step": steps, "count": count, "mean": mean, "std": np.sqrt(variance)}
+
+    def summary(self, metric: str) -> List[Dict[str, object]]:
+        """
+        Statistics of the final value of ``metric`` in every group.
+
+        Returns:
+            One row per group that recorded the metric, ordered by topology
+            and model, with ``topology``, ``model_type``, ``runs``, ``mean``,
+            ``std``, one ``q<percent>`` entry per quantile and the bootstrap
+            interval ``ci_low`` and ``ci_high``
+        """
+        groups = sorted(
+            (
+                group
+                for group in self.final_values
+                if metric in self.final_values[group]
+            ),
+            key=lambda group: (group[0].value, group[1].value),
+        )
+        samples = [np.array(self.final_values[group][metric]) for group in groups]
+        resampled = bootstrap_means(
+            samples, self.n_resamples, self.seed, self.max_workers
+        )
+        tail = (1 - self.confidence) / 2
+        rows = []
+        for group, values, means in zip(groups, samples, resampled):
+            row = {
+                "topology": group[0].value,
+                "model_type": group[1].value,
+                "runs": len(values),
+                "mean": float(values.mean()),
+                "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+            }
+            for q, value in zip(self.quantiles, np.quantile(values, self.quantiles)):
+                row[f"q{q * 100:g}"] = float(value)
+            row["ci_low"], row["ci_high"] = (
+                float(bound) for bound in np.quantile(means, [tail, 1 - tail])
+            )
+            rows.append(row)
+        return rows
+
+    def comparison_table(self, metric: str) -> str:
+        """``summary`` of ``metric`` as an aligned text table."""
+        rows = self.summary(metric)
+        if not rows:
+            return f"No runs recorded {metric}"
+        columns = list(rows[0])
+        cells = [
+            [
+                f"{row[c]:.4g}" if isinstance(row[c], float) else str(row[c])
+                for c in columns
+            ]
+            for row in rows
+        ]
+        widths = [
+            max(len(column), *(len(line[i]) for line in cells))
+            for i, column in enumerate(columns)
+        ]
+        lines = [
+            "  ".join(column.ljust(width) for column, width in zip(columns, widths))
+        ]
+        lines.append("  ".join("-" * width for width in widths))
+        lines.extend(
+            "  ".join(cell.ljust(width) for cell, width in zip(line, widths))
+            for line in cells
+        )
+        return f"{metric}\n" + "\n".join(lines)
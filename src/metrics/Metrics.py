@@ -4,8 +4,22 @@ class Metrics:
         return sum(agent.opinion for agent in agents) / len(agents)
 
     @staticmethod
-    def compute_opinion_distribution(agents):
-        positives = sum(1 for agent in agents if agent.opinion == 1)
-        neutrals = sum(1 for agent in agents if agent.opinion == 0)
-        negatives = sum(1 for agent in agents if agent.opinion == -1)
+    def compute_opinion_distribution(agents, neutral_band=0.0):
+        """
+        Count agents by the sign of their opinion, in a single pass.
+
+        Args:
+            agents: Agents with discrete (-1, 0, 1) or continuous opinions
+            neutral_band: Opinions with ``|opinion| <= neutral_band`` are neutral
+
+        Returns:
+            Counts of positive, neutral and negative opinions
+        """
+        positives = negatives = 0
+        for agent in agents:
+            if agent.opinion > neutral_band:
+                positives += 1
+            elif agent.opinion < -neutral_band:
+                negatives += 1
+        neutrals = len(agents) - positives - negatives
         return {"positive": positives, "neutral": neutrals, "negative": negatives}
@@ -0,0 +1,283 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from environments.CSRGraph import CSRGraph, as_csr_graph
+
+# Opinion camps, used as column indices of the neighbor camp counts.
+NEGATIVE, NEUTRAL, POSITIVE = 0, 1, 2
+
+
+def opinion_camps(opinions: np.ndarray, neutral_band: float = 0.0) -> np.ndarray:
+    """Camp of every opinion: NEGATIVE, NEUTRAL or POSITIVE."""
+    opinions = np.asarray(opinions, dtype=np.float64)
+    return np.where(
+        opinions > neutral_band,
+        POSITIVE,
+        np.where(opinions < -neutral_band, NEGATIVE, NEUTRAL),
+    ).astype(np.int64)
+
+
+def modularity(graph, labels: np.ndarray) -> float:
+    """
+    Newman modularity of a partition of the nodes.
+
+    Args:
+        graph: CSRGraph, networkx graph or GraphEnvironment
+        labels: Non-negative integer group of every node
+
+    Returns:
+        Modularity in [-1/2, 1]; 0 for a graph without edges
+    """
+    graph = as_csr_graph(graph)
+    labels = np.asarray(labels, dtype=np.int64)
+    directed_edges = len(graph.indices)
+    if not directed_edges:
+        return 0.0
+    groups = labels.max() + 1
+    inside = np.count_nonzero(labels[graph.edge_sources()] == labels[graph.indices])
+    degree_sums = np.bincount(labels, weights=graph.degree, minlength=groups)
+    return inside / directed_edges - float(np.sum((degree_sums / directed_edges) ** 2))
+
+
+def bimodality_coefficient(
+    count: int, s1: float, s2: float, s3: float, s4: float
+) -> float:
+    """
+    Sample bimodality coefficient from the power sums of the opinions.
+
+    ``(g^2 + 1) / (k + 3 (n - 1)^2 / ((n - 2)(n - 3)))`` with the sample
+    skewness ``g`` and excess kurtosis ``k``; above 5/9 (the value of a
+    uniform distribution) suggests a bimodal distribution.
+    """
+    n = count
+    if n < 4:
+        return float("nan")
+    mean = s1 / n
+    m2 = s2 / n - mean**2
+    if m2 <= 1e-15:
+        return float("nan")
+    m3 = s3 / n - 3 * mean * s2 / n + 2 * mean**3
+    m4 = s4 / n - 4 * mean * s3 / n + 6 * mean**2 * s2 / n - 3 * mean**4
+    skewness = m3 / m2**1.5 * np.sqrt(n * (n - 1)) / (n - 2)
+    excess = (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * (m4 / m2**2) - 3 * (n - 1))
+    return float((skewness**2 + 1) / (excess + 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))))
+
+
+def _correlation(n, sx, sy, sxx, syy, sxy) -> float:
+    if not n:
+        return float("nan")
+    covariance = sxy / n - (sx / n) * (sy / n)
+    variance = (sxx / n - (sx / n) ** 2) * (syy / n - (sy / n) ** 2)
+    if variance <= 1e-24:
+        return float("nan")
+    return float(covariance / np.sqrt(variance))
+
+
+class NetworkMetrics:
+    """
+    Polarization metrics that depend on who is connected to whom.
+
+    - ``assortativity``: correlation of the opinions at the two ends of an edge
+    - ``discordant_fraction``: fraction of edges joining opposite camps
+    - ``echo_chamber``: correlation between a node's opinion and the mean
+      opinion of its neighbors
+    - ``bimodality``: bimodality coefficient of the opinion distribution
+    - ``camp_modularity``: modularity of the partition into opinion camps,
+      i.e. how segregated the camps are
+    - ``community_alignment``: share of the opinion variance lying between
+      the given communities (needs ``communities``)
+
+    Construction costs a few sparse products. Afterwards ``update`` replaces
+    one opinion in O(degree) by adjusting running sums, neighbor sums and
+    neighbor camp counts, and ``snapshot`` is O(1); ``recompute`` starts over.
+    """
+
+    def __init__(
+        self,
+        graph,
+        opinions: np.ndarray,
+        communities: Optional[np.ndarray] = None,
+        neutral_band: float = 0.0,
+    ):
+        """
+        Compute all metrics for the current opinions.
+
+        Args:
+            graph: CSRGraph, networkx graph or GraphEnvironment
+            opinions: Opinion of every node
+            communities: Integer community of every node, e.g. from
+                ``GraphEnvironment.communities``
+            neutral_band: Opinions with ``|x| <= neutral_band`` are neutral
+        """
+        self.graph: CSRGraph = as_csr_graph(graph)
+        self.opinions = np.array(opinions, dtype=np.float64)
+        if len(self.opinions) != self.graph.num_nodes:
+            raise ValueError("Expected one opinion per node")
+        self.neutral_band = neutral_band
+        self.communities = None
+        if communities is not None:
+            self.communities = np.asarray(communities, dtype=np.int64)
+        self.recompute()
+
+    def recompute(self) -> None:
+        """Rebuild all running sums from the stored opinions."""
+        graph, x = self.graph, self.opinions
+        degree = graph.degree.astype(np.float64)
+        self._connected = graph.degree > 0
+        self._inverse_degree = np.divide(
+            1.0, degree, out=np.zeros_like(degree), where=self._connected
+        )
+
+        self.power_sums = np.array([x.sum(), x @ x, np.sum(x**3), np.sum(x**4)])
+
+        # Edge-end sums for the assortativity.
+        self.neighbor_sums = graph.neighbor_sum(x)
+        self._x_a_x = float(x @ self.neighbor_sums)
+        self._degree_x = float(degree @ x)
+        self._degree_xx = float(degree @ (x * x))
+
+        # Node vs. mean neighbor opinion, over nodes with neighbors.
+        y = self.neighbor_sums * self._inverse_degree
+        mask = self._connected
+        self._echo = np.array(
+            [
+                np.count_nonzero(mask),
+                x[mask].sum(),
+                y[mask].sum(),
+                x[mask] @ x[mask],
+                y[mask] @ y[mask],
+                x[mask] @ y[mask],
+            ]
+        )
+
+        # Directed edge counts between camps and camp degree sums.
+        self.camps = opinion_camps(x, self.neutral_band)
+        indicator = np.zeros((graph.num_nodes, 3), dtype=np.int64)
+        indicator[np.arange(graph.num_nodes), self.camps] = 1
+        self.camp_neighbors = np.asarray(graph.neighbor_sum(indicator), dtype=np.int64)
+        self.camp_edges = indicator.T @ self.camp_neighbors
+        self.camp_degrees = np.bincount(
+            self.camps, weights=graph.degree, minlength=3
+        ).astype(np.int64)
+
+        if self.communities is not None:
+            groups = self.communities.max() + 1
+            self._community_count = np.bincount(self.communities, minlength=groups)
+            self._community_sum = np.bincount(
+                self.communities, weights=x, minlength=groups
+            )
+
+    def update(self, node: int, opinion: float) -> None:
+        """Replace the opinion of ``node``, in O(degree)."""
+        old = self.opinions[node]
+        delta = opinion - old
+        if not delta:
+            return
+        graph = self.graph
+        neighbors = graph.neighbors(node)
+        degree = len(neighbors)
+        self.opinions[node] = opinion
+        self.power_sums += [opinion**k - old**k for k in range(1, 5)]
+
+        self._x_a_x += 2 * delta * self.neighbor_sums[node]
+        self._degree_x += degree * delta
+        self._degree_xx += degree * (opinion**2 - old**2)
+
+        if degree:
+            # The node's own term of the echo-chamber sums...
+            y = self.neighbor_sums[node] * self._inverse_degree[node]
+            self._echo[1:] += [delta, 0.0, opinion**2 - old**2, 0.0, delta * y]
+            # ...then its neighbors' mean neighbor opinions shift.
+            x_n = self.opinions[neighbors]
+            y_old = self.neighbor_sums[neighbors] * self._inverse_degree[neighbors]
+            y_new = y_old + delta * self._inverse_degree[neighbors]
+            self._echo[2] += np.sum(y_new - y_old)
+            self._echo[4] += np.sum(y_new**2 - y_old**2)
+            self._echo[5] += x_n @ (y_new - y_old)
+        self.neighbor_sums[neighbors] += delta
+
+        camp = opinion_camps(np.array([opinion]), self.neutral_band)[0]
+        previous = self.camps[node]
+        if camp != previous:
+            counts = self.camp_neighbors[node]
+            self.camp_edges[previous, :] -= counts
+            self.camp_edges[:, previous] -= counts
+            self.camp_edges[camp, :] += counts
+            self.camp_edges[:, camp] += counts
+            self.camp_degrees[previous] -= degree
+            self.camp_degrees[camp] += degree
+            np.subtract.at(self.camp_neighbors[:, previous], neighbors, 1)
+            np.add.at(self.camp_neighbors[:, camp], neighbors, 1)
+            self.camps[node] = camp
+
+        if self.communities is not None:
+            self._community_sum[self.communities[node]] += delta
+
+    def assortativity(self) -> float:
+        directed_edges = len(self.graph.indices)
+        if not directed_edges:
+            return float("nan")
+        mean = self._degree_x / directed_edges
+        variance = self._degree_xx / directed_edges - mean**2
+        if variance <= 1e-15:
+            return float("nan")
+        return float((self._x_a_x / directed_edges - mean**2) / variance)
+
+    def discordant_fraction(self) -> float:
+        directed_edges = len(self.graph.indices)
+        if not directed_edges:
+            return 0.0
+        return float(2 * self.camp_edges[NEGATIVE, POSITIVE] / directed_edges)
+
+    def echo_chamber(self) -> float:
+        return _correlation(*self._echo)
+
+    def bimodality(self) -> float:
+        return bimodality_coefficient(len(self.opinions), *self.power_sums)
+
+    def camp_modularity(self) -> float:
+        directed_edges = len(self.graph.indices)
+        if not directed_edges:
+            return 0.0
+        inside = np.trace(self.camp_edges) / directed_edges
+        return float(inside - np.sum((self.camp_degrees / directed_edges) ** 2))
+
+    def community_alignment(self) -> float:
+        """Between-community share of the opinion variance (eta squared)."""
+        if self.communities is None:
+            raise ValueError("No communities given")
+        n = len(self.opinions)
+        s1, s2 = self.power_sums[0], self.power_sums[1]
+        total = s2 - s1**2 / n
+        if total <= 1e-12:
+            return float("nan")
+        present = self._community_count > 0
+        between = (
+            np.sum(self._community_sum[present] ** 2 / self._community_count[present])
+            - s1**2 / n
+        )
+        return float(np.clip(between / total, 0.0, 1.0))
+
+    def snapshot(self) -> Dict[str, float]:
+        """All metrics at the current opinions."""
+        metrics = {
+            "assortativity": self.assortativity(),
+            "discordant_fraction": self.discordant_fraction(),
+            "echo_chamber": self.echo_chamber(),
+            "bimodality": self.bimodality(),
+            "camp_modularity": self.camp_modularity(),
+        }
+        if self.communities is not None:
+            metrics["community_alignment"] = self.community_alignment()
+        return metrics
+
+
+def network_metrics(
+    graph,
+    opinions: np.ndarray,
+    communities: Optional[np.ndarray] = None,
+    neutral_band: float = 0.0,
+) -> Dict[str, float]:
+    """All ``NetworkMetrics`` of one opinion vector, without tracking."""
+    return NetworkMetrics(graph, opinions, communities, neutral_band).snapshot()
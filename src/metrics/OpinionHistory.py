@@ -0,0 +1,338 @@
+import json
+import os
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# One file per column; records of a spilled chunk are sorted by agent, then step.
+COLUMNS = (("step", np.int32), ("agent", np.int32), ("opinion", np.float32))
+INDEX_FILE = "index.json"
+
+
+class OpinionHistory:
+    """
+    Columnar store of (step, agent, opinion) records.
+
+    Records are appended to preallocated NumPy buffers of ``chunk_size``
+    rows. A full buffer is sorted by agent and spilled to one raw file per
+    column in ``directory``, which is read back through ``numpy.memmap``, so
+    only the current chunk lives in RAM (12 bytes per record). A small JSON
+    index keeps the offset and step range of every chunk:
+
+    - step-range queries only touch chunks overlapping the range
+    - agent queries binary-search the sorted agent column of each chunk
+    - per-step aggregates reduce chunk by chunk
+
+    Steps must not decrease between ``record`` calls.
+    """
+
+    def __init__(self, directory: Optional[str] = None, chunk_size: int = 1 << 20):
+        """
+        Create an empty store.
+
+        Args:
+            directory: Where the column files go (default: a new temporary
+                directory); must not hold a store already, see ``open``
+            chunk_size: Records buffered in memory before spilling
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.directory = directory or tempfile.mkdtemp(prefix="opinion-history-")
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(os.path.join(self.directory, INDEX_FILE)):
+            raise FileExistsError(f"{self.directory} already holds an opinion history")
+        self.chunk_size = chunk_size
+        self.chunks: List[Dict[str, int]] = []
+        self._buffer = {name: np.empty(chunk_size, dtype) for name, dtype in COLUMNS}
+        self._size = 0
+        self._spilled = 0
+        self._last_step = None
+        self._columns: Optional[Dict[str, np.memmap]] = None
+        for name, _ in COLUMNS:
+            with open(self._path(name), "wb"):
+                pass
+        self._write_index()
+
+    @classmethod
+    def open(cls, directory: str) -> "OpinionHistory":
+        """Reopen a store written earlier, to query or extend it."""
+        with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as file:
+            index = json.load(file)
+        history = cls.__new__(cls)
+        history.directory = directory
+        history.chunk_size = index["chunk_size"]
+        history.chunks = index["chunks"]
+        history._buffer = {
+            name: np.empty(history.chunk_size, dtype) for name, dtype in COLUMNS
+        }
+        history._size = 0
+        history._spilled = sum(chunk["length"] for chunk in history.chunks)
+        history._last_step = history.chunks[-1]["last"] if history.chunks else None
+        history._columns = None
+        return history
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _write_index(self) -> None:
+        with open(
+            os.path.join(self.directory, INDEX_FILE), "w", encoding="utf-8"
+        ) as file:
+            json.dump({"chunk_size": self.chunk_size, "chunks": self.chunks}, file)
+
+    def __len__(self) -> int:
+        return self._spilled + self._size
+
+    def record(
+        self, step: int, opinions: np.ndarray, agents: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Append the opinions of some or all agents at ``step``.
+
+        Args:
+            step: Simulation step, at least the previous one recorded
+            opinions: Opinion of every recorded agent
+            agents: Agent indices (default: ``0 .. len(opinions) - 1``)
+        """
+        if self._last_step is not None and step < self._last_step:
+            raise ValueError(f"step {step} is before step {self._last_step}")
+        self._last_step = step
+        opinions = np.asarray(opinions, dtype=np.float32).ravel()
+        if agents is None:
+            agents = np.arange(len(opinions), dtype=np.int32)
+        else:
+            agents = np.asarray(agents, dtype=np.int32).ravel()
+            if len(agents) != len(opinions):
+                raise ValueError("Expected one opinion per agent")
+
+        start = 0
+        while start < len(opinions):
+            count = min(self.chunk_size - self._size, len(opinions) - start)
+            end = self._size + count
+            self._buffer["step"][self._size : end] = step
+            self._buffer["agent"][self._size : end] = agents[start : start + count]
+            self._buffer["opinion"][self._size : end] = opinions[start : start + count]
+            self._size = end
+            start += count
+            if self._size == self.chunk_size:
+                self.flush()
+
+    def listener(self, changes_only: bool = True) -> Callable:
+        """
+        Callback for ``DialogueSimulator.add_listener`` recording agent opinions.
+
+        Args:
+            changes_only: Record an agent only when its opinion differs from
+                the last recorded value (always on the first call)
+        """
+        last = None
+
+        def record_opinions(simulator) -> None:
+            nonlocal last
+            opinions = np.array(
+                [agent.get_opinion() for agent in simulator.agents], dtype=np.float32
+            )
+            if not changes_only or last is None or len(last) != len(opinions):
+                self.record(simulator._step, opinions)
+            else:
+                changed = np.flatnonzero(opinions != last)
+                if len(changed):
+                    self.record(simulator._step, opinions[changed], changed)
+            last = opinions
+
+        return record_opinions
+
+    def flush(self) -> None:
+        """Spill the buffered records to disk as one chunk."""
+        if not self._size:
+            return
+        size = self._size
+        order = np.lexsort((self._buffer["step"][:size], self._buffer["agent"][:size]))
+        for name, _ in COLUMNS:
+            with open(self._path(name), "ab") as file:
+                self._buffer[name][:size][order].tofile(file)
+        steps = self._buffer["step"][:size]
+        self.chunks.append(
+            {
+                "offset": self._spilled,
+                "length": size,
+                "first": int(steps[0]),
+                "last": int(steps[size - 1]),
+            }
+        )
+        self._spilled += size
+        self._size = 0
+        self._columns = None
+        self._write_index()
+
+    def close(self) -> None:
+        self.flush()
+        self._columns = None
+
+    def _memmaps(self) -> Dict[str, np.memmap]:
+        if self._columns is None:
+            self._columns = {
+                name: np.memmap(self._path(name), dtype=dtype, mode="r")
+                for name, dtype in COLUMNS
+            }
+        return self._columns
+
+    def _parts(self, first: Optional[int] = None, last: Optional[int] = None):
+        """Column slices of the chunks (and buffer) that may hold steps in range."""
+        if self._spilled:
+            columns = self._memmaps()
+            for chunk in self.chunks:
+                if first is not None and chunk["last"] < first:
+                    continue
+                if last is not None and chunk["first"] > last:
+                    continue
+                start, end = chunk["offset"], chunk["offset"] + chunk["length"]
+                yield {name: columns[name][start:end] for name, _ in COLUMNS}, True
+        if self._size:
+            yield {name: self._buffer[name][: self._size] for name, _ in COLUMNS}, False
+
+    def agent_trajectory(self, agent: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Every recorded opinion of one agent.
+
+        Returns:
+            ``(steps, opinions)`` in step order
+        """
+        steps, opinions = [], []
+        for part, sorted_by_agent in self._parts():
+            if sorted_by_agent:
+                lo, hi = np.searchsorted(part["agent"], [agent, agent + 1])
+                selection = slice(lo, hi)
+            else:
+                selection = part["agent"] == agent
+            steps.append(np.asarray(part["step"][selection]))
+            opinions.append(np.asarray(part["opinion"][selection]))
+        if not steps:
+            return np.empty(0, np.int32), np.empty(0, np.float32)
+        return np.concatenate(steps), np.concatenate(opinions)
+
+    def step_range(
+        self, first: int, last: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Records with ``first <= step <= last``.
+
+        Returns:
+            ``(steps, agents, opinions)`` sorted by step, then agent
+        """
+        selected = {name: [] for name, _ in COLUMNS}
+        for part, _ in self._parts(first, last):
+            mask = (part["step"] >= first) & (part["step"] <= last)
+            for name, _ in COLUMNS:
+                selected[name].append(np.asarray(part[name][mask]))
+        if not selected["step"]:
+            return tuple(np.empty(0, dtype) for _, dtype in COLUMNS)
+        steps, agents, opinions = (
+            np.concatenate(selected[name]) for name, _ in COLUMNS
+        )
+        order = np.lexsort((agents, steps))
+        return steps[order], agents[order], opinions[order]
+
+    def step_aggregates(
+        self, first: Optional[int] = None, last: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Statistics of the opinions recorded at each step.
+
+        Args:
+            first: First step included (default: all)
+            last: Last step included (default: all)
+
+        Returns:
+            Arrays ``step``, ``count``, ``mean``, ``std``, ``min`` and ``max``
+            over the recorded steps, in step order
+        """
+        partial = []
+        for part, _ in self._parts(first, last):
+            steps = np.asarray(part["step"])
+            values = np.asarray(part["opinion"], dtype=np.float64)
+            if first is not None or last is not None:
+                mask = np.ones(len(steps), dtype=bool)
+                if first is not None:
+                    mask &= steps >= first
+                if last is not None:
+                    mask &= steps <= last
+                steps, values = steps[mask], values[mask]
+            if len(steps):
+                partial.append(_step_statistics(steps, values))
+        if not partial:
+            empty = np.empty(0)
+            return {
+                "step": np.empty(0, np.int32),
+                "count": np.empty(0, np.int64),
+                "mean": empty,
+                "std": empty,
+                "min": empty,
+                "max": empty,
+            }
+
+        # Steps split between chunks are merged in a second reduction.
+        merged = _reduce_by_step(
+            *(
+                np.concatenate([p[key] for p in partial])
+                for key in ("step", "count", "sum", "squares", "min", "max")
+            )
+        )
+        count = merged["count"]
+        mean = merged["sum"] / count
+        variance = np.maximum(merged["squares"] / count - mean**2, 0.0)
+        return {
+            "step": merged["step"],
+            "count": count,
+            "mean": mean,
+            "std": np.sqrt(variance),
+            "min": merged["min"],
+            "max": merged["max"],
+        }
+
+
+def _reduce_by_step(
+    steps: np.ndarray,
+    count: np.ndarray,
+    total: np.ndarray,
+    squares: np.ndarray,
+    minimum: np.ndarray,
+    maximum: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Combine partial statistics that share a step, with one sort."""
+    order = np.argsort(steps, kind="stable")
+    steps = steps[order]
+    starts = np.flatnonzero(np.r_[True, steps[1:] != steps[:-1]])
+    return {
+        "step": steps[starts],
+        "count": np.add.reduceat(count[order], starts),
+        "sum": np.add.reduceat(total[order], starts),
+        "squares": np.add.reduceat(squares[order], starts),
+        "min": np.minimum.reduceat(minimum[order], starts),
+        "max": np.maximum.reduceat(maximum[order], starts),
+    }
+
+
+def _step_statistics(steps: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-step statistics of one chunk, counting by step offset."""
+    first = steps.min()
+    keys = steps - first
+    if keys.max() >= 1 << 16:
+        ones = np.ones(len(steps), dtype=np.int64)
+        return _reduce_by_step(steps, ones, values, values**2, values, values)
+
+    count = np.bincount(keys)
+    present = np.flatnonzero(count)
+    # NumPy radix-sorts 16-bit keys in linear time.
+    order = np.argsort(keys.astype(np.uint16), kind="stable")
+    starts = np.cumsum(count[present]) - count[present]
+    ordered = values[order]
+    return {
+        "step": present + first,
+        "count": count[present],
+        "sum": np.bincount(keys, weights=values)[present],
+        "squares": np.bincount(keys, weights=values * values)[present],
+        "min": np.minimum.reduceat(ordered, starts),
+        "max": np.maximum.reduceat(ordered, starts),
+    }
@@ -0,0 +1,194 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+
+
+class StreamingMetrics:
+    """
+    Opinion statistics of a population kept up to date change by change.
+
+    The tracker holds a copy of every agent's opinion plus running sums,
+    a binned histogram over [-1, 1] and the counts of positive, neutral,
+    negative and extreme opinions. Replacing one opinion adjusts each of
+    them in O(1), so a ``snapshot`` costs nothing that grows with the
+    population, apart from copying the histogram.
+
+    Sums are accumulated in float64; ``recompute`` rebuilds them exactly
+    should a very long run need it.
+    """
+
+    def __init__(
+        self,
+        opinions: Sequence[float],
+        bins: int = 20,
+        neutral_band: float = 0.0,
+        extreme: float = 0.8,
+    ):
+        """
+        Start tracking a population.
+
+        Args:
+            opinions: Initial opinion of every agent
+            bins: Histogram bins over [-1, 1]
+            neutral_band: Opinions with ``|x| <= neutral_band`` count as neutral
+            extreme: Opinions with ``|x| >= extreme`` count as extreme
+        """
+        if bins < 1:
+            raise ValueError("bins must be at least 1")
+        self.bins = bins
+        self.neutral_band = neutral_band
+        self.extreme = extreme
+        self.opinions = np.array(opinions, dtype=np.float64)
+        self._index: Dict[int, int] = {}
+        self.recompute()
+
+    @classmethod
+    def from_agents(cls, agents: List[BaseAgent], **kwargs) -> "StreamingMetrics":
+        """Track ``agents``, which ``on_opinions_changed`` follows by identity."""
+        metrics = cls([agent.get_opinion() for agent in agents], **kwargs)
+        metrics._index = {id(agent): i for i, agent in enumerate(agents)}
+        return metrics
+
+    def recompute(self) -> None:
+        """Rebuild every statistic from the stored opinions."""
+        x = self.opinions
+        self.sum = float(x.sum())
+        self.sum_of_squares = float(x @ x)
+        self.histogram = np.bincount(self._bin(x), minlength=self.bins)
+        categories = self._category(x)
+        self.positive = int(np.count_nonzero(categories == 1))
+        self.negative = int(np.count_nonzero(categories == -1))
+        self.neutral = len(x) - self.positive - self.negative
+        self.extreme_positive = int(np.count_nonzero(x >= self.extreme))
+        self.extreme_negative = int(np.count_nonzero(x <= -self.extreme))
+
+    def _bin(self, x):
+        scaled = (np.clip(x, -1.0, 1.0) + 1.0) * (self.bins / 2.0)
+        return np.minimum(scaled.astype(np.int64), self.bins - 1)
+
+    def _scalar_bin(self, x: float) -> int:
+        return min(
+            int((min(max(x, -1.0), 1.0) + 1.0) * (self.bins / 2.0)), self.bins - 1
+        )
+
+    def _category(self, x):
+        return np.where(
+            x > self.neutral_band, 1, np.where(x < -self.neutral_band, -1, 0)
+        )
+
+    def update(self, index: int, opinion: float) -> None:
+        """Replace the opinion of agent ``index``, in O(1)."""
+        old = self.opinions[index]
+        if old == opinion:
+            return
+        self.opinions[index] = opinion
+        self.sum += opinion - old
+        self.sum_of_squares += opinion * opinion - old * old
+
+        self.histogram[self._scalar_bin(old)] -= 1
+        self.histogram[self._scalar_bin(opinion)] += 1
+        self._shift_counts(old, -1)
+        self._shift_counts(opinion, 1)
+
+    def _shift_counts(self, x: float, sign: int) -> None:
+        if x > self.neutral_band:
+            self.positive += sign
+        elif x < -self.neutral_band:
+            self.negative += sign
+        else:
+            self.neutral += sign
+        if x >= self.extreme:
+            self.extreme_positive += sign
+        elif x <= -self.extreme:
+            self.extreme_negative += sign
+
+    def update_many(self, indices: Sequence[int], opinions: Sequence[float]) -> None:
+        """
+        Replace the opinions of many agents at once.
+
+        Vectorized, with a cost proportional to the number of changes; an
+        index may appear only once.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        new = np.asarray(opinions, dtype=np.float64)
+        old = self.opinions[indices]
+        self.opinions[indices] = new
+        self.sum += float(new.sum() - old.sum())
+        self.sum_of_squares += float(new @ new - old @ old)
+
+        np.subtract.at(self.histogram, self._bin(old), 1)
+        np.add.at(self.histogram, self._bin(new), 1)
+        old_category, new_category = self._category(old), self._category(new)
+        self.positive += int(
+            np.count_nonzero(new_category == 1) - np.count_nonzero(old_category == 1)
+        )
+        self.negative += int(
+            np.count_nonzero(new_category == -1) - np.count_nonzero(old_category == -1)
+        )
+        self.neutral = len(self.opinions) - self.positive - self.negative
+        self.extreme_positive += int(
+            np.count_nonzero(new >= self.extreme)
+            - np.count_nonzero(old >= self.extreme)
+        )
+        self.extreme_negative += int(
+            np.count_nonzero(new <= -self.extreme)
+            - np.count_nonzero(old <= -self.extreme)
+        )
+
+    def on_opinions_changed(
+        self, agents: Sequence[BaseAgent], opinions: Sequence[float]
+    ) -> None:
+        """
+        Listener for ``OpinionAnalyzer.add_listener``.
+
+        Agents are matched by identity to those given to ``from_agents``;
+        unknown agents are ignored.
+        """
+        indices, values = [], []
+        for agent, opinion in zip(agents, opinions):
+            index = self._index.get(id(agent))
+            if index is not None:
+                indices.append(index)
+                values.append(opinion)
+        if indices:
+            self.update_many(indices, values)
+
+    @property
+    def count(self) -> int:
+        return len(self.opinions)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.count:
+            return 0.0
+        return max(self.sum_of_squares / self.count - self.mean**2, 0.0)
+
+    def snapshot(self, step: Optional[int] = None) -> Dict:
+        """
+        Current statistics.
+
+        Args:
+            step: Simulation step stored with the snapshot
+
+        Returns:
+            Mean, variance, the distribution counts (as in
+            ``Metrics.compute_opinion_distribution``), extreme counts and a
+            copy of the histogram
+        """
+        return {
+            "step": step,
+            "mean": self.mean,
+            "variance": self.variance,
+            "positive": self.positive,
+            "neutral": self.neutral,
+            "negative": self.negative,
+            "extreme_positive": self.extreme_positive,
+            "extreme_negative": self.extreme_negative,
+            "histogram": self.histogram.copy(),
+        }
@@ -1,21 +1,193 @@
+import json
+import math
 import random
-from typing import List, Tuple
+import re
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from agents.SimpleAgent import SimpleAgent
+from opinion_dynamics.StanceEstimator import StanceEstimator
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+# Trait keywords in order of precedence: the first one found in a persona's
+# traits decides its initial opinion tendency and its resistance to change.
+OPINION_TRAITS = (("change-oriented", -0.7), ("status-quo", 0.7))
+RESISTANCE_TRAITS = (
+    ("strongly held", 0.3),  # strongly held opinions resist change
+    ("weakly held", 1.5),  # weakly held opinions change more easily
+    ("closed-minded", 0.4),
+    ("open-minded", 1.2),
+)
+INITIAL_OPINION_NOISE = 0.2
+
+
+@lru_cache(maxsize=None)
+def trait_coefficients(traits: str) -> Tuple[float, float]:
+    """
+    Parse a persona's traits into numeric coefficients, once per traits string.
+
+    Returns:
+        ``(base_opinion, resistance)``: the initial opinion tendency and the
+        factor applied to opinion changes
+    """
+    traits = traits.lower()
+    base_opinion = next(
+        (value for trait, value in OPINION_TRAITS if trait in traits), 0.0
+    )
+    resistance = next(
+        (value for trait, value in RESISTANCE_TRAITS if trait in traits), 1.0
+    )
+    return base_opinion, resistance
+
+
+def persona_coefficients(
+    agents: Sequence[SimpleAgent],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trait coefficients of every agent as arrays.
+
+    Returns:
+        ``(base_opinion, resistance, has_traits)``; agents without persona
+        traits get 0, 1 and False
+    """
+    count = len(agents)
+    base_opinion = np.zeros(count)
+    resistance = np.ones(count)
+    has_traits = np.zeros(count, dtype=bool)
+    for i, agent in enumerate(agents):
+        if agent.persona and agent.persona.traits:
+            base_opinion[i], resistance[i] = trait_coefficients(agent.persona.traits)
+            has_traits[i] = True
+    return base_opinion, resistance, has_traits
+
+
+def read_opinions(agents: Sequence[SimpleAgent]) -> np.ndarray:
+    """Current opinions of ``agents`` as a float array."""
+    return np.fromiter(map(attrgetter("opinion"), agents), float, len(agents))
+
+
+def write_opinions(
+    agents: Sequence[SimpleAgent], old: np.ndarray, new: np.ndarray
+) -> None:
+    """Set the opinions of the agents whose value changed from ``old``."""
+    for i in np.flatnonzero(new != old).tolist():
+        agents[i].set_opinion(float(new[i]))
+
+
+def initial_opinions(
+    base_opinion: np.ndarray, has_traits: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """Base opinions with uniform noise where traits exist, clamped to [-1, 1]."""
+    noise = rng.uniform(
+        -INITIAL_OPINION_NOISE, INITIAL_OPINION_NOISE, size=len(base_opinion)
+    )
+    return np.clip(np.where(has_traits, base_opinion + noise, 0.0), -1.0, 1.0)
+
+
+def apply_opinion_deltas(
+    opinions: np.ndarray, deltas: np.ndarray, resistance: np.ndarray
+) -> np.ndarray:
+    """Opinions after resisted changes, clamped to [-1, 1]."""
+    return np.clip(opinions + deltas * resistance, -1.0, 1.0)
 
 
 class OpinionAnalyzer:
     """Analyzes conversation history and updates agent opinions based on dialogue."""
 
-    def __init__(self, llm_client, update_frequency: int = 5):
+    def __init__(
+        self,
+        llm_client,
+        update_frequency: int = 5,
+        batch_size: Optional[int] = None,
+        incremental: bool = False,
+        stance_estimator: Optional[StanceEstimator] = None,
+    ):
         """
         Initialize the OpinionAnalyzer.
 
         Args:
             llm_client: Client for LLM API calls
             update_frequency: How often to update opinions (every N steps)
+            batch_size: Agents analyzed per LLM call. If set, the conversation
+                is sent once per batch of agents and the LLM answers with a
+                JSON object of deltas; otherwise every agent gets its own call.
+            incremental: Analyze only the agents that received messages since
+                their last analysis, each on the messages it received (see
+                ``record_delivery`` and ``analyze_pending``), instead of every
+                agent on the recent global history
+            stance_estimator: Local scorer tried before the LLM; only agents
+                it is not confident about are sent to the LLM, and their
+                answers train it
         """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
         self.llm_client = llm_client
         self.update_frequency = update_frequency
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.stance_estimator = stance_estimator
+        self.listeners: List[Callable[[List[SimpleAgent], List[float]], None]] = []
+        # Messages received since the last analysis, keyed by agent identity.
+        self._pending: Dict[int, Tuple[SimpleAgent, List[Tuple]]] = {}
+        self.invalidate_coefficients()
+
+    def add_listener(
+        self, listener: Callable[[List[SimpleAgent], List[float]], None]
+    ) -> None:
+        """Call ``listener(agents, new_opinions)`` after every opinion update."""
+        self.listeners.append(listener)
+
+    def coefficients(
+        self, agents: Sequence[SimpleAgent]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        ``persona_coefficients`` of ``agents``, from arrays cached per agent.
+
+        Agents are parsed the first time they are seen; later calls only
+        look up their rows. Call ``invalidate_coefficients`` after changing
+        the persona of an agent already seen.
+        """
+        ids = np.fromiter(map(id, agents), np.int64, len(agents))
+        if np.array_equal(ids, self._last_ids):
+            rows = self._last_rows
+        else:
+            rows = self._lookup_rows(agents, ids)
+            self._last_ids, self._last_rows = ids, rows
+        return self._base_opinion[rows], self._resistance[rows], self._has_traits[rows]
+
+    def _lookup_rows(
+        self, agents: Sequence[SimpleAgent], ids: np.ndarray
+    ) -> np.ndarray:
+        try:
+            return np.fromiter(map(self._rows.__getitem__, ids.tolist()), np.int64)
+        except KeyError:
+            new = [agent for agent in agents if id(agent) not in self._rows]
+            new = list({id(agent): agent for agent in new}.values())
+            base_opinion, resistance, has_traits = persona_coefficients(new)
+            start = len(self._population)
+            self._rows.update((id(agent), start + i) for i, agent in enumerate(new))
+            self._population.extend(new)
+            self._base_opinion = np.concatenate((self._base_opinion, base_opinion))
+            self._resistance = np.concatenate((self._resistance, resistance))
+            self._has_traits = np.concatenate((self._has_traits, has_traits))
+            return np.fromiter(map(self._rows.__getitem__, ids.tolist()), np.int64)
+
+    def invalidate_coefficients(self) -> None:
+        """Forget the cached trait coefficients, e.g. after persona changes."""
+        # Trait coefficients of every agent seen so far, parsed once: row
+        # ``_rows[id(agent)]`` of the arrays. ``_population`` keeps the agents
+        # alive so their ids stay unique.
+        self._population: List[SimpleAgent] = []
+        self._rows: Dict[int, int] = {}
+        self._base_opinion = np.zeros(0)
+        self._resistance = np.ones(0)
+        self._has_traits = np.zeros(0, dtype=bool)
+        # Rows of the last agent sequence looked up, reused while it repeats.
+        self._last_ids = self._last_rows = np.zeros(0, dtype=np.int64)
 
     def should_update_opinions(self, step_count: int) -> bool:
         """
@@ -29,6 +201,60 @@ class OpinionAnalyzer:
         """
         return step_count % self.update_frequency == 0
 
+    def record_delivery(self, entry: Tuple, receivers: List[SimpleAgent]) -> None:
+        """
+        Mark the receivers of a message as needing analysis.
+
+        Args:
+            entry: The (step, speaker_name, message) tuple that was delivered
+            receivers: Agents the message reached
+        """
+        for receiver in receivers:
+            pending = self._pending.get(id(receiver))
+            if pending is None or pending[0] is not receiver:
+                pending = self._pending[id(receiver)] = (receiver, [])
+            pending[1].append(entry)
+
+    def pending_messages(self, agent: SimpleAgent) -> List[Tuple]:
+        """Messages ``agent`` received since it was last analyzed."""
+        pending = self._pending.get(id(agent))
+        if pending is None or pending[0] is not agent:
+            return []
+        return pending[1]
+
+    def clear_pending(self) -> None:
+        """Forget all messages awaiting analysis."""
+        self._pending = {}
+
+    def analyze_pending(self, agents: List[SimpleAgent]) -> List[SimpleAgent]:
+        """
+        Update the opinions of the agents that received messages.
+
+        Agents that received nothing since their last analysis are skipped,
+        so the cost follows the activity rather than the population. Agents
+        that saw exactly the same messages are analyzed together, which lets
+        ``batch_size`` share one prompt among them. Pending messages of
+        receivers outside ``agents`` (such as the mediator) are dropped.
+
+        Args:
+            agents: Agents whose opinions are tracked
+
+        Returns:
+            The agents that were analyzed
+        """
+        groups: Dict[Tuple, List[SimpleAgent]] = {}
+        for agent in agents:
+            messages = self.pending_messages(agent)
+            if messages:
+                groups.setdefault(tuple(messages), []).append(agent)
+        self.clear_pending()
+
+        analyzed = []
+        for messages, group in groups.items():
+            self.analyze_opinion_changes(list(messages), group)
+            analyzed.extend(group)
+        return analyzed
+
     def analyze_opinion_changes(
         self, conversation_history: List[Tuple], agents: List[SimpleAgent]
     ) -> None:
@@ -39,22 +265,28 @@ class OpinionAnalyzer:
             conversation_history: List of (step, speaker_name, message) tuples
             agents: List of agents to potentially update
         """
-        for agent in agents:
-            # Get opinion delta from LLM analysis
-            opinion_delta = self._get_opinion_delta_from_llm(
-                agent, conversation_history
-            )
-
-            # Apply personality-based resistance
-            adjusted_delta = self._apply_personality_resistance(agent, opinion_delta)
-
-            # Update agent opinion
-            new_opinion = agent.get_opinion() + adjusted_delta
-
-            # Clamp to valid range (-1 to 1)
-            new_opinion = max(-1.0, min(1.0, new_opinion))
-
-            agent.set_opinion(new_opinion)
+        if self.stance_estimator is None:
+            deltas = self._get_opinion_deltas(agents, conversation_history)
+        else:
+            deltas = self.stance_estimator.screen(agents, conversation_history)
+            escalated = [i for i, delta in enumerate(deltas) if delta is None]
+            llm_agents = [agents[i] for i in escalated]
+            llm_deltas = self._get_opinion_deltas(llm_agents, conversation_history)
+            for i, delta in zip(escalated, llm_deltas):
+                deltas[i] = delta
+            self.stance_estimator.learn(llm_agents, conversation_history, llm_deltas)
+
+        # Apply personality-based resistance and clamp to valid range (-1 to 1)
+        _, resistance, _ = self.coefficients(agents)
+        opinions = read_opinions(agents)
+        new_opinions = apply_opinion_deltas(
+            opinions, np.asarray(deltas, dtype=float), resistance
+        )
+        write_opinions(agents, opinions, new_opinions)
+        if self.listeners:
+            new_opinions = new_opinions.tolist()
+            for listener in self.listeners:
+                listener(agents, new_opinions)
 
     def initialize_opinion_from_persona(self, agent: SimpleAgent) -> float:
         """
@@ -69,22 +301,44 @@ class OpinionAnalyzer:
         base_opinion = 0.0
 
         if agent.persona and agent.persona.traits:
-            traits = agent.persona.traits.lower()
-
-            # Map traits to opinion tendencies
-            if "change-oriented" in traits:
-                base_opinion = -0.7
-            elif "status-quo" in traits:
-                base_opinion = 0.7
+            base_opinion, _ = trait_coefficients(agent.persona.traits)
 
             # Add some random variation
-            base_opinion += random.uniform(-0.2, 0.2)
+            base_opinion += random.uniform(
+                -INITIAL_OPINION_NOISE, INITIAL_OPINION_NOISE
+            )
 
             # Clamp to valid range
             base_opinion = max(-1.0, min(1.0, base_opinion))
 
         return base_opinion
 
+    def initialize_opinions(
+        self,
+        agents: Sequence[SimpleAgent],
+        rng: Optional[np.random.Generator] = None,
+    ) -> np.ndarray:
+        """
+        Initialize the opinions of all agents from their persona traits at once.
+
+        Same distribution as ``initialize_opinion_from_persona``, with the
+        noise drawn in one vectorized call.
+
+        Args:
+            agents: Agents whose opinions are set
+            rng: Source of the noise (default: seeded from the ``random``
+                module, so ``random.seed`` makes it reproducible)
+
+        Returns:
+            The initial opinions
+        """
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        base_opinion, _, has_traits = self.coefficients(agents)
+        opinions = initial_opinions(base_opinion, has_traits, rng)
+        write_opinions(agents, read_opinions(agents), opinions)
+        return opinions
+
     def _get_opinion_delta_from_llm(
         self, agent: SimpleAgent, conversation_history: List[Tuple]
     ) -> float:
@@ -123,6 +377,101 @@ class OpinionAnalyzer:
             # If parsing fails, return no change
             return 0.0
 
+    def _get_opinion_deltas(
+        self, agents: List[SimpleAgent], conversation_history: List[Tuple]
+    ) -> List[float]:
+        """Opinion change of every agent from the LLM, batched if configured."""
+        if self.batch_size is None:
+            return [
+                self._get_opinion_delta_from_llm(agent, conversation_history)
+                for agent in agents
+            ]
+        return self._get_opinion_deltas_batched(agents, conversation_history)
+
+    def _get_opinion_deltas_batched(
+        self, agents: List[SimpleAgent], conversation_history: List[Tuple]
+    ) -> List[float]:
+        """
+        Get opinion changes of many agents with one LLM call per batch.
+
+        Agents whose delta is missing from the response or is not a number,
+        and agents sharing a name within a batch, fall back to
+        ``_get_opinion_delta_from_llm``.
+
+        Args:
+            agents: Agents to analyze
+            conversation_history: Recent conversation history
+
+        Returns:
+            Opinion change delta (-1 to 1) of every agent, in order
+        """
+        recent_messages = self._format_conversation_for_prompt(conversation_history)
+        deltas = []
+        for start in range(0, len(agents), self.batch_size):
+            batch = agents[start : start + self.batch_size]
+            names = [agent.name for agent in batch]
+            parsed = self._parse_batched_deltas(
+                self.llm_client.generate_response(
+                    self._batched_prompt(batch, recent_messages)
+                )
+            )
+            for agent in batch:
+                delta = parsed.get(agent.name)
+                if delta is None or names.count(agent.name) > 1:
+                    delta = self._get_opinion_delta_from_llm(
+                        agent, conversation_history
+                    )
+                deltas.append(delta)
+        return deltas
+
+    def _batched_prompt(self, agents: List[SimpleAgent], recent_messages: str) -> str:
+        participants = "\n".join(
+            f"- {agent.name}: {agent.persona.traits if agent.persona else 'unknown'}"
+            for agent in agents
+        )
+        return f"""
+        Analyze how each participant's opinion might change based on this conversation.
+        Participants and their traits:
+        {participants}
+        
+        Recent conversation:
+        {recent_messages}
+        
+        Rate each opinion change from -1 (strongly moved toward change) to +1 (strongly moved toward status-quo).
+        Return only a JSON object mapping every participant's name to a number between -1 and 1.
+        """
+
+    @staticmethod
+    def _parse_batched_deltas(response: str) -> Dict[str, float]:
+        """
+        Extract the valid ``name: delta`` pairs of a batched response.
+
+        Returns:
+            Clamped deltas by agent name; empty if the response holds no
+            JSON object
+        """
+        match = _JSON_OBJECT.search(response)
+        if match is None:
+            return {}
+        try:
+            values = json.loads(match.group())
+        except ValueError:
+            return {}
+        if not isinstance(values, dict):
+            return {}
+
+        deltas = {}
+        for name, value in values.items():
+            if isinstance(value, bool):
+                continue
+            try:
+                delta = float(value)
+            except (TypeError, ValueError):
+                continue
+            if not math.isnan(delta):
+                deltas[name] = max(-1.0, min(1.0, delta))
+        return deltas
+
     def _apply_personality_resistance(
         self, agent: SimpleAgent, opinion_delta: float
     ) -> float:
@@ -139,24 +488,9 @@ class OpinionAnalyzer:
         if not agent.persona or not agent.persona.traits:
             return opinion_delta
 
-        traits = agent.persona.traits.lower()
-
-        # Apply resistance based on personality traits
-        if "strongly held" in traits:
-            # Strongly held opinions resist change
-            return opinion_delta * 0.3
-        elif "weakly held" in traits:
-            # Weakly held opinions change more easily
-            return opinion_delta * 1.5
-        elif "closed-minded" in traits:
-            # Closed-minded agents resist change
-            return opinion_delta * 0.4
-        elif "open-minded" in traits:
-            # Open-minded agents change more easily
-            return opinion_delta * 1.2
-
-        # Default: no modification
-        return opinion_delta
+        # Apply resistance based on personality traits (see RESISTANCE_TRAITS)
+        _, resistance = trait_coefficients(agent.persona.traits)
+        return opinion_delta * resistance
 
     def _format_conversation_for_prompt(self, conversation_history: List[Tuple]) -> str:
         """
@@ -0,0 +1,261 @@
+import json
+import random
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.SimpleAgent import SimpleAgent
+
+_WORD = re.compile(r"[a-z']+")
+
+# Prior weights of the untrained model: words leaning toward status-quo (+)
+# or change (-), matching the scale of the opinion prompts.
+STANCE_LEXICON = {
+    "keep": 0.3,
+    "stay": 0.3,
+    "tradition": 0.3,
+    "traditional": 0.3,
+    "stable": 0.3,
+    "stability": 0.3,
+    "proven": 0.3,
+    "risk": 0.2,
+    "risks": 0.2,
+    "risky": 0.2,
+    "careful": 0.2,
+    "works": 0.2,
+    "change": -0.3,
+    "new": -0.2,
+    "improve": -0.3,
+    "improvement": -0.3,
+    "innovation": -0.3,
+    "reform": -0.3,
+    "progress": -0.3,
+    "better": -0.2,
+    "benefits": -0.2,
+    "try": -0.2,
+}
+
+
+def _tokens(text: str) -> List[str]:
+    words = _WORD.findall(text.lower())
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+class StanceEstimator:
+    """
+    Local opinion-change scorer that escalates uncertain cases to the LLM.
+
+    A window of conversation and the agent's traits are turned into hashed
+    unigram and bigram counts. A ridge regression on those features, trained
+    on deltas the LLM returned earlier, predicts the opinion change. Its
+    weights are pulled toward ``STANCE_LEXICON`` rather than zero, so sparse
+    training data falls back to the lexicon.
+
+    The confidence of a prediction is one minus its leverage: close to one
+    for feature mixes that the training data covers well, and zero for
+    anything the model has not seen, including everything before the first
+    fit. Predictions below ``threshold`` are escalated to the LLM and its
+    answers are added to the training cache; a fraction ``audit_rate`` of
+    confident predictions is escalated as well to keep measuring agreement.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        dim: int = 1024,
+        alpha: float = 1.0,
+        refit_every: int = 50,
+        audit_rate: float = 0.05,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the estimator.
+
+        Args:
+            threshold: Minimum confidence (0 to 1) to skip the LLM
+            dim: Number of hashed features
+            alpha: Ridge penalty
+            refit_every: Refit after this many new LLM labels
+            audit_rate: Fraction of confident predictions still sent to the LLM
+            seed: Seed of the audit sampling
+        """
+        if not 0 <= threshold <= 1:
+            raise ValueError("threshold must be in [0, 1]")
+        if not 0 <= audit_rate <= 1:
+            raise ValueError("audit_rate must be in [0, 1]")
+        if alpha <= 0:
+            raise ValueError("alpha must be positive")
+        self.threshold = threshold
+        self.dim = dim
+        self.alpha = alpha
+        self.refit_every = refit_every
+        self.audit_rate = audit_rate
+        self._rng = random.Random(seed)
+
+        self.examples: List[Tuple[str, str, float]] = []
+        self._unfitted = 0
+        self._prior = np.zeros(dim)
+        for word, weight in STANCE_LEXICON.items():
+            self._prior[self._index(word)] += weight
+        self.weights = self._prior.copy()
+        # Inverse of the regularized Gram matrix, alpha * I before any fit.
+        self._precision = np.eye(dim) / alpha
+
+        self.estimates = 0
+        self.escalations = 0
+        self.audits = 0
+        self._compared = 0
+        self._absolute_error = 0.0
+        self._sign_matches = 0
+
+    def _index(self, token: str) -> int:
+        return zlib.crc32(token.encode()) % self.dim
+
+    def features(self, text: str, traits: str = "") -> np.ndarray:
+        """Normalized hashed n-gram counts of ``text`` plus trait indicators."""
+        x = np.zeros(self.dim)
+        tokens = _tokens(text) + [
+            f"trait={trait.strip()}" for trait in traits.lower().split(",") if trait
+        ]
+        if tokens:
+            np.add.at(x, [self._index(token) for token in tokens], 1.0)
+            x /= np.linalg.norm(x)
+        return x
+
+    @staticmethod
+    def window_text(conversation_history: List[Tuple]) -> str:
+        return "\n".join(
+            f"{name}: {message}" for _, name, message in conversation_history
+        )
+
+    @staticmethod
+    def agent_traits(agent: SimpleAgent) -> str:
+        return agent.persona.traits if agent.persona and agent.persona.traits else ""
+
+    def predict(self, text: str, traits: str = "") -> Tuple[float, float]:
+        """
+        Estimate an opinion change.
+
+        Returns:
+            ``(delta, confidence)``, the delta clamped to [-1, 1] and the
+            confidence in [0, 1]
+        """
+        x = self.features(text, traits)
+        norm = x @ x
+        if not norm:
+            return 0.0, 0.0
+        delta = float(np.clip(x @ self.weights, -1.0, 1.0))
+        leverage = self.alpha * (x @ self._precision @ x) / norm
+        return delta, float(np.clip(1.0 - leverage, 0.0, 1.0))
+
+    def screen(
+        self, agents: List[SimpleAgent], conversation_history: List[Tuple]
+    ) -> List[Optional[float]]:
+        """
+        Estimate the opinion change of every agent locally where possible.
+
+        Returns:
+            The delta of every agent, or None where the LLM must decide
+        """
+        text = self.window_text(conversation_history)
+        deltas = []
+        for agent in agents:
+            delta, confidence = self.predict(text, self.agent_traits(agent))
+            self.estimates += 1
+            if confidence < self.threshold:
+                self.escalations += 1
+                delta = None
+            elif self.audit_rate and self._rng.random() < self.audit_rate:
+                self.escalations += 1
+                self.audits += 1
+                delta = None
+            deltas.append(delta)
+        return deltas
+
+    def learn(
+        self,
+        agents: List[SimpleAgent],
+        conversation_history: List[Tuple],
+        deltas: List[float],
+    ) -> None:
+        """
+        Record LLM-labelled deltas, track agreement and refit when due.
+
+        Args:
+            agents: Agents the LLM analyzed
+            conversation_history: Window the LLM saw
+            deltas: Deltas the LLM returned, before personality resistance
+        """
+        text = self.window_text(conversation_history)
+        for agent, delta in zip(agents, deltas):
+            traits = self.agent_traits(agent)
+            predicted, _ = self.predict(text, traits)
+            self._compared += 1
+            self._absolute_error += abs(predicted - delta)
+            self._sign_matches += int(np.sign(predicted) == np.sign(delta))
+            self.examples.append((text, traits, float(delta)))
+            self._unfitted += 1
+        if self._unfitted >= self.refit_every:
+            self.fit()
+
+    def fit(self) -> None:
+        """Refit the ridge regression on all cached LLM labels."""
+        self._unfitted = 0
+        if not self.examples:
+            return
+        X = np.array([self.features(text, traits) for text, traits, _ in self.examples])
+        y = np.array([delta for _, _, delta in self.examples])
+        self._precision = np.linalg.inv(X.T @ X + self.alpha * np.eye(self.dim))
+        self.weights = self._prior + self._precision @ (X.T @ (y - X @ self._prior))
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Escalation rate and agreement of local predictions with the LLM.
+
+        Agreement is measured on every LLM label, against what the model
+        predicted before learning it; the audited confident cases show
+        whether the skipped calls would have agreed.
+        """
+        compared = max(self._compared, 1)
+        return {
+            "estimates": self.estimates,
+            "escalations": self.escalations,
+            "escalation_rate": self.escalations / max(self.estimates, 1),
+            "audits": self.audits,
+            "labels": len(self.examples),
+            "mean_absolute_error": self._absolute_error / compared,
+            "sign_agreement": self._sign_matches / compared,
+        }
+
+    def save(self, path: str) -> None:
+        """Write the cached LLM labels and settings as JSON."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "threshold": self.threshold,
+                    "dim": self.dim,
+                    "alpha": self.alpha,
+                    "examples": self.examples,
+                },
+                file,
+            )
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "StanceEstimator":
+        """
+        Build a fitted estimator from labels written by ``save``.
+
+        Args:
+            path: JSON file of cached labels
+            **kwargs: Override the saved settings or set other arguments
+        """
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        settings = {key: data[key] for key in ("threshold", "dim", "alpha")}
+        settings.update(kwargs)
+        estimator = cls(**settings)
+        estimator.examples = [tuple(example) for example in data["examples"]]
+        estimator.fit()
+        return estimator
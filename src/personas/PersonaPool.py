@@ -0,0 +1,227 @@
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from personas.PersonaTable import PersonaTable
+
+MAGIC = b"PERSONA1"
+# Magic, then the byte length of the JSON header that follows it.
+PREFIX = struct.Struct("<8sQ")
+ALIGNMENT = 8
+
+
+class StringTable(Sequence):
+    """
+    UTF-8 strings packed back to back, with ``offsets[i]:offsets[i + 1]``
+    delimiting string ``i``. Strings are decoded on access; slices share
+    the underlying buffers.
+    """
+
+    def __init__(self, offsets: np.ndarray, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def pack(cls, strings: Sequence[str]) -> "StringTable":
+        encoded = [string.encode() for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return cls(offsets, b"".join(encoded))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("StringTable slices must be contiguous")
+            return StringTable(self.offsets[start : max(stop, start) + 1], self.data)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("StringTable index out of range")
+        start, stop = int(self.offsets[index]), int(self.offsets[index + 1])
+        return bytes(self.data[start:stop]).decode()
+
+
+class PersonaPool:
+    """
+    Persona table stored in one file and mapped into memory, not read.
+
+    Layout: ``MAGIC``, the length of a JSON header and the header itself,
+    then 8-byte aligned sections at the offsets the header lists: the
+    fixed-width code columns of a ``PersonaTable`` (names, ages, statuses,
+    traits) and two string tables (name pool, descriptions), each an offsets
+    array followed by the UTF-8 bytes.
+
+    ``open`` maps the file read-only and wraps the sections in NumPy views,
+    so opening costs the same for any population size, slices copy nothing,
+    and processes opening the same pool share its pages through the OS page
+    cache. Only the name pool is decoded up front.
+    """
+
+    def __init__(self, path: str, validate: bool = True):
+        """
+        Map a pool written by ``write``.
+
+        Args:
+            path: Pool file
+            validate: Check the columns as ``PersonaTable.validate`` does
+
+        Raises:
+            ValueError: If the file is not a persona pool or is truncated
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.table = self._read_table()
+            if validate:
+                self.table.validate()
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def open(cls, path: str, validate: bool = True) -> "PersonaPool":
+        return cls(path, validate)
+
+    def _read_table(self) -> PersonaTable:
+        buffer = self._mmap
+        if len(buffer) < PREFIX.size:
+            raise ValueError(f"{self.path} is not a persona pool")
+        magic, header_size = PREFIX.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a persona pool")
+        header = json.loads(bytes(buffer[PREFIX.size : PREFIX.size + header_size]))
+
+        sections = {}
+        for name, (offset, dtype, shape) in header["sections"].items():
+            dtype = np.dtype(dtype)
+            size = dtype.itemsize * int(np.prod(shape))
+            if offset + size > len(buffer):
+                raise ValueError(f"{self.path} is truncated")
+            sections[name] = np.frombuffer(
+                buffer, dtype=dtype, count=int(np.prod(shape)), offset=offset
+            ).reshape(shape)
+
+        names = StringTable(sections["name_offsets"], sections["name_data"])
+        descriptions = StringTable(
+            sections["description_offsets"], sections["description_data"]
+        )
+        return PersonaTable(
+            categories=header["categories"],
+            statuses=header["statuses"],
+            names=list(names),
+            name_codes=sections["name_codes"],
+            ages=sections["ages"],
+            trait_codes=sections["trait_codes"],
+            status_codes=sections["status_codes"],
+            descriptions=descriptions if header["has_descriptions"] else None,
+        )
+
+    @staticmethod
+    def write(
+        path: str,
+        table: PersonaTable,
+        descriptions: Optional[Sequence[str]] = None,
+    ) -> "PersonaPool":
+        """
+        Write ``table`` as a pool file and open it.
+
+        Args:
+            path: Destination, replaced atomically
+            table: Personas to store
+            descriptions: Description of every persona (default: the table's
+                own, if any)
+
+        Returns:
+            The pool, opened from ``path``
+        """
+        table.validate()
+        if descriptions is None:
+            descriptions = table.descriptions
+        if descriptions is not None and len(descriptions) != len(table):
+            raise ValueError("Expected one description per persona")
+
+        names = StringTable.pack(table.names)
+        described = StringTable.pack(
+            [] if descriptions is None else [text or "" for text in descriptions]
+        )
+        arrays: Dict[str, np.ndarray] = {
+            "name_codes": np.ascontiguousarray(table.name_codes, dtype=np.int32),
+            "ages": np.ascontiguousarray(table.ages, dtype=np.uint8),
+            "status_codes": np.ascontiguousarray(table.status_codes, dtype=np.uint8),
+            "trait_codes": np.ascontiguousarray(table.trait_codes, dtype=np.uint8),
+            "name_offsets": names.offsets,
+            "name_data": np.frombuffer(names.data, dtype=np.uint8),
+            "description_offsets": described.offsets,
+            "description_data": np.frombuffer(described.data, dtype=np.uint8),
+        }
+
+        # The header size depends on the offsets it lists; repeat until they fit.
+        header_size = 0
+        while True:
+            offset = _align(PREFIX.size + header_size)
+            sections = {}
+            for name, array in arrays.items():
+                sections[name] = [offset, array.dtype.str, list(array.shape)]
+                offset = _align(offset + array.nbytes)
+            header = json.dumps(
+                {
+                    "count": len(table),
+                    "categories": table.categories,
+                    "statuses": table.statuses,
+                    "has_descriptions": descriptions is not None,
+                    "sections": sections,
+                }
+            ).encode()
+            if len(header) <= header_size:
+                break
+            header_size = len(header)
+        header = header.ljust(header_size)
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(PREFIX.pack(MAGIC, header_size))
+            file.write(header)
+            for name, array in arrays.items():
+                file.write(b"\0" * (sections[name][0] - file.tell()))
+                file.write(array.tobytes())
+        os.replace(temporary, path)
+        return PersonaPool(path)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, index: slice) -> PersonaTable:
+        """Rows ``index`` as a table viewing the mapped file."""
+        return self.table[index]
+
+    def __reduce__(self):
+        # Other processes map the same file instead of receiving a copy.
+        return PersonaPool, (self.path, False)
+
+    def close(self) -> None:
+        """Unmap the file; tables taken from the pool must not be used after."""
+        self.table = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Views handed out are still alive; the mapping goes with them.
+            pass
+
+    def __enter__(self) -> "PersonaPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
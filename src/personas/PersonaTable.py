@@ -0,0 +1,225 @@
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from personas.generate_personas import base_template
+from personas.Persona import Persona
+
+MIN_AGE, MAX_AGE = 18, 80
+MIN_NAME_LENGTH, MAX_NAME_LENGTH = 2, 100
+
+
+class PersonaTable:
+    """
+    Personas stored column by column, for populations of millions.
+
+    Every trait category of the template is an integer-coded column, as are
+    the status and the age; names are codes into a small pool of strings.
+    ``generate`` samples all columns with NumPy in one pass instead of
+    building and validating one ``Persona`` per record; ``validate`` checks
+    the constraints of ``Persona`` on whole columns instead.
+
+    Indexing with a slice returns a table sharing the same arrays, and
+    ``persona`` materializes single records on demand.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, Sequence[str]],
+        statuses: Sequence[str],
+        names: Sequence[str],
+        name_codes: np.ndarray,
+        ages: np.ndarray,
+        trait_codes: np.ndarray,
+        status_codes: np.ndarray,
+        descriptions: Optional[Sequence[str]] = None,
+    ):
+        """
+        Wrap existing columns.
+
+        Args:
+            categories: Trait values of every category, in trait order
+            statuses: Status values
+            names: Pool of names, indexed by ``name_codes``
+            name_codes: Name of every persona, shape (N,)
+            ages: Age of every persona, shape (N,)
+            trait_codes: Trait value of every persona and category, shape
+                (N, number of categories)
+            status_codes: Status of every persona, shape (N,)
+            descriptions: Agent description of every persona, empty where
+                there is none; any sequence supporting slices
+        """
+        self.categories = {name: list(values) for name, values in categories.items()}
+        self.statuses = list(statuses)
+        self.names = list(names)
+        self.name_codes = name_codes
+        self.ages = ages
+        self.trait_codes = trait_codes
+        self.status_codes = status_codes
+        self.descriptions = descriptions
+
+    @classmethod
+    def generate(
+        cls,
+        count: int,
+        template: Optional[Dict] = None,
+        seed: Optional[int] = None,
+        name_pool_size: int = 4096,
+    ) -> "PersonaTable":
+        """
+        Sample ``count`` personas from a template in bulk.
+
+        Same distribution as ``generate_persona``, except that names are drawn
+        uniformly from a pool of ``name_pool_size`` Faker names, sampled once.
+
+        Args:
+            count: Number of personas
+            template: Trait categories and statuses (default: ``base_template``)
+            seed: Seed of the sampling (default: drawn from ``random``, so
+                ``random.seed`` makes the table reproducible)
+            name_pool_size: Distinct names sampled from Faker
+
+        Returns:
+            Validated table of ``count`` personas
+        """
+        if count < 0:
+            raise ValueError("count must not be negative")
+        if name_pool_size < 1:
+            raise ValueError("name_pool_size must be at least 1")
+        template = template or base_template
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = np.random.default_rng(seed)
+
+        from faker import Faker
+
+        fake = Faker()
+        fake.seed_instance(int(rng.integers(2**32)))
+        pool = [fake.name().strip() for _ in range(min(name_pool_size, count or 1))]
+        pool = [
+            name for name in pool if MIN_NAME_LENGTH <= len(name) <= MAX_NAME_LENGTH
+        ]
+        if not pool:
+            raise ValueError("No valid names in the sampled pool")
+
+        categories = template["traits"]
+        trait_codes = np.empty((count, len(categories)), dtype=np.uint8)
+        for column, values in enumerate(categories.values()):
+            trait_codes[:, column] = rng.integers(0, len(values), count)
+        table = cls(
+            categories=categories,
+            statuses=template["status"],
+            names=pool,
+            name_codes=rng.integers(0, len(pool), count, dtype=np.int32),
+            ages=rng.integers(MIN_AGE, MAX_AGE + 1, count, dtype=np.uint8),
+            trait_codes=trait_codes,
+            status_codes=rng.integers(0, len(template["status"]), count).astype(
+                np.uint8
+            ),
+        )
+        table.validate()
+        return table
+
+    def validate(self) -> None:
+        """
+        Check the ``Persona`` constraints on every column at once.
+
+        Raises:
+            ValueError: If a column has the wrong length, an age or code is
+                out of range, or a pooled name is too short or too long
+        """
+        count = len(self)
+        if not (
+            len(self.ages) == len(self.trait_codes) == len(self.status_codes) == count
+        ):
+            raise ValueError("Columns must have the same length")
+        if self.trait_codes.ndim != 2 or self.trait_codes.shape[1] != len(
+            self.categories
+        ):
+            raise ValueError("Expected one trait column per category")
+        if count and (self.ages.min() < MIN_AGE or self.ages.max() > MAX_AGE):
+            raise ValueError(f"Ages must be between {MIN_AGE} and {MAX_AGE}")
+        if count and (
+            self.name_codes.min() < 0 or self.name_codes.max() >= len(self.names)
+        ):
+            raise ValueError("Name code out of range")
+        if self.descriptions is not None and len(self.descriptions) != count:
+            raise ValueError("Expected one description per persona")
+        if count and self.status_codes.max() >= len(self.statuses):
+            raise ValueError("Status code out of range")
+        sizes = np.array([len(values) for values in self.categories.values()])
+        if count and (self.trait_codes >= sizes).any():
+            raise ValueError("Trait code out of range")
+        lengths = np.array([len(name.strip()) for name in self.names])
+        if len(lengths) and (
+            lengths.min() < MIN_NAME_LENGTH or lengths.max() > MAX_NAME_LENGTH
+        ):
+            raise ValueError(
+                f"Names must have {MIN_NAME_LENGTH} to {MAX_NAME_LENGTH} characters"
+            )
+
+    def __len__(self) -> int:
+        return len(self.name_codes)
+
+    def __getitem__(self, index: slice) -> "PersonaTable":
+        """Rows ``index`` as a table sharing this table's arrays."""
+        if not isinstance(index, slice):
+            raise TypeError("PersonaTable rows are selected with a slice")
+        return PersonaTable(
+            self.categories,
+            self.statuses,
+            self.names,
+            self.name_codes[index],
+            self.ages[index],
+            self.trait_codes[index],
+            self.status_codes[index],
+            None if self.descriptions is None else self.descriptions[index],
+        )
+
+    def name(self, i: int) -> str:
+        return self.names[self.name_codes[i]]
+
+    def traits(self, i: int) -> str:
+        return ", ".join(
+            values[code]
+            for values, code in zip(self.categories.values(), self.trait_codes[i])
+        )
+
+    def status(self, i: int) -> str:
+        return self.statuses[self.status_codes[i]]
+
+    def description(self, i: int) -> Optional[str]:
+        if self.descriptions is None:
+            return None
+        return self.descriptions[i] or None
+
+    def persona(self, i: int) -> Persona:
+        """Persona ``i``, built without revalidation since the columns are valid."""
+        return Persona.model_construct(
+            name=self.name(i),
+            age=int(self.ages[i]),
+            traits=self.traits(i),
+            status=self.status(i),
+        )
+
+    def personas(self) -> List[Persona]:
+        return [self.persona(i) for i in range(len(self))]
+
+    def trait_strings(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Distinct traits strings and the one of every persona.
+
+        Returns:
+            ``(strings, inverse)``: ``strings[inverse[i]] == traits(i)``, so
+            per-traits work such as ``trait_coefficients`` runs once per
+            combination instead of once per persona
+        """
+        combinations, inverse = np.unique(self.trait_codes, axis=0, return_inverse=True)
+        strings = [
+            ", ".join(
+                values[code] for values, code in zip(self.categories.values(), row)
+            )
+            for row in combinations
+        ]
+        return strings, inverse.ravel()
@@ -1,11 +1,9 @@
 import random
+from functools import lru_cache
 
-from faker import Faker
 from pydantic import ValidationError
 from personas.Persona import Persona
 
-fake = Faker()
-
 base_template = {
     "traits": {
         "personality": ["introvert", "extrovert"],
@@ -29,15 +27,32 @@ base_template = {
 }
 
 
-def generate_persona(template):
-    persona_data = {"name": fake.name(), "age": random.randint(18, 80)}
+@lru_cache(maxsize=None)
+def faker():
+    """Shared Faker instance, created on first use since Faker is slow to load."""
+    from faker import Faker
+
+    return Faker()
+
+
+def generate_persona(template, rng=random, fake=None):
+    """
+    Draw a random persona from ``template``.
+
+    Args:
+        template: Trait categories and statuses to choose from
+        rng: Source of the choices, e.g. a seeded ``random.Random``
+        fake: Faker drawing the name (default: the shared instance)
+    """
+    fake = fake or faker()
+    persona_data = {"name": fake.name(), "age": rng.randint(18, 80)}
 
     traits = []
     for category, trait_list in template["traits"].items():
-        traits.append(random.choice(trait_list))
+        traits.append(rng.choice(trait_list))
     persona_data["traits"] = ", ".join(traits)
 
-    persona_data["status"] = random.choice(template["status"])
+    persona_data["status"] = rng.choice(template["status"])
 
     try:
         return Persona(**persona_data)
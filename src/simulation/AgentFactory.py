@@ -1,6 +1,9 @@
+from typing import List
+
 from agents.SimpleAgent import SimpleAgent, MediatingAgent
 from personas.generate_personas import generate_persona, base_template
 from personas.Persona import Persona
+from personas.PersonaTable import PersonaTable
 from llm.base import LLMClient
 
 
@@ -22,6 +25,24 @@ class AgentFactory:
         random_persona = generate_persona(base_template)
         return AgentFactory.create_simple_agent(random_persona, agent_id=agent_id)
 
+    @staticmethod
+    def create_agents_from_table(
+        personas: PersonaTable, first_id: int = 0
+    ) -> List[SimpleAgent]:
+        """
+        One SimpleAgent per row of ``personas``, numbered from ``first_id``.
+
+        Stored descriptions become the agents' ``agent_description``.
+        """
+        agents = []
+        for i in range(len(personas)):
+            agent = AgentFactory.create_simple_agent(
+                personas.persona(i), agent_id=first_id + i
+            )
+            agent.agent_description = personas.description(i)
+            agents.append(agent)
+        return agents
+
     @staticmethod
     def create_testuser_agent(agent_id: int) -> SimpleAgent:
         return SimpleAgent(name="TestUser", agent_id=agent_id)
@@ -1,6 +1,7 @@
-from typing import Type, Union
+from typing import Optional, Type, Union
 from agents.base_agent import BaseAgent
 from agents.SimpleAgent import SimpleAgent
+from personas.PersonaTable import PersonaTable
 from simulation.AgentFactory import AgentFactory
 
 
@@ -9,11 +10,18 @@ class AgentManager:
         self,
         num_agents: int,
         agent_class: Type[Union[BaseAgent, SimpleAgent]] = BaseAgent,
+        personas: Optional[PersonaTable] = None,
     ):
-        self.agents = self.initialize_agents(num_agents, agent_class)
+        self.agents = self.initialize_agents(num_agents, agent_class, personas)
 
     @staticmethod
-    def initialize_agents(num_agents, agent_class):
+    def initialize_agents(num_agents, agent_class, personas=None):
+        if personas is not None:
+            if len(personas) < num_agents:
+                raise ValueError(
+                    f"Expected at least {num_agents} personas, got {len(personas)}"
+                )
+            return AgentFactory.create_agents_from_table(personas[:num_agents])
         agents = []
         if isinstance(agent_class, BaseAgent):
             return [agent_class(agent_id=i) for i in range(num_agents)]
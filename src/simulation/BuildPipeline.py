@@ -0,0 +1,343 @@
+import hashlib
+import json
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from agents.SimpleAgent import SimpleAgent
+from configs.configs import GraphEnvironmentConfig, LLMConfig, SimulationConfig
+from environments.GraphEnvironment import GraphEnvironment, attach_agents_to_nodes
+from llm.base import LLMClient
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+from personas.generate_personas import base_template, generate_persona
+from personas.Persona import Persona
+from simulation.AgentFactory import AgentFactory
+from utils.event_handler import BuildStageFinished, EventHandler
+
+# Configuration fields and upstream stages each stage's output depends on, in
+# build order. Changing a field rebuilds the stages listing it and those
+# downstream of them; everything else comes from the cache.
+STAGES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "topology": (
+        ("num_agents", "topology", "small_world_k", "small_world_p", "seed"),
+        (),
+    ),
+    "personas": (("num_agents", "seed"), ()),
+    "descriptions": (("model_type", "temperature"), ("personas",)),
+    "system_prompts": (("topic", "model_type", "temperature"), ("descriptions",)),
+    "opinions": (("seed",), ("personas",)),
+}
+
+
+class BuildPipeline:
+    """
+    Builds a simulation from its configuration in explicit, cached stages.
+
+    - ``topology``: the interaction graph
+    - ``personas``: one persona per agent
+    - ``descriptions``: the agent descriptions the LLM writes from personas
+    - ``system_prompts``: agent system messages and the mediator, per topic
+    - ``opinions``: initial opinions the analyzer derives from personas
+
+    Every stage output is stored under a key hashing the configuration fields
+    listed in ``STAGES`` and the keys of its inputs, so building again after
+    a parameter change only re-runs the affected stages: a new topic redoes
+    ``system_prompts`` alone, a new model ``descriptions`` and
+    ``system_prompts``. With ``cache_dir`` the outputs are also pickled to
+    disk and reused by later processes.
+
+    Random stages draw from generators seeded by ``config.seed`` and the
+    stage name, so equal seeds build equal populations in any pipeline.
+    Without a seed the keys of those stages include a per-pipeline nonce:
+    the pipeline reuses its own outputs, but a fresh pipeline draws a fresh
+    population and nothing is written to or read from disk. ``timings`` and
+    ``sources`` report, per stage, the seconds spent and whether the output
+    was built or came from memory or disk.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 1):
+        """
+        Create a pipeline with an empty in-memory cache.
+
+        Args:
+            cache_dir: Directory persisting stage outputs (default: memory only)
+            max_workers: Threads writing agent descriptions concurrently
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._cache: Dict[Tuple[str, str], object] = {}
+        self._nonce = os.urandom(8).hex()
+        self.keys: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.sources: Dict[str, str] = {}
+
+    @staticmethod
+    def client_label(config: SimulationConfig, llm_client: Optional[LLMClient]) -> str:
+        """What produces LLM text: the configured model or the override's class."""
+        if llm_client is None:
+            return f"{config.model_type.value}@{config.temperature}"
+        client = type(llm_client)
+        return f"{client.__module__}.{client.__qualname__}"
+
+    def cache_key(
+        self,
+        stage: str,
+        config: SimulationConfig,
+        llm_client: Optional[LLMClient] = None,
+    ) -> str:
+        """
+        Key of ``stage`` for ``config``; the keys of its inputs must be known.
+
+        LLM-backed stages also depend on ``client_label``.
+        """
+        fields, inputs = STAGES[stage]
+        payload = {
+            "stage": stage,
+            "fields": {field: getattr(config, field) for field in fields},
+            "inputs": [self.keys[name] for name in inputs],
+        }
+        if "model_type" in fields:
+            payload["client"] = self.client_label(config, llm_client)
+        if "seed" in fields and config.seed is None:
+            payload["nonce"] = self._nonce
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def invalidate(self, stage: Optional[str] = None) -> None:
+        """Drop in-memory outputs of ``stage``, or of every stage."""
+        self._cache = {
+            key: output
+            for key, output in self._cache.items()
+            if stage is not None and key[0] != stage
+        }
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{stage}-{key}.pkl")
+
+    def _run_stage(
+        self,
+        stage: str,
+        config: SimulationConfig,
+        llm_client: Optional[LLMClient],
+        build: Callable[[], object],
+    ):
+        key = self.cache_key(stage, config, llm_client)
+        self.keys[stage] = key
+        # Every stage depends on a seeded one; unseeded outputs stay private.
+        persist = self.cache_dir is not None and config.seed is not None
+        start = time.perf_counter()
+        if (stage, key) in self._cache:
+            source = "memory"
+            output = self._cache[(stage, key)]
+        elif persist and os.path.exists(self._path(stage, key)):
+            source = "disk"
+            with open(self._path(stage, key), "rb") as file:
+                output = pickle.load(file)
+        else:
+            source = "built"
+            output = build()
+            if persist:
+                temporary = f"{self._path(stage, key)}.tmp"
+                with open(temporary, "wb") as file:
+                    pickle.dump(output, file)
+                os.replace(temporary, self._path(stage, key))
+        self._cache[(stage, key)] = output
+        self.timings[stage] = time.perf_counter() - start
+        self.sources[stage] = source
+        EventHandler.handle(
+            BuildStageFinished(
+                stage=stage, key=key, source=source, seconds=self.timings[stage]
+            )
+        )
+        return output
+
+    @staticmethod
+    def _set_model(
+        agent: SimpleAgent, config: SimulationConfig, llm_client: Optional[LLMClient]
+    ) -> None:
+        if llm_client is None:
+            agent.set_model(
+                LLMConfig(model_type=config.model_type, temperature=config.temperature)
+            )
+        else:
+            agent.model = llm_client
+
+    def _agents(
+        self,
+        personas: List[Persona],
+        config: SimulationConfig,
+        llm_client: Optional[LLMClient] = None,
+    ) -> List[SimpleAgent]:
+        agents = []
+        for i, persona in enumerate(personas):
+            agent = AgentFactory.create_simple_agent(persona.model_copy(), agent_id=i)
+            self._set_model(agent, config, llm_client)
+            agents.append(agent)
+        return agents
+
+    @staticmethod
+    def stage_random(config: SimulationConfig, stage: str) -> random.Random:
+        """Generator of a random stage, seeded by ``config.seed`` and the stage."""
+        if config.seed is None:
+            return random.Random(random.getrandbits(64))
+        return random.Random(f"{config.seed}/{stage}")
+
+    @staticmethod
+    def topology_config(config: SimulationConfig) -> GraphEnvironmentConfig:
+        return GraphEnvironmentConfig(
+            num_agents=config.num_agents,
+            topology=config.topology,
+            small_world_k=config.small_world_k,
+            small_world_p=config.small_world_p,
+            seed=config.seed,
+        )
+
+    def build_topology(self, config: SimulationConfig) -> nx.Graph:
+        return GraphEnvironment(config=self.topology_config(config)).graph
+
+    def build_personas(self, config: SimulationConfig) -> List[Persona]:
+        from faker import Faker
+
+        rng = self.stage_random(config, "personas")
+        fake = Faker()
+        fake.seed_instance(rng.getrandbits(32))
+        return [
+            generate_persona(base_template, rng=rng, fake=fake)
+            for _ in range(config.num_agents)
+        ]
+
+    def build_descriptions(self, agents: List[SimpleAgent]) -> List[str]:
+        if self.max_workers == 1:
+            for agent in agents:
+                agent.create_agent_description()
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(SimpleAgent.create_agent_description, agents))
+        return [agent.agent_description for agent in agents]
+
+    def build_system_prompts(
+        self,
+        agents: List[SimpleAgent],
+        descriptions: List[str],
+        config: SimulationConfig,
+        llm_client: Optional[LLMClient],
+    ) -> Dict[str, object]:
+        for agent, description in zip(agents, descriptions):
+            agent.agent_description = description
+            agent.create_system_message(topic=config.topic)
+
+        mediator = AgentFactory.create_mediating_agent(topic=config.topic)
+        self._set_model(mediator, config, llm_client)
+        mediator.set_system_message()
+        return {
+            "agents": [agent.system_message for agent in agents],
+            "mediator": {
+                "agent_description": mediator.agent_description,
+                "topic_description": mediator.topic_description,
+                "system_message": mediator.system_message,
+            },
+        }
+
+    def build_opinions(
+        self, agents: List[SimpleAgent], config: SimulationConfig
+    ) -> List[float]:
+        rng = np.random.default_rng(
+            self.stage_random(config, "opinions").getrandbits(64)
+        )
+        analyzer = OpinionAnalyzer(llm_client=None)
+        return analyzer.initialize_opinions(agents, rng=rng).tolist()
+
+    def build(
+        self,
+        config: SimulationConfig,
+        interaction_model,
+        selection_function: Callable,
+        llm_client: Optional[LLMClient] = None,
+        environment: Optional[GraphEnvironment] = None,
+        analyzer_client: Optional[LLMClient] = None,
+    ):
+        """
+        Run every stage, reusing cached outputs, and assemble the simulator.
+
+        Args:
+            config: Simulation configuration
+            interaction_model: Simulator class, e.g. ``DialogueSimulator``
+            selection_function: Chooses the next speaker
+            llm_client: Client for every LLM call (default: from the config)
+            environment: Prebuilt topology, used as is instead of the stage
+            analyzer_client: Client of the opinion analyzer (default:
+                ``llm_client``)
+
+        Returns:
+            The simulator, with agents attached to the graph nodes
+        """
+        self.timings, self.sources = {}, {}
+        if environment is None:
+            graph = self._run_stage(
+                "topology", config, llm_client, lambda: self.build_topology(config)
+            )
+            environment = GraphEnvironment.from_graph(
+                graph.copy(), config=self.topology_config(config)
+            )
+        personas = self._run_stage(
+            "personas", config, llm_client, lambda: self.build_personas(config)
+        )
+        # One set of agents serves every stage that needs them.
+        agents = self._agents(personas, config, llm_client)
+        descriptions = self._run_stage(
+            "descriptions",
+            config,
+            llm_client,
+            lambda: self.build_descriptions(agents),
+        )
+        prompts = self._run_stage(
+            "system_prompts",
+            config,
+            llm_client,
+            lambda: self.build_system_prompts(agents, descriptions, config, llm_client),
+        )
+        opinions = self._run_stage(
+            "opinions",
+            config,
+            llm_client,
+            lambda: self.build_opinions(agents, config),
+        )
+
+        for agent, description, system_message, opinion in zip(
+            agents, descriptions, prompts["agents"], opinions
+        ):
+            agent.agent_description = description
+            agent.system_message = system_message
+            agent.set_opinion(opinion)
+
+        mediator = AgentFactory.create_mediating_agent(topic=config.topic)
+        self._set_model(mediator, config, llm_client)
+        for name, value in prompts["mediator"].items():
+            setattr(mediator, name, value)
+
+        opinion_analyzer = OpinionAnalyzer(
+            llm_client=analyzer_client or llm_client,
+            update_frequency=config.opinion_update_frequency,
+            batch_size=config.opinion_batch_size,
+            incremental=config.opinion_incremental,
+        )
+        simulator = interaction_model(
+            environment=environment,
+            mediating_agent=mediator,
+            agents=agents,
+            selection_function=selection_function,
+            topic=config.topic,
+            opinion_analyzer=opinion_analyzer,
+        )
+        attach_agents_to_nodes(simulator.environment.graph, simulator.agents)
+        return simulator
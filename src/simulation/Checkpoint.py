@@ -0,0 +1,329 @@
+import os
+import pickle
+import random
+import struct
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from agents.SimpleAgent import MediatingAgent, SimpleAgent
+from configs.configs import LLMConfig, SimulationConfig
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.DialogueSimulation import DialogueSimulator
+from llm.base import LLMClient
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+from utils.event_handler import CheckpointWritten, EventHandler
+
+MAGIC = b"EACKPT1\n"
+FULL, DELTA = 0, 1
+_RECORD_HEADER = struct.Struct("<BI")
+
+# Agent fields saved as they are; the message lists are appended to instead.
+AGENT_FIELDS = (
+    "name",
+    "agent_id",
+    "opinion",
+    "system_message",
+    "prefix",
+    "persona",
+    "agent_description",
+    "subject_description",
+    "base_descriptor_system_message",
+)
+MEDIATOR_FIELDS = AGENT_FIELDS + ("topic", "topic_description")
+MESSAGE_LISTS = ("message_history", "personal_message_history")
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint file is missing, corrupt or incompatible"""
+
+
+def _participants(simulator: DialogueSimulator) -> List[SimpleAgent]:
+    return simulator.agents + [simulator.mediating_agent]
+
+
+def _scalars(agent: SimpleAgent) -> Dict[str, Any]:
+    fields = MEDIATOR_FIELDS if isinstance(agent, MediatingAgent) else AGENT_FIELDS
+    values = {field: getattr(agent, field) for field in fields}
+    if values["persona"] is not None:
+        values["persona"] = values["persona"].model_dump()
+    return values
+
+
+class CheckpointWriter:
+    """
+    Appends checkpoints of a dialogue simulation to one binary file.
+
+    The file starts with ``MAGIC`` and holds a sequence of records, each a
+    kind byte, a payload length and a zlib-compressed pickle. The first
+    checkpoint a writer takes is a full snapshot: configuration, graph,
+    every agent and the mediator, the conversation log, ``_step`` and the
+    random number generator states. Later checkpoints are deltas with only
+    what changed: the new tails of the append-only message lists, changed
+    agent fields, opinions, counters and RNG states. Replaying the records
+    in order restores the latest state.
+    """
+
+    def __init__(self, path: str, every: int = 10, compression_level: int = 1):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Checkpoint file; appended to if it exists
+            every: Rounds between checkpoints, see ``due``
+            compression_level: zlib level, 1 (fast) to 9 (small)
+        """
+        self.path = path
+        self.every = every
+        self.compression_level = compression_level
+        self._lengths: Optional[List[List[int]]] = None
+        self._history_length = 0
+        self._step = 0
+        self._scalars: List[Dict[str, Any]] = []
+
+    def due(self, rounds_completed: int) -> bool:
+        return rounds_completed % self.every == 0
+
+    def write(self, runner) -> int:
+        """
+        Append a checkpoint of ``runner`` (a SimulationRunner).
+
+        Returns:
+            Size of the record in bytes
+        """
+        simulator = runner.interaction_model
+        participants = _participants(simulator)
+        lengths = [
+            [len(getattr(agent, name)) for name in MESSAGE_LISTS]
+            for agent in participants
+        ]
+        scalars = [_scalars(agent) for agent in participants]
+        # Lists only ever grow between resets; anything else needs a snapshot.
+        incremental = (
+            self._lengths is not None
+            and len(lengths) == len(self._lengths)
+            and simulator._step >= self._step
+            and len(simulator.history) >= self._history_length
+            and all(
+                new >= old
+                for current, previous in zip(lengths, self._lengths)
+                for new, old in zip(current, previous)
+            )
+        )
+
+        if incremental:
+            kind = DELTA
+            state = self._counters(runner)
+            state["history"] = simulator.history[self._history_length :]
+            state["opinions"] = [agent.get_opinion() for agent in participants]
+            state["messages"] = {}
+            state["fields"] = {}
+            for index, agent in enumerate(participants):
+                tails = [
+                    getattr(agent, name)[old:]
+                    for name, old in zip(MESSAGE_LISTS, self._lengths[index])
+                ]
+                if any(tails):
+                    state["messages"][index] = tails
+                changed = {
+                    field: value
+                    for field, value in scalars[index].items()
+                    if value != self._scalars[index][field]
+                }
+                if changed:
+                    state["fields"][index] = changed
+        else:
+            kind = FULL
+            state = self._counters(runner)
+            state["config"] = runner.config.model_dump()
+            graph = simulator.environment.graph
+            state["num_nodes"] = graph.number_of_nodes()
+            state["edges"] = list(graph.edges())
+            state["history"] = list(simulator.history)
+            state["participants"] = [
+                dict(
+                    scalars[index],
+                    **{name: list(getattr(agent, name)) for name in MESSAGE_LISTS},
+                )
+                for index, agent in enumerate(participants)
+            ]
+            analyzer = simulator.opinion_analyzer
+            state["update_frequency"] = analyzer.update_frequency if analyzer else None
+
+        payload = zlib.compress(
+            pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL),
+            self.compression_level,
+        )
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "ab") as file:
+            if new_file:
+                file.write(MAGIC)
+            file.write(_RECORD_HEADER.pack(kind, len(payload)))
+            file.write(payload)
+
+        self._lengths = lengths
+        self._history_length = len(simulator.history)
+        self._step = simulator._step
+        self._scalars = scalars
+        size = _RECORD_HEADER.size + len(payload)
+        EventHandler.handle(
+            CheckpointWritten(path=self.path, full=kind == FULL, size=size)
+        )
+        return size
+
+    @staticmethod
+    def _counters(runner) -> Dict[str, Any]:
+        simulator = runner.interaction_model
+        analyzer = simulator.opinion_analyzer
+        return {
+            "rounds_completed": runner.rounds_completed,
+            "stop_reason": runner.stop_reason,
+            "step": simulator._step,
+            "round": simulator._round,
+            "random_state": random.getstate(),
+            "numpy_state": np.random.get_state(),
+            # Messages awaiting incremental opinion analysis, per participant.
+            "pending": [
+                list(analyzer.pending_messages(agent)) if analyzer else []
+                for agent in _participants(simulator)
+            ],
+        }
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    """
+    Replay a checkpoint file into the latest saved state.
+
+    A record cut short by a crash while writing is ignored.
+
+    Args:
+        path: Checkpoint file written by CheckpointWriter
+
+    Returns:
+        The state of the last full snapshot with all later deltas applied
+    """
+    if not os.path.exists(path):
+        raise CheckpointError(f"No checkpoint at {path}")
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        raise CheckpointError(f"{path} is not a checkpoint file")
+
+    state = None
+    offset = len(MAGIC)
+    while offset + _RECORD_HEADER.size <= len(data):
+        kind, length = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        if start + length > len(data):
+            break
+        record = pickle.loads(zlib.decompress(data[start : start + length]))
+        offset = start + length
+        if kind == FULL:
+            state = record
+        elif state is None:
+            raise CheckpointError(f"{path} starts with a delta record")
+        else:
+            _apply_delta(state, record)
+    if state is None:
+        raise CheckpointError(f"{path} holds no complete checkpoint")
+    return state
+
+
+def _apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    participants = state["participants"]
+    state["history"].extend(delta["history"])
+    for index, tails in delta["messages"].items():
+        for name, tail in zip(MESSAGE_LISTS, tails):
+            participants[index][name].extend(tail)
+    for index, fields in delta["fields"].items():
+        participants[index].update(fields)
+    for participant, opinion in zip(participants, delta["opinions"]):
+        participant["opinion"] = opinion
+    for key in (
+        "rounds_completed",
+        "step",
+        "round",
+        "random_state",
+        "numpy_state",
+        "pending",
+    ):
+        state[key] = delta[key]
+    # Checkpoints written before stop reasons were recorded lack the key.
+    state["stop_reason"] = delta.get("stop_reason")
+
+
+def restore_simulator(
+    state: Dict[str, Any],
+    selection_function: Callable[[List[SimpleAgent]], int],
+    llm_client: Optional[LLMClient] = None,
+    analyzer_client: Optional[LLMClient] = None,
+) -> DialogueSimulator:
+    """
+    Rebuild the dialogue of a loaded checkpoint without any LLM setup calls.
+
+    Agent descriptions and system messages come from the checkpoint. The
+    global random number generators are restored as well.
+
+    Args:
+        state: State returned by ``load_checkpoint``
+        selection_function: Speaker selection of the simulator
+        llm_client: Client of every agent (default: built from the
+            configuration's model type)
+        analyzer_client: Client of the opinion analyzer
+
+    Returns:
+        The restored DialogueSimulator, with agents attached to its graph
+    """
+    config = SimulationConfig(**state["config"])
+    llm_config = LLMConfig(model_type=config.model_type, temperature=config.temperature)
+
+    participants = []
+    for values in state["participants"]:
+        agent_class = MediatingAgent if "topic_description" in values else SimpleAgent
+        agent = agent_class(
+            **{key: value for key, value in values.items() if key != "opinion"}
+        )
+        # SimpleAgent derives the prefix from the name on construction.
+        agent.prefix = values["prefix"]
+        agent.set_opinion(values["opinion"])
+        if llm_client is None:
+            agent.set_model(llm_config)
+        else:
+            agent.model = llm_client
+        participants.append(agent)
+    agents, mediator = participants[:-1], participants[-1]
+
+    graph = nx.Graph()
+    graph.add_nodes_from(range(state["num_nodes"]))
+    graph.add_edges_from(state["edges"])
+    for node, agent in enumerate(agents):
+        graph.nodes[node]["agent"] = agent
+
+    analyzer = None
+    if state["update_frequency"] is not None:
+        analyzer = OpinionAnalyzer(
+            llm_client=analyzer_client or llm_client,
+            update_frequency=state["update_frequency"],
+            batch_size=config.opinion_batch_size,
+            incremental=config.opinion_incremental,
+        )
+        for agent, messages in zip(participants, state.get("pending", [])):
+            for entry in messages:
+                analyzer.record_delivery(entry, [agent])
+    simulator = DialogueSimulator(
+        environment=GraphEnvironment.from_graph(graph),
+        selection_function=selection_function,
+        agents=agents,
+        mediating_agent=mediator,
+        topic=config.topic,
+        opinion_analyzer=analyzer,
+    )
+    simulator.history = state["history"]
+    simulator._step = state["step"]
+    simulator._round = state["round"]
+
+    random.setstate(state["random_state"])
+    np.random.set_state(state["numpy_state"])
+    return simulator
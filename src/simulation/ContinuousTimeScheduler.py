@@ -0,0 +1,220 @@
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from environments.CSRGraph import as_csr_graph
+from interactions.base_interaction import ArrayInteraction, BaseInteraction
+from interactions.DialogueSimulation import DialogueSimulator
+
+# Relative activity of personas, keyed by the personality trait.
+PERSONA_ACTIVITY = {"extrovert": 1.5, "introvert": 0.5}
+
+RateSpec = Union[str, Callable[[BaseAgent], float], Sequence[float], np.ndarray]
+
+
+def persona_activation_rate(agent: BaseAgent) -> float:
+    """Activation rate of an agent from its persona's personality trait."""
+    persona = getattr(agent, "persona", None)
+    if persona is None or not persona.traits:
+        return 1.0
+    traits = persona.traits.lower()
+    for trait, rate in PERSONA_ACTIVITY.items():
+        if trait in traits:
+            return rate
+    return 1.0
+
+
+def activation_rates(
+    spec: RateSpec,
+    num_agents: int,
+    graph=None,
+    agents: Optional[List[BaseAgent]] = None,
+) -> np.ndarray:
+    """
+    Build per-agent activation rates.
+
+    Args:
+        spec: "constant" (all 1), "degree" (degree over mean degree),
+            "persona" (see PERSONA_ACTIVITY), a callable mapping an agent to
+            its rate, or an explicit array of rates
+        num_agents: Number of agents
+        graph: Topology, required for "degree"
+        agents: Agents, required for "persona" and callables
+
+    Returns:
+        Array of non-negative rates, one per agent
+    """
+    if isinstance(spec, str):
+        if spec == "constant":
+            rates = np.ones(num_agents)
+        elif spec == "degree":
+            if graph is None:
+                raise ValueError("Degree-dependent rates need a graph")
+            degree = as_csr_graph(graph).degree.astype(float)
+            rates = degree / degree.mean()
+        elif spec == "persona":
+            if agents is None:
+                raise ValueError("Persona-dependent rates need agents")
+            rates = np.array([persona_activation_rate(agent) for agent in agents])
+        else:
+            raise ValueError(
+                "Invalid rates. Choose from ['constant', 'degree', 'persona']"
+            )
+    elif callable(spec):
+        if agents is None:
+            raise ValueError("Rate functions need agents")
+        rates = np.array([spec(agent) for agent in agents], dtype=float)
+    else:
+        rates = np.asarray(spec, dtype=float)
+
+    if rates.shape != (num_agents,):
+        raise ValueError(f"Expected {num_agents} rates, got shape {rates.shape}")
+    if (rates < 0).any() or not rates.sum() > 0:
+        raise ValueError("Rates must be non-negative with a positive total")
+    return rates
+
+
+class ContinuousTimeScheduler:
+    """
+    Event-driven (Gillespie) scheduler for interaction models.
+
+    Every agent activates as an independent Poisson process with its own
+    rate. With static rates the superposed process is sampled rejection-free:
+    inter-event times are exponential with the total rate and the active
+    agent is found by bisecting the cumulative rate table, so no time is
+    spent on agents that do not act. Events are drawn in batches and
+    dispatched to the model:
+
+    - ``ArrayInteraction`` models receive the batch through ``update_nodes``
+    - ``DialogueSimulator`` speaks once per event via ``step(speaker_idx)``
+    - other ``BaseInteraction`` models (``VoterModel``, ``MajorityRule``)
+      call ``interact`` on the agents attached to ``environment``
+    """
+
+    def __init__(
+        self,
+        model: Union[ArrayInteraction, BaseInteraction, DialogueSimulator],
+        rates: RateSpec = "constant",
+        environment=None,
+        seed=None,
+        batch_size: int = 1024,
+        mediator_rate: float = 0.0,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            model: Interaction model to drive
+            rates: Activation rates, see ``activation_rates``
+            environment: GraphEnvironment with agents attached to its nodes,
+                required for agent-level ``BaseInteraction`` models
+            seed: Seed or ``numpy.random.Generator`` for event sampling
+            batch_size: Events drawn per batch; array models receive whole
+                batches through ``update_nodes``
+            mediator_rate: Activation rate of a DialogueSimulator's mediator
+        """
+        self.model = model
+        self.environment = environment
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.time = 0.0
+        self.num_events = 0
+
+        if isinstance(model, ArrayInteraction):
+            if not hasattr(model, "update_nodes"):
+                raise TypeError(f"{type(model).__name__} has no update_nodes")
+            graph, agents = model.graph, None
+            num_agents = model.num_nodes
+        elif isinstance(model, DialogueSimulator):
+            graph, agents = model.environment, model.agents
+            num_agents = len(model.agents)
+        elif isinstance(model, BaseInteraction):
+            if environment is None:
+                raise ValueError(f"{type(model).__name__} needs an environment")
+            graph = environment
+            agents = [data["agent"] for _, data in environment.graph.nodes(data=True)]
+            num_agents = len(agents)
+        else:
+            raise TypeError(f"Cannot schedule {type(model).__name__}")
+        self._agents = agents
+
+        rates = activation_rates(rates, num_agents, graph=graph, agents=agents)
+        if isinstance(model, DialogueSimulator):
+            # The mediator sits after the agents, as in DialogueSimulator.step.
+            rates = np.append(rates, mediator_rate)
+        self.set_rates(rates)
+        self.activations = np.zeros(len(self.rates), dtype=np.int64)
+
+    def set_rates(self, rates: np.ndarray) -> None:
+        """Replace the activation rates (O(N) rebuild of the rate table)."""
+        self.rates = np.asarray(rates, dtype=float)
+        self._cumulative = np.cumsum(self.rates)
+        self.total_rate = float(self._cumulative[-1])
+        self._last_active = int(np.flatnonzero(self.rates)[-1])
+
+    def next_events(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw the next ``count`` events without dispatching them.
+
+        Args:
+            count: Number of events
+
+        Returns:
+            ``(times, agents)``: absolute event times and acting agent indices
+        """
+        times = self.time + np.cumsum(
+            self.rng.standard_exponential(count) / self.total_rate
+        )
+        targets = self.rng.random(count) * self.total_rate
+        agents = np.searchsorted(self._cumulative, targets, side="right")
+        # Guard against round-off at the top of the table.
+        return times, np.minimum(agents, self._last_active)
+
+    def run(
+        self, until_time: Optional[float] = None, max_events: Optional[int] = None
+    ) -> int:
+        """
+        Dispatch events until ``until_time`` or ``max_events`` is reached.
+
+        Args:
+            until_time: Simulated time to stop at
+            max_events: Maximum number of events to dispatch
+
+        Returns:
+            Number of events dispatched
+        """
+        if until_time is None and max_events is None:
+            raise ValueError("Provide until_time or max_events")
+        dispatched = 0
+        while max_events is None or dispatched < max_events:
+            count = self.batch_size
+            if max_events is not None:
+                count = min(count, max_events - dispatched)
+            times, agents = self.next_events(count)
+            if until_time is not None and times[-1] > until_time:
+                keep = int(np.searchsorted(times, until_time, side="right"))
+                times, agents = times[:keep], agents[:keep]
+            if len(agents):
+                self._dispatch(agents)
+                self.time = float(times[-1])
+                dispatched += len(agents)
+                self.activations += np.bincount(agents, minlength=len(self.rates))
+            if len(agents) < count:
+                self.time = until_time
+                break
+        self.num_events += dispatched
+        return dispatched
+
+    def _dispatch(self, agents: np.ndarray) -> None:
+        if isinstance(self.model, ArrayInteraction):
+            self.model.update_nodes(agents)
+        elif isinstance(self.model, DialogueSimulator):
+            for speaker_idx in agents.tolist():
+                self.model.step(speaker_idx=speaker_idx)
+        else:
+            graph = self.environment.graph
+            for node in agents.tolist():
+                neighbors = [graph.nodes[other]["agent"] for other in graph[node]]
+                if neighbors:
+                    self.model.interact(self._agents[node], neighbors)
@@ -0,0 +1,307 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+from pydantic import BaseModel
+
+from configs.configs import GraphEnvironmentConfig, InteractionType, SimulationConfig
+from environments.CSRGraph import CSRGraph
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.BoundedConfidence import DeffuantModel, HegselmannKrauseModel
+from interactions.DialogueSimulation import DialogueSimulator
+from interactions.MajorityRule import VectorizedMajorityRule
+from interactions.ReplicaEngine import ReplicaEngine
+from interactions.VoterModel import VectorizedVoterModel
+from llm.base import LLMClient
+from simulation.SimulationRunner import SimulationRunner
+
+CLASSICAL_MODELS = {
+    InteractionType.VOTER: VectorizedVoterModel,
+    InteractionType.MAJORITY: VectorizedMajorityRule,
+    InteractionType.DEFFUANT: DeffuantModel,
+    InteractionType.HEGSELMANN_KRAUSE: HegselmannKrauseModel,
+}
+
+# Topology shared by every replica a worker runs, set once per process.
+_shared_topology: Dict[str, object] = {}
+
+
+class ReplicaResult(BaseModel):
+    replica: int
+    consensus_time: Optional[float] = None
+    elapsed_time: float
+    mean_opinion: float
+    opinion_variance: float
+    histogram: List[int]
+
+
+def _init_worker(graph: nx.Graph, csr: CSRGraph) -> None:
+    _shared_topology["graph"] = graph
+    _shared_topology["csr"] = csr
+
+
+def run_replica(
+    config: SimulationConfig,
+    replica: int,
+    seed: np.random.SeedSequence,
+    llm_client_factory: Optional[Callable[[], LLMClient]] = None,
+    histogram_bins: int = 20,
+    consensus_tolerance: float = 1e-3,
+) -> ReplicaResult:
+    """
+    Run one replica on the topology shared by this process.
+
+    Classical replicas run for at most ``config.num_rounds`` sweeps; dialogue
+    replicas for at most ``config.num_rounds`` steps. Both stop at consensus.
+
+    Args:
+        config: Simulation configuration
+        replica: Replica index
+        seed: Seed sequence spawned for this replica
+        llm_client_factory: Builds the LLM client for dialogue replicas
+        histogram_bins: Number of bins over [-1, 1] for final opinions
+        consensus_tolerance: Opinion spread below which a dialogue replica
+            counts as having reached consensus
+
+    Returns:
+        Summary of the replica
+    """
+    rng = np.random.default_rng(seed)
+    if config.interaction_type in CLASSICAL_MODELS:
+        model = CLASSICAL_MODELS[config.interaction_type](
+            _shared_topology["csr"], seed=rng
+        )
+        model.run(max_time=config.num_rounds)
+        opinions = model.opinions.astype(float)
+        consensus_time = model.consensus_time
+        elapsed_time = model.time
+    else:
+        opinions, consensus_time, elapsed_time = _run_dialogue_replica(
+            config, rng, llm_client_factory, consensus_tolerance
+        )
+
+    return _replica_result(
+        replica, opinions, consensus_time, elapsed_time, histogram_bins
+    )
+
+
+def _replica_result(replica, opinions, consensus_time, elapsed_time, histogram_bins):
+    histogram, _ = np.histogram(opinions, bins=histogram_bins, range=(-1.0, 1.0))
+    return ReplicaResult(
+        replica=replica,
+        consensus_time=consensus_time,
+        elapsed_time=elapsed_time,
+        mean_opinion=float(opinions.mean()),
+        opinion_variance=float(opinions.var()),
+        histogram=histogram.tolist(),
+    )
+
+
+def _run_dialogue_replica(config, rng, llm_client_factory, consensus_tolerance):
+    from faker import Faker
+
+    python_seed = int(rng.integers(2**32))
+    random.seed(python_seed)
+    Faker.seed(python_seed)
+    # Agents get attached to the nodes, so each replica needs its own copy.
+    environment = GraphEnvironment.from_graph(_shared_topology["graph"].copy())
+
+    runner = SimulationRunner(
+        # The build pipeline seeds personas and opinions from the config.
+        config=config.model_copy(update={"seed": python_seed}),
+        interaction_model=DialogueSimulator,
+        llm_client=llm_client_factory() if llm_client_factory else None,
+        environment=environment,
+    )
+    simulator = runner.interaction_model
+    opinions = np.array([agent.get_opinion() for agent in simulator.agents])
+    consensus_time = None
+    for step in range(1, config.num_rounds + 1):
+        simulator.step()
+        opinions = np.array([agent.get_opinion() for agent in simulator.agents])
+        if np.ptp(opinions) <= consensus_tolerance:
+            consensus_time = float(step)
+            break
+    return opinions.astype(float), consensus_time, float(simulator._step)
+
+
+class EnsembleSummary:
+    """Streaming aggregate of replica results; independent of arrival order."""
+
+    def __init__(self, histogram_bins: int = 20):
+        self.histogram_bins = histogram_bins
+        self.histogram = np.zeros(histogram_bins, dtype=np.int64)
+        self.results: Dict[int, ReplicaResult] = {}
+
+    def add(self, result: ReplicaResult) -> None:
+        self.results[result.replica] = result
+        self.histogram += np.asarray(result.histogram, dtype=np.int64)
+
+    @property
+    def num_replicas(self) -> int:
+        return len(self.results)
+
+    def consensus_times(self) -> np.ndarray:
+        """Consensus times of the replicas that reached consensus, by replica."""
+        return np.array(
+            [
+                self.results[replica].consensus_time
+                for replica in sorted(self.results)
+                if self.results[replica].consensus_time is not None
+            ]
+        )
+
+    def summary(self) -> Dict[str, object]:
+        times = self.consensus_times()
+        means = np.array(
+            [self.results[replica].mean_opinion for replica in sorted(self.results)]
+        )
+        return {
+            "num_replicas": self.num_replicas,
+            "consensus_fraction": len(times) / max(self.num_replicas, 1),
+            "consensus_time_mean": float(times.mean()) if len(times) else None,
+            "consensus_time_median": float(np.median(times)) if len(times) else None,
+            "consensus_time_std": float(times.std()) if len(times) else None,
+            "final_opinion_mean": float(means.mean()) if len(means) else None,
+            "final_opinion_histogram": self.histogram.tolist(),
+        }
+
+
+class EnsembleRunner:
+    """
+    Runs independent replicas of a SimulationConfig across a process pool.
+
+    Replica seeds are spawned from one ``SeedSequence`` (rooted at
+    ``config.seed``), so every replica gets the same stream whatever the
+    number of workers or the order in which results come back. The topology
+    is built once and handed to each worker process a single time; all
+    replicas share that one realization.
+
+    With ``batched=True`` classical replicas instead run together in a single
+    ``ReplicaEngine``, which avoids per-replica overhead altogether; the
+    replicas are then drawn from one generator rooted at ``config.seed``.
+    """
+
+    def __init__(
+        self,
+        config: SimulationConfig,
+        num_replicas: int,
+        max_workers: Optional[int] = None,
+        llm_client_factory: Optional[Callable[[], LLMClient]] = None,
+        histogram_bins: int = 20,
+        consensus_tolerance: float = 1e-3,
+        batched: bool = False,
+    ):
+        """
+        Initialize the ensemble.
+
+        Args:
+            config: Configuration every replica runs
+            num_replicas: Number of replicas R
+            max_workers: Worker processes (default: CPU count; 1 runs inline)
+            llm_client_factory: Picklable callable building the LLM client of
+                dialogue replicas, e.g. a fake client class
+            histogram_bins: Number of bins over [-1, 1] for final opinions
+            consensus_tolerance: Opinion spread counted as consensus in
+                dialogue replicas
+            batched: Run classical replicas in one ReplicaEngine pass
+        """
+        if batched and config.interaction_type not in CLASSICAL_MODELS:
+            raise ValueError("Batched ensembles need a classical interaction type")
+        self.config = config
+        self.num_replicas = num_replicas
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.llm_client_factory = llm_client_factory
+        self.histogram_bins = histogram_bins
+        self.consensus_tolerance = consensus_tolerance
+        self.batched = batched
+
+        environment = GraphEnvironment(
+            config=GraphEnvironmentConfig(
+                num_agents=config.num_agents,
+                topology=config.topology,
+                small_world_k=config.small_world_k,
+                small_world_p=config.small_world_p,
+                seed=config.seed,
+            )
+        )
+        self.graph = environment.graph
+        self.csr = environment.to_csr()
+
+    def replica_seeds(self) -> List[np.random.SeedSequence]:
+        return np.random.SeedSequence(self.config.seed).spawn(self.num_replicas)
+
+    def run(
+        self, callback: Optional[Callable[[ReplicaResult], None]] = None
+    ) -> EnsembleSummary:
+        """
+        Run every replica and aggregate the results as they arrive.
+
+        Args:
+            callback: Called with each ReplicaResult as soon as it is ready
+
+        Returns:
+            Aggregated statistics over all replicas
+        """
+        summary = EnsembleSummary(self.histogram_bins)
+        if self.batched:
+            return self._run_batched(summary, callback)
+        arguments = [
+            (
+                self.config,
+                replica,
+                seed,
+                self.llm_client_factory,
+                self.histogram_bins,
+                self.consensus_tolerance,
+            )
+            for replica, seed in enumerate(self.replica_seeds())
+        ]
+
+        if self.max_workers == 1:
+            _init_worker(self.graph, self.csr)
+            results = (run_replica(*args) for args in arguments)
+            for result in results:
+                summary.add(result)
+                if callback:
+                    callback(result)
+            return summary
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.graph, self.csr),
+        ) as executor:
+            futures = [executor.submit(run_replica, *args) for args in arguments]
+            for future in as_completed(futures):
+                result = future.result()
+                summary.add(result)
+                if callback:
+                    callback(result)
+        return summary
+
+    def _run_batched(self, summary, callback):
+        engine = ReplicaEngine(
+            self.csr,
+            self.num_replicas,
+            model=self.config.interaction_type,
+            seed=self.config.seed,
+        )
+        engine.run(max_time=self.config.num_rounds)
+        for replica in range(self.num_replicas):
+            consensus_time = engine.consensus_time[replica]
+            reached = not np.isnan(consensus_time)
+            result = _replica_result(
+                replica,
+                engine.opinions[replica].astype(float),
+                float(consensus_time) if reached else None,
+                float(consensus_time) if reached else engine.time,
+                self.histogram_bins,
+            )
+            summary.add(result)
+            if callback:
+                callback(result)
+        return summary
@@ -0,0 +1,249 @@
+import itertools
+from typing import Callable, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from agents.SimpleAgent import MediatingAgent, SimpleAgent
+from environments.CSRGraph import CSRGraph, as_csr_graph
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.BoundedConfidence import BoundedConfidenceModel
+from interactions.DialogueSimulation import DialogueSimulator
+from interactions.base_interaction import ArrayInteraction
+
+CORE_STRATEGIES = ("degree", "random")
+
+
+def select_core_nodes(
+    graph, size: int, strategy: str = "degree", seed=None
+) -> np.ndarray:
+    """
+    Choose the nodes that become LLM-driven agents.
+
+    Args:
+        graph: CSRGraph, networkx graph or GraphEnvironment
+        size: Number of core nodes
+        strategy: "degree" for the best-connected nodes (hubs), "random" for
+            a uniform sample
+        seed: Seed or ``numpy.random.Generator`` for the random strategy
+
+    Returns:
+        Sorted array of core node indices
+    """
+    graph = as_csr_graph(graph)
+    if not 0 < size <= graph.num_nodes:
+        raise ValueError(f"size must be between 1 and {graph.num_nodes}")
+    if strategy == "degree":
+        nodes = np.argsort(-graph.degree, kind="stable")[:size]
+    elif strategy == "random":
+        rng = np.random.default_rng(seed)
+        nodes = rng.choice(graph.num_nodes, size=size, replace=False)
+    else:
+        raise ValueError(f"Invalid strategy. Choose from {list(CORE_STRATEGIES)}")
+    return np.sort(nodes)
+
+
+def core_environment(
+    graph: CSRGraph, core_nodes: np.ndarray, agents: List[SimpleAgent]
+) -> GraphEnvironment:
+    """
+    The subgraph induced by the core nodes, with ``agents`` attached.
+
+    Node ``i`` of the returned environment is ``core_nodes[i]`` of ``graph``.
+    """
+    position = np.full(graph.num_nodes, -1, dtype=np.int64)
+    position[core_nodes] = np.arange(len(core_nodes))
+    owners, positions = graph.neighbor_positions(core_nodes)
+    neighbors = position[graph.indices[positions]]
+    inside = neighbors >= 0
+
+    subgraph = nx.Graph()
+    subgraph.add_nodes_from(range(len(core_nodes)))
+    subgraph.add_edges_from(zip(owners[inside].tolist(), neighbors[inside].tolist()))
+    for node, agent in enumerate(agents):
+        subgraph.nodes[node]["agent"] = agent
+    return GraphEnvironment.from_graph(subgraph)
+
+
+def round_robin_selector() -> Callable[[List[SimpleAgent]], int]:
+    """Selection function letting the core agents speak in turn, never the mediator."""
+    counter = itertools.count()
+    return lambda agents: next(counter) % (len(agents) - 1)
+
+
+class HybridSimulation:
+    """
+    LLM-embodied core agents embedded in a large array-backed population.
+
+    The core nodes are full ``SimpleAgent``s that talk through a
+    ``DialogueSimulator`` over the subgraph they induce. Every other node is
+    driven by an ``ArrayInteraction`` model over the whole topology, in which
+    the core nodes are frozen. Each step opinions flow both ways:
+
+    1. every core agent receives a summary of its classical neighbors'
+       opinions as a message (and, with ``neighborhood_weight``, moves
+       toward their mean)
+    2. the core agents hold ``dialogue_steps`` dialogue turns, which is where
+       all LLM calls happen
+    3. the core opinions are written into the array
+    4. the classical population runs for ``sweeps_per_step`` sweeps, reading
+       the core opinions like any other neighbor's
+    """
+
+    def __init__(
+        self,
+        model: ArrayInteraction,
+        core_nodes: np.ndarray,
+        simulator: DialogueSimulator,
+        dialogue_steps: Optional[int] = None,
+        sweeps_per_step: float = 1.0,
+        neighborhood_weight: float = 0.0,
+        summary_sender: str = "Community",
+    ):
+        """
+        Initialize the hybrid simulation.
+
+        Args:
+            model: Classical model over the full topology
+            core_nodes: Node of each core agent, aligned with ``simulator.agents``
+            simulator: Dialogue between the core agents
+            dialogue_steps: Dialogue turns per step (default: one per core agent)
+            sweeps_per_step: Classical sweeps per step
+            neighborhood_weight: Fraction of the distance to the mean classical
+                neighbor opinion a core agent moves each step
+            summary_sender: Name the neighborhood summaries are sent under
+        """
+        self.model = model
+        self.core_nodes = np.asarray(core_nodes, dtype=np.int64)
+        self.simulator = simulator
+        if len(self.core_nodes) != len(simulator.agents):
+            raise ValueError("Expected one core node per dialogue agent")
+        if not 0 <= neighborhood_weight <= 1:
+            raise ValueError("neighborhood_weight must be in [0, 1]")
+        self.dialogue_steps = dialogue_steps or len(self.core_nodes)
+        self.sweeps_per_step = sweeps_per_step
+        self.neighborhood_weight = neighborhood_weight
+        self.summary_sender = summary_sender
+        self.continuous = isinstance(model, BoundedConfidenceModel)
+        self._step = 0
+
+        # Classical neighbors of every core node, grouped by core agent.
+        graph = model.graph
+        core = np.zeros(graph.num_nodes, dtype=bool)
+        core[self.core_nodes] = True
+        owners, positions = graph.neighbor_positions(self.core_nodes)
+        neighbors = graph.indices[positions]
+        classical = ~core[neighbors]
+        self._owners, self._neighbors = owners[classical], neighbors[classical]
+
+        model.freeze(self.core_nodes)
+        self.write_core_opinions()
+
+    @classmethod
+    def build(
+        cls,
+        model: ArrayInteraction,
+        agents: List[SimpleAgent],
+        core_nodes: np.ndarray,
+        mediating_agent: Optional[MediatingAgent] = None,
+        topic: str = "",
+        opinion_analyzer=None,
+        selection_function: Optional[Callable[[List[SimpleAgent]], int]] = None,
+        **kwargs,
+    ) -> "HybridSimulation":
+        """
+        Set up the core dialogue over the subgraph induced by ``core_nodes``.
+
+        Args:
+            model: Classical model over the full topology
+            agents: Core agents with models and system messages set
+            core_nodes: Node of each core agent, e.g. from ``select_core_nodes``
+            mediating_agent: Mediator of the core dialogue
+            topic: Topic of the core dialogue
+            opinion_analyzer: Analyzer updating the core agents' opinions
+            selection_function: Speaker selection (default: round robin)
+            **kwargs: Passed on to ``HybridSimulation``
+
+        Returns:
+            The hybrid simulation
+        """
+        core_nodes = np.asarray(core_nodes, dtype=np.int64)
+        simulator = DialogueSimulator(
+            environment=core_environment(model.graph, core_nodes, agents),
+            selection_function=selection_function or round_robin_selector(),
+            agents=agents,
+            mediating_agent=mediating_agent,
+            topic=topic,
+            opinion_analyzer=opinion_analyzer,
+        )
+        return cls(model, core_nodes, simulator, **kwargs)
+
+    def neighborhood_summaries(self):
+        """
+        Opinions of the classical neighbors of every core agent.
+
+        Returns:
+            ``(counts, means, positive, negative)`` arrays over the core agents
+            (``positive`` and ``negative`` count opinions above and below 0)
+        """
+        size = len(self.core_nodes)
+        values = self.model.opinions[self._neighbors].astype(float)
+        counts = np.bincount(self._owners, minlength=size)
+        sums = np.bincount(self._owners, weights=values, minlength=size)
+        positive = np.bincount(self._owners[values > 0], minlength=size)
+        negative = np.bincount(self._owners[values < 0], minlength=size)
+        means = np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+        return counts, means, positive, negative
+
+    def deliver_neighborhood_summaries(self) -> None:
+        """Tell each core agent what its classical neighbors think."""
+        counts, means, positive, negative = self.neighborhood_summaries()
+        for agent, count, mean, pos, neg in zip(
+            self.simulator.agents,
+            counts.tolist(),
+            means.tolist(),
+            positive.tolist(),
+            negative.tolist(),
+        ):
+            if not count:
+                continue
+            if self.continuous:
+                message = (
+                    f"Your {count} other contacts hold an average opinion of "
+                    f"{mean:+.2f} on a scale from -1 (change) to +1 (status quo)."
+                )
+            else:
+                message = (
+                    f"Of your {count} other contacts, {pos} favor the status quo "
+                    f"and {neg} favor change."
+                )
+            agent.receive(self.summary_sender, message)
+
+        if self.neighborhood_weight:
+            for agent, count, mean in zip(
+                self.simulator.agents, counts.tolist(), means.tolist()
+            ):
+                if count:
+                    opinion = agent.get_opinion()
+                    opinion += self.neighborhood_weight * (mean - opinion)
+                    agent.set_opinion(max(-1.0, min(1.0, opinion)))
+
+    def write_core_opinions(self) -> None:
+        """Copy the core agents' opinions into the classical array."""
+        opinions = np.array([agent.get_opinion() for agent in self.simulator.agents])
+        if not self.continuous:
+            opinions = np.sign(opinions).astype(self.model.opinions.dtype)
+        self.model.set_opinions(self.core_nodes, opinions)
+
+    def step(self) -> None:
+        """Run one hybrid step: summaries, dialogue, write-back, classical sweeps."""
+        self.deliver_neighborhood_summaries()
+        for _ in range(self.dialogue_steps):
+            self.simulator.step()
+        self.write_core_opinions()
+        self.model.run(max_time=self.sweeps_per_step, stop_at_consensus=False)
+        self._step += 1
+
+    def run(self, num_steps: int) -> None:
+        for _ in range(num_steps):
+            self.step()
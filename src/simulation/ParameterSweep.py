@@ -0,0 +1,273 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from configs.configs import InteractionType, SimulationConfig
+from llm.base import LLMClient
+from simulation.EnsembleRunner import EnsembleRunner
+from utils.event_handler import EventHandler, SweepPointFinished
+
+# Fields studies usually vary; any SimulationConfig field can be swept.
+SWEEP_FIELDS = (
+    "num_agents",
+    "topology",
+    "small_world_k",
+    "small_world_p",
+    "temperature",
+    "opinion_update_frequency",
+)
+
+
+def expand_grid(
+    base: SimulationConfig, grid: Mapping[str, Sequence]
+) -> List[SimulationConfig]:
+    """
+    Every combination of the grid values, applied to ``base``.
+
+    Args:
+        base: Configuration supplying the fields not in the grid
+        grid: Values of each swept field; the last field varies fastest
+
+    Returns:
+        One validated configuration per grid point
+    """
+    unknown = set(grid) - set(SimulationConfig.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown configuration fields: {sorted(unknown)}")
+    fields = list(grid)
+    values = base.model_dump()
+    return [
+        SimulationConfig(**{**values, **dict(zip(fields, combination))})
+        for combination in itertools.product(*(grid[field] for field in fields))
+    ]
+
+
+def point_key(config: SimulationConfig, replicas: int = 1) -> str:
+    """Stable key of a sweep point: a hash of the configuration and replicas."""
+    payload = json.dumps(
+        {"config": config.model_dump(mode="json"), "replicas": replicas},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def uses_llm(config: SimulationConfig) -> bool:
+    return config.interaction_type == InteractionType.DIALOGUE
+
+
+def run_point(
+    config: SimulationConfig,
+    replicas: int = 1,
+    llm_client_factory: Optional[Callable[[], LLMClient]] = None,
+) -> Dict[str, object]:
+    """Run the replicas of one sweep point in this process and summarize them."""
+    return (
+        EnsembleRunner(
+            config,
+            num_replicas=replicas,
+            max_workers=1,
+            llm_client_factory=llm_client_factory,
+        )
+        .run()
+        .summary()
+    )
+
+
+class SweepStore:
+    """
+    SQLite file of sweep results, one row per completed point.
+
+    Only the process driving the sweep writes to it, one transaction per
+    point, so an interrupted sweep keeps every point that finished.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                config TEXT NOT NULL,
+                replicas INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                finished REAL NOT NULL
+            )""")
+        self._connection.commit()
+
+    def completed_keys(self) -> set:
+        return {key for (key,) in self._connection.execute("SELECT key FROM results")}
+
+    def put(
+        self,
+        key: str,
+        config: SimulationConfig,
+        replicas: int,
+        result: Dict[str, object],
+        seconds: float,
+    ) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(config.model_dump(mode="json")),
+                    replicas,
+                    json.dumps(result),
+                    seconds,
+                    time.time(),
+                ),
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        row = self._connection.execute(
+            "SELECT result FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def rows(self) -> Iterator[Tuple[SimulationConfig, Dict[str, object]]]:
+        """``(config, result)`` of every completed point, in completion order."""
+        for config, result in self._connection.execute(
+            "SELECT config, result FROM results ORDER BY finished"
+        ):
+            yield SimulationConfig(**json.loads(config)), json.loads(result)
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class ParameterSweep:
+    """
+    Runs every point of a configuration grid once, across a process pool.
+
+    Points whose key is already in the store are skipped, so restarting an
+    interrupted sweep only runs what is missing. At most ``max_workers``
+    points run at once, and at most ``llm_concurrency`` of them may be
+    LLM-backed (dialogue) points; classical points fill the remaining
+    workers. Results are stored as soon as each point finishes. A failing
+    point is reported and left out of the store, to be retried next time.
+    """
+
+    def __init__(
+        self,
+        base: SimulationConfig,
+        grid: Mapping[str, Sequence],
+        store: SweepStore,
+        replicas: int = 1,
+        max_workers: Optional[int] = None,
+        llm_concurrency: int = 1,
+        llm_client_factory: Optional[Callable[[], LLMClient]] = None,
+    ):
+        """
+        Initialize the sweep.
+
+        Args:
+            base: Configuration supplying the fields not in the grid
+            grid: Values of each swept field
+            store: Where results are read from and written to
+            replicas: Replicas per point (see ``EnsembleRunner``)
+            max_workers: Worker processes (default: CPU count; 1 runs inline)
+            llm_concurrency: Most LLM-backed points running at once
+            llm_client_factory: Picklable callable building the LLM client of
+                dialogue points (default: from each configuration)
+        """
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        if llm_concurrency < 1:
+            raise ValueError("llm_concurrency must be at least 1")
+        self.configs = expand_grid(base, grid)
+        self.store = store
+        self.replicas = replicas
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.llm_concurrency = llm_concurrency
+        self.llm_client_factory = llm_client_factory
+        self.failures: Dict[str, str] = {}
+
+    def pending(self) -> List[Tuple[str, SimulationConfig]]:
+        """Points without a stored result, each key once, in grid order."""
+        done = self.store.completed_keys()
+        points = {}
+        for config in self.configs:
+            key = point_key(config, self.replicas)
+            if key not in done:
+                points.setdefault(key, config)
+        return list(points.items())
+
+    def run(self) -> Dict[str, int]:
+        """
+        Run the pending points.
+
+        Returns:
+            Counts of ``points`` in the grid, ``skipped`` ones already stored,
+            and ``completed`` and ``failed`` ones in this run
+        """
+        pending = self.pending()
+        counts = {
+            "points": len({point_key(c, self.replicas) for c in self.configs}),
+            "skipped": 0,
+            "completed": 0,
+            "failed": 0,
+        }
+        counts["skipped"] = counts["points"] - len(pending)
+        self.failures = {}
+
+        if self.max_workers == 1:
+            for key, config in pending:
+                start = time.perf_counter()
+                try:
+                    result = run_point(config, self.replicas, self.llm_client_factory)
+                except Exception as error:
+                    self._record(counts, key, config, None, error, start)
+                else:
+                    self._record(counts, key, config, result, None, start)
+            return counts
+
+        llm_queue = [point for point in pending if uses_llm(point[1])]
+        other_queue = [point for point in pending if not uses_llm(point[1])]
+        running = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while llm_queue or other_queue or running:
+                llm_running = sum(uses_llm(c) for _, c, _ in running.values())
+                while len(running) < self.max_workers:
+                    if llm_queue and llm_running < self.llm_concurrency:
+                        key, config = llm_queue.pop(0)
+                        llm_running += 1
+                    elif other_queue:
+                        key, config = other_queue.pop(0)
+                    else:
+                        break
+                    future = executor.submit(
+                        run_point, config, self.replicas, self.llm_client_factory
+                    )
+                    running[future] = (key, config, time.perf_counter())
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, config, start = running.pop(future)
+                    error = future.exception()
+                    result = None if error else future.result()
+                    self._record(counts, key, config, result, error, start)
+        return counts
+
+    def _record(self, counts, key, config, result, error, start) -> None:
+        seconds = time.perf_counter() - start
+        if error is None:
+            self.store.put(key, config, self.replicas, result, seconds)
+            counts["completed"] += 1
+        else:
+            self.failures[key] = f"{type(error).__name__}: {error}"
+            counts["failed"] += 1
+        EventHandler.handle(
+            SweepPointFinished(
+                key=key,
+                seconds=seconds,
+                error=self.failures.get(key) if error else None,
+            )
+        )
@@ -1,22 +1,17 @@
 import random
-from typing import List, Union
-from pydantic import BaseModel, field_validator, ConfigDict
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field, field_validator, ConfigDict
 from agents.SimpleAgent import SimpleAgent
-from agents.base_agent import BaseAgent
 from interactions.DialogueSimulation import DialogueSimulator
 from interactions.VoterModel import VoterModel
-from simulation.AgentFactory import AgentFactory
-from simulation.AgentManager import AgentManager
-import networkx as nx
+from simulation.BuildPipeline import BuildPipeline
 
-from environments.GraphEnvironment import GraphEnvironment
-from configs.configs import (
-    GraphEnvironmentConfig,
-    LLMConfig,
-    SimulationConfig,
-)
-from utils.event_handler import EventHandler, AgentSpoke
-from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+from environments.GraphEnvironment import GraphEnvironment, attach_agents_to_nodes
+from llm.base import LLMClient
+from configs.configs import SimulationConfig
+from utils.event_handler import EventHandler, AgentSpoke, SimulationStopped
+from simulation.Checkpoint import CheckpointWriter, load_checkpoint, restore_simulator
+from simulation.StoppingCriteria import StoppingCriterion, first_stop_reason
 
 
 def random_selector(agents: List[SimpleAgent]) -> int:
@@ -28,105 +23,133 @@ class SimulationRunner(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     config: SimulationConfig
+    # Optional overrides: a shared client for every LLM call (e.g. a fake
+    # client in tests and ensembles) and a prebuilt topology.
+    llm_client: Optional[LLMClient] = None
+    environment: Optional[GraphEnvironment] = None
+    # Stages of the setup and their cache; share one to reuse unchanged stages.
+    pipeline: BuildPipeline = Field(default_factory=BuildPipeline)
     interaction_model: Union[DialogueSimulator, VoterModel]
+    rounds_completed: int = 0
+    # Why stopping criteria ended the run early; a stopped run stays stopped.
+    stop_reason: Optional[str] = None
 
-    @staticmethod
-    def attach_agents_to_nodes(
-        graph: nx.Graph, agents: List[Union[BaseAgent, SimpleAgent]]
-    ):
-        for i, agent in enumerate(agents):
-            graph.nodes[i]["agent"] = agent
-
-    @field_validator("interaction_model", mode="before")
-    @classmethod
-    def validate_interaction_model(cls, interaction_model, info):
-        values = info.data if info.data else {}
-        config = values.get("config")
-        # Initialize the graph environment
-        env_config = GraphEnvironmentConfig(
-            num_agents=config.num_agents,
-            topology=config.topology,
-            small_world_k=config.small_world_k,
-            small_world_p=config.small_world_p,
-        )
-        env = GraphEnvironment(config=env_config)
-
-        agent_manager = AgentManager(
-            num_agents=config.num_agents, agent_class=SimpleAgent
-        )
-
-        llm_config = LLMConfig(
-            model_type=config.model_type, temperature=config.temperature
-        )
-
-        # Initialize the chat model
-        # if (
-        #     config.model_type == ModelType.GPT3
-        #     or config.model_type == ModelType.GPT3BIS
-        # ):
-        #     from langchain.chat_models import ChatOpenAI
-        #
-        #     llm = ChatOpenAI(model=config.model_type, temperature=config.temperature)
-        # else:
-        #     from langchain.chat_models import ChatOllama
-        #
-        #     llm = ChatOllama(model=config.model_type, temperature=config.temperature)
-
-        # Set the model for the agents
-        for agent in agent_manager.agents:
-            agent.set_model(llm_config)
-            agent.create_agent_description()
-            agent.create_system_message(topic=config.topic)
-
-        mediating_agent = AgentFactory.create_mediating_agent(topic=config.topic)
-        mediating_agent.set_model(llm_config)
-        mediating_agent.set_system_message()
-
-        # Create OpinionAnalyzer for tracking opinion dynamics
-        opinion_analyzer = OpinionAnalyzer(
-            llm_client=None,  # Will be set based on model type
-            update_frequency=config.opinion_update_frequency,
-        )
+    attach_agents_to_nodes = staticmethod(attach_agents_to_nodes)
 
-        # Set the appropriate LLM client for opinion analysis
+    @staticmethod
+    def analyzer_client(config: SimulationConfig) -> LLMClient:
+        """LLM client for opinion analysis, at a low temperature for consistency."""
         if config.model_type.value in ["gpt-3.5-turbo", "gpt-3.5-turbo-16k"]:
             from llm.openai_client import OpenAIClient
 
-            opinion_analyzer.llm_client = OpenAIClient(
-                model=config.model_type.value,
-                temperature=0.3,  # Lower temperature for more consistent opinion analysis
-            )
-        else:
-            from llm.ollama_client import OllamaClient
+            return OpenAIClient(model=config.model_type.value, temperature=0.3)
+        from llm.ollama_client import OllamaClient
 
-            opinion_analyzer.llm_client = OllamaClient(
-                model=config.model_type.value, temperature=0.3
-            )
+        return OllamaClient(model=config.model_type.value, temperature=0.3)
 
-        # Initialize agent opinions from personas
-        for agent in agent_manager.agents:
-            initial_opinion = opinion_analyzer.initialize_opinion_from_persona(agent)
-            agent.set_opinion(initial_opinion)
+    @classmethod
+    def resume(
+        cls, checkpoint_path: str, llm_client: Optional[LLMClient] = None
+    ) -> "SimulationRunner":
+        """
+        Continue a simulation from its latest checkpoint.
+
+        No LLM calls are made while restoring; ``run_simulation`` then picks
+        up with the round after the checkpoint, unless stopping criteria had
+        ended the run (see ``stop_reason``).
+
+        Args:
+            checkpoint_path: File written through ``run_simulation``
+            llm_client: Client for every LLM call (default: from the config)
+
+        Returns:
+            The restored runner
+        """
+        state = load_checkpoint(checkpoint_path)
+        config = SimulationConfig(**state["config"])
+        simulator = restore_simulator(
+            state,
+            selection_function=random_selector,
+            llm_client=llm_client,
+            analyzer_client=llm_client or cls.analyzer_client(config),
+        )
+        return cls.model_construct(
+            config=config,
+            llm_client=llm_client,
+            environment=simulator.environment,
+            interaction_model=simulator,
+            rounds_completed=state["rounds_completed"],
+            stop_reason=state.get("stop_reason"),
+        )
 
-        simulator = interaction_model(
-            environment=env,
-            mediating_agent=mediating_agent,
-            agents=agent_manager.agents,
+    @field_validator("interaction_model", mode="before")
+    @classmethod
+    def validate_interaction_model(cls, interaction_model, info):
+        values = info.data if info.data else {}
+        config = values.get("config")
+        llm_client = values.get("llm_client")
+        pipeline = values.get("pipeline") or BuildPipeline()
+        return pipeline.build(
+            config,
+            interaction_model,
             selection_function=random_selector,
-            topic=config.topic,
-            opinion_analyzer=opinion_analyzer,
+            llm_client=llm_client,
+            environment=values.get("environment"),
+            analyzer_client=llm_client or cls.analyzer_client(config),
         )
-        cls.attach_agents_to_nodes(simulator.environment.graph, simulator.agents)
-        return simulator
 
-    def run_simulation(self):
-        for i in range(self.config.num_rounds):
+    def run_simulation(
+        self,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 10,
+        stopping_criteria: Optional[List[StoppingCriterion]] = None,
+    ) -> Optional[str]:
+        """
+        Run the remaining rounds, optionally checkpointing along the way.
+
+        Args:
+            checkpoint_path: Append checkpoints to this file (see
+                ``simulation.Checkpoint``); resume with ``SimulationRunner.resume``
+            checkpoint_every: Rounds between checkpoints
+            stopping_criteria: Checked after every round; the run ends early
+                once one of them fires (see ``simulation.StoppingCriteria``)
+
+        Returns:
+            Why the run stopped early, or None if all rounds ran. A run that
+            stopped early stays stopped: calling again (also after
+            ``resume``) runs nothing until ``stop_reason`` is cleared.
+        """
+        if self.stop_reason is not None:
+            return self.stop_reason
+        stopping_criteria = stopping_criteria or []
+        for criterion in stopping_criteria:
+            criterion.reset()
+        reason = None
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = CheckpointWriter(checkpoint_path, every=checkpoint_every)
+        for i in range(self.rounds_completed, self.config.num_rounds):
             EventHandler.handle(
                 AgentSpoke(agent_name="SYSTEM", message=f"----\nRound {i+1}")
             )
             name, message = self.interaction_model.step()
             EventHandler.handle(AgentSpoke(agent_name=name, message=message))
             EventHandler.handle(AgentSpoke(agent_name="SYSTEM", message="----"))
+            self.rounds_completed += 1
+            reason = first_stop_reason(stopping_criteria, self.interaction_model)
+            self.stop_reason = reason
+            if checkpoint and checkpoint.due(self.rounds_completed):
+                checkpoint.write(self)
+            if reason is not None:
+                EventHandler.handle(
+                    SimulationStopped(
+                        rounds_completed=self.rounds_completed, reason=reason
+                    )
+                )
+                break
+        if checkpoint and not checkpoint.due(self.rounds_completed):
+            checkpoint.write(self)
         EventHandler.handle(
             AgentSpoke(agent_name="SYSTEM", message="Simulation complete")
         )
+        return reason
@@ -0,0 +1,213 @@
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from interactions.DialogueSimulation import DialogueSimulator
+
+_WORD = re.compile(r"\w+")
+
+
+class StoppingCriterion(ABC):
+    """
+    Decides whether a dialogue has converged and the run can end early.
+
+    ``check`` is called after every step of the simulation and must stay
+    cheap: criteria keep whatever state they need between calls instead of
+    rescanning the history.
+    """
+
+    def reset(self) -> None:
+        """Forget all state, before a new or resumed run."""
+
+    @abstractmethod
+    def check(self, simulator: DialogueSimulator) -> Optional[str]:
+        """
+        Check the simulation after a step.
+
+        Returns:
+            Why the run should stop, or None to keep going
+        """
+
+
+class OpinionVariance(StoppingCriterion):
+    """
+    Stops once the agents' opinions have (nearly) reached consensus.
+
+    Opinions only change when the opinion analyzer runs, so the variance is
+    recomputed once per analyzer window and reused in between.
+    """
+
+    def __init__(self, threshold: float = 0.01, min_steps: int = 10):
+        """
+        Args:
+            threshold: Stop when the opinion variance is at most this
+            min_steps: Never stop before this simulation step, so that a
+                population initialized near consensus gets to talk first
+        """
+        if threshold < 0:
+            raise ValueError("threshold must be non-negative")
+        self.threshold = threshold
+        self.min_steps = min_steps
+        self.reset()
+
+    def reset(self) -> None:
+        self._window = None
+        self._reason: Optional[str] = None
+
+    def check(self, simulator: DialogueSimulator) -> Optional[str]:
+        if simulator._step < self.min_steps:
+            return None
+        analyzer = simulator.opinion_analyzer
+        # Without an analyzer the opinions never change: one window.
+        window = simulator._step // analyzer.update_frequency if analyzer else 0
+        if window == self._window:
+            return self._reason
+        self._window = window
+
+        opinions = np.fromiter(
+            (agent.get_opinion() for agent in simulator.agents),
+            dtype=float,
+            count=len(simulator.agents),
+        )
+        variance = opinions.var()
+        self._reason = None
+        if variance <= self.threshold:
+            self._reason = f"opinion variance {variance:.4g} <= {self.threshold:g}"
+        return self._reason
+
+
+class OpinionStability(StoppingCriterion):
+    """
+    Stops when no opinion moved during the last ``windows`` analyzer windows.
+
+    Opinions only change when the opinion analyzer runs, every
+    ``update_frequency`` steps; between those steps this criterion does
+    nothing but compare two integers.
+    """
+
+    def __init__(self, windows: int = 3, tolerance: float = 1e-3):
+        """
+        Args:
+            windows: Consecutive analyzer windows without change
+            tolerance: Largest opinion change that counts as no change
+        """
+        if windows < 1:
+            raise ValueError("windows must be at least 1")
+        self.windows = windows
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self) -> None:
+        self._opinions: Optional[np.ndarray] = None
+        self._window = None
+        self._unchanged = 0
+
+    def check(self, simulator: DialogueSimulator) -> Optional[str]:
+        analyzer = simulator.opinion_analyzer
+        if analyzer is None:
+            return None
+        window = simulator._step // analyzer.update_frequency
+        if window == self._window:
+            return None
+        self._window = window
+
+        opinions = np.array([agent.get_opinion() for agent in simulator.agents])
+        previous, self._opinions = self._opinions, opinions
+        if previous is None or previous.shape != opinions.shape:
+            self._unchanged = 0
+            return None
+        if np.abs(opinions - previous).max(initial=0.0) <= self.tolerance:
+            self._unchanged += 1
+        else:
+            self._unchanged = 0
+        if self._unchanged >= self.windows:
+            return f"no opinion change for {self._unchanged} analyzer windows"
+        return None
+
+
+def shingles(message: str, size: int = 2) -> frozenset:
+    """Set of lower-cased word ``size``-grams of a message."""
+    words = _WORD.findall(message.lower())
+    if len(words) < size:
+        return frozenset([tuple(words)]) if words else frozenset()
+    return frozenset(zip(*(words[i:] for i in range(size))))
+
+
+def jaccard(first: frozenset, second: frozenset) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class MessageStagnation(StoppingCriterion):
+    """
+    Stops when the conversation keeps repeating itself.
+
+    Every new message is compared, by Jaccard similarity of its word
+    shingles, with the ``window`` messages before it, keeping the highest
+    similarity. The run stops once the mean of that over ``window``
+    consecutive messages reaches ``threshold``. Each message is tokenized
+    once, when it is first seen.
+    """
+
+    def __init__(self, window: int = 5, threshold: float = 0.6, shingle_size: int = 2):
+        """
+        Args:
+            window: Messages each new message is compared with, and number
+                of consecutive messages the similarity is averaged over
+            threshold: Mean similarity (0 to 1) at which the run stops
+            shingle_size: Words per shingle
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if not 0 <= threshold <= 1:
+            raise ValueError("threshold must be in [0, 1]")
+        self.window = window
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.reset()
+
+    def reset(self) -> None:
+        self._seen = 0
+        self._recent = deque(maxlen=self.window)
+        self._similarities = deque(maxlen=self.window)
+
+    def check(self, simulator: DialogueSimulator) -> Optional[str]:
+        history = simulator.history
+        if len(history) < self._seen:
+            # The simulator was reset.
+            self.reset()
+        for _, _, message in history[self._seen :]:
+            current = shingles(message, self.shingle_size)
+            if len(self._recent) == self.window:
+                self._similarities.append(
+                    max(jaccard(current, other) for other in self._recent)
+                )
+            self._recent.append(current)
+        self._seen = len(history)
+
+        if len(self._similarities) < self.window:
+            return None
+        similarity = sum(self._similarities) / self.window
+        if similarity >= self.threshold:
+            return f"message similarity {similarity:.2f} >= {self.threshold:g}"
+        return None
+
+
+def first_stop_reason(
+    criteria: Iterable[StoppingCriterion], simulator: DialogueSimulator
+) -> Optional[str]:
+    """Reason of the first criterion that fires, or None."""
+    for criterion in criteria:
+        reason = criterion.check(simulator)
+        if reason is not None:
+            return reason
+    return None
+
+
+def default_criteria() -> List[StoppingCriterion]:
+    """Conservative criteria that only end runs that have clearly settled."""
+    return [OpinionVariance(), OpinionStability(), MessageStagnation()]
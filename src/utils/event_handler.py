@@ -13,8 +13,64 @@ class AgentSpoke(DomainEvent):
         self.message = message
 
 
+class CheckpointWritten(DomainEvent):
+    def __init__(self, path, full, size):
+        self.path = path
+        self.full = full
+        self.size = size
+
+
+class SimulationStopped(DomainEvent):
+    def __init__(self, rounds_completed, reason):
+        self.rounds_completed = rounds_completed
+        self.reason = reason
+
+
+class BuildStageFinished(DomainEvent):
+    def __init__(self, stage, key, source, seconds):
+        self.stage = stage
+        self.key = key
+        self.source = source
+        self.seconds = seconds
+
+
+class SweepPointFinished(DomainEvent):
+    def __init__(self, key, seconds, error=None):
+        self.key = key
+        self.seconds = seconds
+        self.error = error
+
+
 class EventHandler:
     @staticmethod
     def handle(event: DomainEvent):
         if isinstance(event, AgentSpoke):
             print_to_log("Agent %s said: %s", event.agent_name, event.message)
+        elif isinstance(event, CheckpointWritten):
+            print_to_log(
+                "Wrote %s checkpoint to %s (%d bytes)",
+                "full" if event.full else "delta",
+                event.path,
+                event.size,
+            )
+        elif isinstance(event, SimulationStopped):
+            print_to_log(
+                "Simulation stopped after round %d: %s",
+                event.rounds_completed,
+                event.reason,
+            )
+        elif isinstance(event, BuildStageFinished):
+            print_to_log(
+                "Build stage %s (%s): %s in %.3f s",
+                event.stage,
+                event.key,
+                event.source,
+                event.seconds,
+            )
+        elif isinstance(event, SweepPointFinished):
+            if event.error is None:
+                print_to_log(
+                    "Sweep point %s finished in %.1f s", event.key, event.seconds
+                )
+            else:
+                print_to_log("Sweep point %s failed: %s", event.key, event.error)
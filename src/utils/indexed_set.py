@@ -0,0 +1,43 @@
+from array import array
+from typing import Iterable
+
+
+class IndexedSet:
+    """
+    Set of integers in ``range(capacity)`` with O(1) add, remove and sampling.
+
+    Members live in a dense array; a position table maps each member to its
+    slot so removal can swap the last member into the hole. Both tables are
+    typed arrays, so large capacities cost 8 bytes per slot.
+    """
+
+    def __init__(self, capacity: int, items: Iterable[int] = ()):
+        self.items = array("q")
+        self.positions = array("q", [-1]) * capacity
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item: int) -> bool:
+        return self.positions[item] >= 0
+
+    def add(self, item: int) -> None:
+        if self.positions[item] < 0:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item: int) -> None:
+        position = self.positions[item]
+        if position < 0:
+            return
+        last = self.items.pop()
+        if last != item:
+            self.items[position] = last
+            self.positions[last] = position
+        self.positions[item] = -1
+
+    def sample(self, uniform: float) -> int:
+        """Return the member selected by a uniform draw in [0, 1)."""
+        return self.items[int(uniform * len(self.items))]
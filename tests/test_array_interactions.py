@@ -0,0 +1,276 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from agents.base_agent import BaseAgent
+from environments.CSRGraph import CSRGraph
+from interactions.MajorityRule import VectorizedMajorityRule
+from interactions.ReplicaEngine import ReplicaEngine
+from interactions.VoterModel import (
+    ActiveLinkVoterModel,
+    SequentialCopier,
+    VectorizedVoterModel,
+)
+
+
+@pytest.fixture
+def ring_graph():
+    return CSRGraph.from_networkx(nx.cycle_graph(50))
+
+
+def test_sequential_copier_matches_loop():
+    rng = np.random.default_rng(0)
+    copier = SequentialCopier(12)
+    x = rng.integers(0, 5, 12)
+    expected = x.copy()
+    for _ in range(20):
+        targets = rng.integers(0, 12, 40)
+        sources = rng.integers(0, 12, 40)
+        nodes, values = copier.resolve(x, targets, sources)
+        x[nodes] = values
+        for target, source in zip(targets, sources):
+            expected[target] = expected[source]
+        assert np.array_equal(x, expected)
+
+
+def test_voter_model_reaches_consensus():
+    model = VectorizedVoterModel(nx.complete_graph(20), seed=1, batch_size=64)
+    model.run(max_time=10_000)
+
+    assert model.is_consensus()
+    assert model.consensus_time == model.time
+    assert len(np.unique(model.opinions)) == 1
+
+
+@pytest.mark.parametrize("synchronous", [False, True])
+def test_voter_model_is_reproducible(ring_graph, synchronous):
+    runs = [
+        VectorizedVoterModel(ring_graph, seed=7, synchronous=synchronous)
+        for _ in range(2)
+    ]
+    for model in runs:
+        model.run(max_time=20, stop_at_consensus=False)
+
+    assert np.array_equal(runs[0].opinions, runs[1].opinions)
+    assert runs[0].num_updates == runs[1].num_updates
+
+
+def test_voter_model_only_copies_neighbors():
+    graph = CSRGraph.from_edges(4, np.array([0]), np.array([1]))
+    model = VectorizedVoterModel(
+        graph, opinions=np.array([1, -1, 1, -1], dtype=np.int8), seed=0
+    )
+    model.update_nodes(np.array([2, 3, 2, 3]))
+
+    # Nodes 2 and 3 are isolated and keep their opinions.
+    assert model.opinions[2] == 1
+    assert model.opinions[3] == -1
+    assert set(model.opinions[:2].tolist()) <= {1, -1}
+
+
+def test_voter_model_round_trips_agents(ring_graph):
+    agents = [BaseAgent(agent_id=i) for i in range(50)]
+    for i, agent in enumerate(agents):
+        agent.set_opinion(1 if i < 25 else -1)
+
+    model = VectorizedVoterModel.from_agents(ring_graph, agents, seed=0)
+    model.run(max_time=5, stop_at_consensus=False)
+    model.update_agents(agents)
+
+    assert [agent.get_opinion() for agent in agents] == model.opinions.tolist()
+
+
+def test_majority_rule_counts_match_loops():
+    graph = nx.erdos_renyi_graph(40, 0.2, seed=3)
+    rng = np.random.default_rng(3)
+    opinions = rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=40)
+    model = VectorizedMajorityRule(graph, opinions=opinions, seed=0)
+
+    positive, negative = model.neighbor_counts()
+    for node in graph.nodes():
+        values = [opinions[neighbor] for neighbor in graph[node]]
+        assert positive[node] == values.count(1)
+        assert negative[node] == values.count(-1)
+
+    nodes = np.array([5, 0, 5, 39])
+    subset = model.neighbor_counts(nodes)
+    assert subset[0].tolist() == positive[nodes].tolist()
+    assert subset[1].tolist() == negative[nodes].tolist()
+
+
+@pytest.mark.parametrize("tie_break", ["keep", "random"])
+def test_majority_rule_tie_break(tie_break):
+    # Node 0 sees one positive and one negative neighbor: always a tie.
+    star = nx.Graph([(0, 1), (0, 2)])
+    model = VectorizedMajorityRule(
+        star, opinions=np.array([1, 1, -1]), seed=0, tie_break=tie_break
+    )
+    results = set()
+    for _ in range(30):
+        model.opinions[:] = [1, 1, -1]
+        model.update_nodes(np.array([0]))
+        results.add(int(model.opinions[0]))
+
+    assert results == ({1} if tie_break == "keep" else {-1, 1})
+
+
+def test_majority_rule_threshold_keeps_undecided_nodes():
+    star = nx.star_graph(4)
+    model = VectorizedMajorityRule(
+        star, opinions=np.array([-1, 1, 1, 1, -1]), seed=0, threshold=0.8
+    )
+    model.update_nodes(np.array([0]))
+    assert model.opinions[0] == -1
+
+    model.opinions[4] = 1
+    model.update_nodes(np.array([0]))
+    assert model.opinions[0] == 1
+
+
+def test_majority_rule_synchronous_consensus():
+    model = VectorizedMajorityRule(
+        nx.complete_graph(21), opinions=np.array([1] * 12 + [-1] * 9), seed=0
+    )
+    model.run(max_time=5)
+
+    assert model.is_consensus()
+    assert (model.opinions == 1).all()
+
+
+def test_active_link_voter_waiting_time():
+    # Two disagreeing nodes: the first activation (rate 2) ends the run.
+    times = [
+        ActiveLinkVoterModel(
+            nx.path_graph(2), opinions=np.array([1, -1]), seed=seed
+        ).run(max_time=10)
+        for seed in range(2000)
+    ]
+    assert abs(np.mean(times) - 0.5) < 0.05
+
+
+def test_active_link_voter_weights_edges_by_degree():
+    # The hub fires as often as each leaf but only flips through rejection
+    # sampling, so it must be the first to change in 1/4 of the runs.
+    hub_first = 0
+    for seed in range(2000):
+        model = ActiveLinkVoterModel(
+            nx.star_graph(3), opinions=np.array([1, -1, -1, -1]), seed=seed
+        )
+        model.step()
+        hub_first += model.opinions[0] == -1
+    assert abs(hub_first / 2000 - 0.25) < 0.04
+
+
+def test_active_link_voter_tracks_discordant_edges(ring_graph):
+    model = ActiveLinkVoterModel(ring_graph, seed=2)
+    for _ in range(50):
+        model.step()
+        sources = ring_graph.edge_sources()
+        discordant = model.opinions[sources] != model.opinions[ring_graph.indices]
+        assert sorted(model.active.items) == np.flatnonzero(discordant).tolist()
+
+    model.run(max_time=1e6)
+    assert model.is_consensus()
+    assert len(np.unique(model.opinions)) == 1
+
+
+def test_replica_engine_retires_replicas_at_consensus():
+    start = np.ones((3, 20), dtype=np.int8)
+    start[1:, :10] = -1
+    engine = ReplicaEngine(nx.complete_graph(20), 3, opinions=start, seed=4)
+
+    assert engine.is_consensus().tolist() == [True, False, False]
+    assert engine.active.tolist() == [1, 2]
+
+    engine.run(max_time=10_000)
+    assert engine.is_consensus().all()
+    assert engine.consensus_time[0] == 0
+    for replica in range(3):
+        assert len(np.unique(engine.opinions[replica])) == 1
+
+
+def test_replica_engine_runs_out_the_clock_when_all_retired():
+    engine = ReplicaEngine(nx.complete_graph(5), 3, seed=0)
+    engine.run(1000)
+    assert not len(engine.active)
+
+    stopped = engine.time
+    assert engine.run(10, stop_at_consensus=False) == stopped + 10
+    assert engine.run(10) == stopped + 10
+
+
+def test_replica_engine_matches_single_majority_rule():
+    # Synchronous majority rule with kept ties is deterministic, so every
+    # replica must follow the single-replica engine exactly.
+    graph = nx.erdos_renyi_graph(60, 0.1, seed=5)
+    start = np.random.default_rng(5).choice(np.array([-1, 1], dtype=np.int8), 60)
+    single = VectorizedMajorityRule(graph, opinions=start, tie_break="keep")
+    engine = ReplicaEngine(graph, 4, model="majority", opinions=start, tie_break="keep")
+    for _ in range(5):
+        single.step()
+        engine.step()
+        for replica in np.flatnonzero(~engine.is_consensus()):
+            assert np.array_equal(engine.opinions[replica], single.opinions)
+
+
+@pytest.mark.parametrize("model", ["voter", "majority"])
+@pytest.mark.parametrize("synchronous", [False, True])
+def test_replica_engine_is_reproducible(ring_graph, model, synchronous):
+    runs = [
+        ReplicaEngine(ring_graph, 8, model=model, seed=3, synchronous=synchronous)
+        for _ in range(2)
+    ]
+    for engine in runs:
+        engine.run(max_time=20, stop_at_consensus=False)
+
+    assert np.array_equal(runs[0].opinions, runs[1].opinions)
+    assert runs[0].num_updates == runs[1].num_updates
+
+
+@pytest.mark.parametrize("synchronous", [False, True])
+def test_frozen_nodes_keep_their_opinions(ring_graph, synchronous):
+    model = VectorizedVoterModel(ring_graph, seed=6, synchronous=synchronous)
+    model.freeze([0, 25])
+    model.set_opinions([0, 25], [1, -1])
+    model.run(max_time=200, stop_at_consensus=False)
+
+    assert model.opinions[0] == 1
+    assert model.opinions[25] == -1
+    assert not model.is_consensus()
+
+
+def test_frozen_nodes_in_majority_rule():
+    model = VectorizedMajorityRule(
+        nx.complete_graph(5), opinions=np.array([-1, 1, 1, 1, 1]), seed=0
+    )
+    model.freeze([0])
+    model.step()
+    assert model.opinions.tolist() == [-1, 1, 1, 1, 1]
+
+
+def test_active_link_voter_frozen_nodes(ring_graph):
+    model = ActiveLinkVoterModel(ring_graph, seed=6)
+    model.freeze([0, 25])
+    model.set_opinions([0, 25], [1, -1])
+
+    def expected_active():
+        sources = ring_graph.edge_sources()
+        discordant = model.opinions[sources] != model.opinions[ring_graph.indices]
+        if model.frozen is not None:
+            discordant &= ~model.frozen[sources]
+        return np.flatnonzero(discordant).tolist()
+
+    assert sorted(model.active.items) == expected_active()
+    for _ in range(30):
+        model.step()
+        assert sorted(model.active.items) == expected_active()
+
+    end = model.time + 1e6
+    assert model.run(max_time=1e6) == end
+    assert model.opinions[0] == 1 and model.opinions[25] == -1
+    assert not model.is_consensus()
+
+    model.freeze([])
+    assert sorted(model.active.items) == expected_active()
+    model.run(max_time=1e6)
+    assert model.is_consensus()
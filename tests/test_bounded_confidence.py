@@ -0,0 +1,194 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from agents.base_agent import BaseAgent
+from agents.SimpleAgent import SimpleAgent
+from environments.CSRGraph import CSRGraph
+import interactions.BoundedConfidence as bounded_confidence
+from interactions.BoundedConfidence import (
+    NO_ENCOUNTER,
+    DeffuantModel,
+    HegselmannKrauseModel,
+    confidence_bounds,
+    deffuant_encounters,
+    hk_means,
+)
+from interactions.ReplicaEngine import ReplicaEngine
+from personas.Persona import Persona
+
+
+def test_deffuant_encounters_match_loop():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-1, 1, 15)
+    bounds = rng.uniform(0.2, 1.0, 15)
+    left = rng.integers(0, 15, 60)
+    right = (left + rng.integers(1, 15, 60)) % 15
+
+    expected = x.copy()
+    for u, v in zip(left, right):
+        distance = expected[v] - expected[u]
+        if abs(distance) < bounds[u]:
+            expected[u] += 0.3 * distance
+        if abs(distance) < bounds[v]:
+            expected[v] -= 0.3 * distance
+
+    first = np.full(15, NO_ENCOUNTER)
+    deffuant_encounters(x, left, right, bounds[left], bounds[right], 0.3, first)
+    assert np.allclose(x, expected)
+    assert (first == NO_ENCOUNTER).all()
+
+
+def test_deffuant_encounters_match_loop_on_star():
+    # Every encounter involves the hub, so batching falls back to a loop.
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-1, 1, 30)
+    left = np.zeros(200, dtype=np.int64)
+    right = rng.integers(1, 30, 200)
+    swap = rng.random(200) < 0.5
+    left[swap], right[swap] = right[swap], 0
+
+    expected = x.copy()
+    for u, v in zip(left, right):
+        distance = expected[v] - expected[u]
+        if abs(distance) < 0.8:
+            expected[u] += 0.5 * distance
+            expected[v] -= 0.5 * distance
+
+    first = np.full(30, NO_ENCOUNTER)
+    bounds = np.full(200, 0.8)
+    deffuant_encounters(x, left, right, bounds, bounds, 0.5, first)
+    assert np.allclose(x, expected)
+    assert (first == NO_ENCOUNTER).all()
+
+
+def test_deffuant_sweep_on_star_is_linear(monkeypatch):
+    # Batched rounds alone would retire one hub encounter per round.
+    sequential = []
+
+    def record(x, left, *args):
+        sequential.append(len(left))
+        return original(x, left, *args)
+
+    original = bounded_confidence._sequential_encounters
+    monkeypatch.setattr(bounded_confidence, "_sequential_encounters", record)
+    model = DeffuantModel(nx.star_graph(39_999), seed=0, confidence=0.5)
+    model.step()
+
+    assert model.num_updates == 40_000
+    # One batched round, then everything left runs in a single pass.
+    assert len(sequential) == 1
+    assert sequential[0] >= 39_990
+
+
+def test_hk_sorted_window_matches_complete_graph():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-1, 1, (3, 40))
+    bounds = rng.uniform(0.05, 0.5, 40)
+    complete = CSRGraph.from_networkx(nx.complete_graph(40))
+
+    assert np.allclose(hk_means(x, bounds), hk_means(x, bounds, complete))
+    nodes = np.array([5, 0, 5])
+    assert np.allclose(
+        hk_means(x, bounds, nodes=nodes), hk_means(x, bounds, complete, nodes)
+    )
+
+
+def test_hk_sorted_window_keeps_replicas_apart():
+    x = np.array([[0.9, 1.0], [-1.0, -0.9]])
+    bounds = np.full(2, 2.5)
+    assert np.allclose(hk_means(x, bounds), [[0.95, 0.95], [-0.95, -0.95]])
+    wide = np.random.default_rng(3).uniform(-5, 5, (4, 30))
+    bounds = np.full(30, 3.0)
+    complete = CSRGraph.from_networkx(nx.complete_graph(30))
+    assert np.allclose(hk_means(wide, bounds), hk_means(wide, bounds, complete))
+
+
+def test_hk_model_freezes_into_clusters():
+    model = HegselmannKrauseModel(num_nodes=2000, seed=2, confidence=0.1)
+    model.run(max_time=1000)
+
+    assert model.is_frozen()
+    assert not model.is_consensus()
+    assert 3 <= len(np.unique(model.opinions.round(6))) <= 10
+
+
+def test_deffuant_model_reaches_consensus_with_wide_bounds():
+    model = DeffuantModel(nx.complete_graph(30), seed=3, confidence=2.5)
+    model.run(max_time=1000)
+
+    assert model.is_consensus()
+    assert model.consensus_time is not None
+    assert model.opinions.mean() == pytest.approx(model.opinions[0], abs=1e-5)
+
+
+def test_deffuant_model_detects_frozen_clusters():
+    opinions = np.array([-0.9, -0.8, 0.8, 0.9])
+    model = DeffuantModel(
+        nx.complete_graph(4), opinions=opinions, seed=0, confidence=0.05
+    )
+    assert model.is_frozen()
+    assert model.run(max_time=100) == 0.0
+
+
+def test_bounds_follow_persona_traits():
+    agents = [
+        SimpleAgent(
+            name=name,
+            agent_id=i,
+            persona=Persona(name=name, age=30, traits=traits, status="student"),
+        )
+        for i, (name, traits) in enumerate(
+            [
+                ("Ann", "extrovert, open-minded, weakly held"),
+                ("Ben", "introvert, closed-minded, strongly held"),
+                ("Cid", "introvert, flexible"),
+            ]
+        )
+    ]
+    for agent in agents:
+        agent.set_opinion(0.1)
+
+    assert confidence_bounds(agents, 0.2) == pytest.approx([0.375, 0.075, 0.2])
+    model = HegselmannKrauseModel.from_agents(nx.path_graph(3), agents)
+    assert model.confidence == pytest.approx([0.375, 0.075, 0.2])
+
+
+def test_agent_level_interactions():
+    agents = [BaseAgent(agent_id=i) for i in range(3)]
+    for agent, opinion in zip(agents, [0.0, 0.1, 0.9]):
+        agent.set_opinion(opinion)
+
+    HegselmannKrauseModel(num_nodes=3).interact(agents[0], agents[1:])
+    assert agents[0].get_opinion() == pytest.approx(0.05)
+
+    DeffuantModel(nx.path_graph(2), confidence=1.0).interact(agents[2], agents[:1])
+    assert agents[2].get_opinion() == pytest.approx(0.475)
+    assert agents[0].get_opinion() == pytest.approx(0.475)
+
+
+@pytest.mark.parametrize("mean_field", [False, True])
+def test_replica_engine_matches_single_hk_model(mean_field):
+    graph = None if mean_field else nx.erdos_renyi_graph(50, 0.2, seed=4)
+    start = np.random.default_rng(4).uniform(-1, 1, 50)
+    single = HegselmannKrauseModel(graph, opinions=start, confidence=0.3)
+    engine = ReplicaEngine(
+        graph, 3, model="hegselmann-krause", opinions=start, confidence=0.3
+    )
+    for _ in range(5):
+        single.step()
+        engine.step()
+        for replica in engine.active:
+            assert np.allclose(engine.opinions[replica], single.opinions)
+
+
+def test_replica_engine_settles_deffuant_replicas():
+    engine = ReplicaEngine(
+        nx.cycle_graph(30), 20, model="deffuant", seed=5, confidence=0.4
+    )
+    engine.run(max_time=5000)
+
+    assert engine.is_settled().all()
+    assert not len(engine.active)
+    consensus = engine.is_consensus()
+    assert (np.ptp(engine.opinions[consensus], axis=1) <= 1e-6).all()
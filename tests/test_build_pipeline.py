@@ -0,0 +1,146 @@
+import pytest
+
+from configs.configs import ModelType, SimulationConfig, TopologyType
+from interactions.DialogueSimulation import DialogueSimulator
+from simulation.BuildPipeline import STAGES, BuildPipeline
+from simulation.SimulationRunner import SimulationRunner, random_selector
+
+
+class CountingLLMClient:
+    """Numbers its replies so rebuilt text differs from cached text."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_response(self, prompt):
+        self.calls += 1
+        return f"0.0 reply {self.calls}"
+
+
+def make_config(**overrides):
+    values = dict(
+        num_agents=5,
+        topic="Testing",
+        num_rounds=2,
+        topology=TopologyType.SMALL_WORLD,
+        model_type=ModelType.LLAMA2,
+        small_world_k=2,
+        seed=3,
+    )
+    values.update(overrides)
+    return SimulationConfig(**values)
+
+
+def build(pipeline, config, client):
+    return pipeline.build(
+        config, DialogueSimulator, selection_function=random_selector, llm_client=client
+    )
+
+
+def test_rebuilds_only_affected_stages():
+    client = CountingLLMClient()
+    pipeline = BuildPipeline()
+    first = build(pipeline, make_config(), client)
+    assert set(pipeline.sources.values()) == {"built"}
+    assert list(pipeline.timings) == list(STAGES)
+    # One description per agent plus the mediator's.
+    assert client.calls == 6
+
+    second = build(pipeline, make_config(), client)
+    assert set(pipeline.sources.values()) == {"memory"}
+    assert client.calls == 6
+    assert [a.system_message for a in second.agents] == [
+        a.system_message for a in first.agents
+    ]
+    assert [a.get_opinion() for a in second.agents] == [
+        a.get_opinion() for a in first.agents
+    ]
+    assert second.agents[0] is not first.agents[0]
+    assert second.environment.graph is not first.environment.graph
+
+    topical = build(pipeline, make_config(topic="Cities"), client)
+    assert [s for s, source in pipeline.sources.items() if source == "built"] == [
+        "system_prompts"
+    ]
+    assert client.calls == 7
+    assert "Cities" in topical.agents[0].system_message
+    assert "Cities" in topical.mediating_agent.system_message
+
+    build(pipeline, make_config(model_type=ModelType.MISTRAL), client)
+    assert [s for s, source in pipeline.sources.items() if source == "built"] == [
+        "descriptions",
+        "system_prompts",
+    ]
+
+    build(pipeline, make_config(seed=4), client)
+    assert set(pipeline.sources.values()) == {"built"}
+
+
+def test_persists_stages_to_disk(tmp_path):
+    client = CountingLLMClient()
+    first = build(BuildPipeline(cache_dir=str(tmp_path)), make_config(), client)
+
+    pipeline = BuildPipeline(cache_dir=str(tmp_path))
+    second = build(pipeline, make_config(), client)
+
+    assert set(pipeline.sources.values()) == {"disk"}
+    assert client.calls == 6
+    for a, b in zip(first.agents, second.agents):
+        assert (a.persona, a.agent_description, a.opinion) == (
+            b.persona,
+            b.agent_description,
+            b.opinion,
+        )
+    assert sorted(first.environment.graph.edges) == sorted(
+        second.environment.graph.edges
+    )
+
+
+def test_runner_builds_through_shared_pipeline():
+    client = CountingLLMClient()
+    pipeline = BuildPipeline()
+    runner = SimulationRunner(
+        config=make_config(),
+        interaction_model=DialogueSimulator,
+        llm_client=client,
+        pipeline=pipeline,
+    )
+    assert runner.pipeline is pipeline
+    nodes = runner.interaction_model.environment.graph.nodes
+    assert [nodes[i]["agent"] for i in range(5)] == runner.interaction_model.agents
+
+    SimulationRunner(
+        config=make_config(topic="Cities"),
+        interaction_model=DialogueSimulator,
+        llm_client=client,
+        pipeline=pipeline,
+    )
+    assert pipeline.sources["descriptions"] == "memory"
+    with pytest.raises(ValueError):
+        BuildPipeline(max_workers=0)
+
+
+def test_seed_determines_population_across_pipelines():
+    first = build(BuildPipeline(), make_config(), CountingLLMClient())
+    second = build(BuildPipeline(), make_config(), CountingLLMClient())
+    assert [a.persona for a in first.agents] == [a.persona for a in second.agents]
+    assert [a.get_opinion() for a in first.agents] == [
+        a.get_opinion() for a in second.agents
+    ]
+
+    other = build(BuildPipeline(), make_config(seed=4), CountingLLMClient())
+    assert [a.persona for a in other.agents] != [a.persona for a in first.agents]
+
+
+def test_unseeded_stages_stay_in_their_pipeline(tmp_path):
+    config = make_config(seed=None)
+    pipeline = BuildPipeline(cache_dir=str(tmp_path))
+    first = build(pipeline, config, CountingLLMClient())
+    build(pipeline, config, CountingLLMClient())
+    assert set(pipeline.sources.values()) == {"memory"}
+    assert list(tmp_path.iterdir()) == []
+
+    fresh = BuildPipeline(cache_dir=str(tmp_path))
+    second = build(fresh, config, CountingLLMClient())
+    assert set(fresh.sources.values()) == {"built"}
+    assert [a.persona for a in first.agents] != [a.persona for a in second.agents]
@@ -0,0 +1,158 @@
+import os
+import random
+
+import pytest
+
+from configs.configs import ModelType, SimulationConfig, TopologyType
+from interactions.DialogueSimulation import DialogueSimulator
+from simulation.Checkpoint import (
+    DELTA,
+    FULL,
+    MAGIC,
+    CheckpointError,
+    CheckpointWriter,
+    _RECORD_HEADER,
+    load_checkpoint,
+)
+from simulation.SimulationRunner import SimulationRunner
+from simulation.StoppingCriteria import OpinionVariance
+
+
+class ScriptedLLMClient:
+    """Numbers its replies and makes them depend on the prompt."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_response(self, prompt):
+        self.calls += 1
+        lines = prompt.count("\n")
+        return f"0.0{self.calls}{lines % 10}"
+
+
+def make_runner(client, num_rounds=6, incremental=False):
+    config = SimulationConfig(
+        num_agents=5,
+        topic="A discussion on ice-cream flavors",
+        num_rounds=num_rounds,
+        topology=TopologyType.SMALL_WORLD,
+        model_type=ModelType.LLAMA2,
+        small_world_k=2,
+        opinion_update_frequency=2,
+        opinion_incremental=incremental,
+        seed=3,
+    )
+    return SimulationRunner(
+        config=config, interaction_model=DialogueSimulator, llm_client=client
+    )
+
+
+def record_kinds(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    assert data.startswith(MAGIC)
+    kinds, offset = [], len(MAGIC)
+    while offset < len(data):
+        kind, length = _RECORD_HEADER.unpack_from(data, offset)
+        kinds.append(kind)
+        offset += _RECORD_HEADER.size + length
+    return kinds
+
+
+def transcript(simulator):
+    """History and opinions with agents by index, as persona names are random."""
+    speakers = simulator.agents + [simulator.mediating_agent]
+    index = {agent.name: i for i, agent in enumerate(speakers)}
+    return (
+        [(step, index[name], message) for step, name, message in simulator.history],
+        [agent.get_opinion() for agent in speakers],
+        [len(agent.message_history) for agent in speakers],
+    )
+
+
+def test_checkpoints_are_full_then_deltas(tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    random.seed(0)
+    runner = make_runner(ScriptedLLMClient())
+    runner.run_simulation(checkpoint_path=path, checkpoint_every=2)
+
+    assert record_kinds(path) == [FULL, DELTA, DELTA]
+    state = load_checkpoint(path)
+    simulator = runner.interaction_model
+    assert state["rounds_completed"] == 6
+    assert state["step"] == simulator._step
+    assert state["history"] == simulator.history
+    for values, agent in zip(
+        state["participants"], simulator.agents + [simulator.mediating_agent]
+    ):
+        assert values["message_history"] == agent.message_history
+        assert values["opinion"] == agent.get_opinion()
+
+
+@pytest.mark.parametrize("incremental, interrupted_after", [(False, 4), (True, 5)])
+def test_resume_continues_where_the_run_stopped(
+    tmp_path, incremental, interrupted_after
+):
+    random.seed(0)
+    reference = make_runner(ScriptedLLMClient(), incremental=incremental)
+    reference.run_simulation()
+
+    path = str(tmp_path / "run.ckpt")
+    random.seed(0)
+    client = ScriptedLLMClient()
+    interrupted = make_runner(client, incremental=incremental)
+    interrupted.config.num_rounds = interrupted_after
+    interrupted.run_simulation(checkpoint_path=path, checkpoint_every=2)
+
+    calls = client.calls
+    resumed = SimulationRunner.resume(path, llm_client=client)
+    assert client.calls == calls
+    assert resumed.rounds_completed == interrupted_after
+    resumed.config.num_rounds = 6
+    resumed.run_simulation()
+
+    assert transcript(resumed.interaction_model) == transcript(
+        reference.interaction_model
+    )
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    random.seed(0)
+    runner = make_runner(ScriptedLLMClient(), num_rounds=4)
+    writer = CheckpointWriter(path, every=2)
+    runner.run_simulation()
+    writer.write(runner)
+    size = os.path.getsize(path)
+    runner.interaction_model.step()
+    writer.write(runner)
+
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 3)
+    state = load_checkpoint(path)
+    assert state["step"] == runner.interaction_model._step - 1
+
+    with open(path, "r+b") as file:
+        file.truncate(size - 1)
+    with pytest.raises(CheckpointError):
+        load_checkpoint(path)
+
+
+def test_resume_keeps_an_early_stop(tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    random.seed(0)
+    client = ScriptedLLMClient()
+    runner = make_runner(client, num_rounds=8)
+    reason = runner.run_simulation(
+        checkpoint_path=path,
+        checkpoint_every=2,
+        stopping_criteria=[OpinionVariance(threshold=10.0, min_steps=4)],
+    )
+    assert reason is not None and runner.rounds_completed == 4
+
+    resumed = SimulationRunner.resume(path, llm_client=client)
+    assert resumed.stop_reason == reason
+    calls = client.calls
+    assert resumed.run_simulation() == reason
+    assert resumed.rounds_completed == 4
+    assert client.calls == calls
@@ -0,0 +1,93 @@
+import networkx as nx
+import pytest
+
+from agents.base_agent import BaseAgent
+from agents.SimpleAgent import SimpleAgent
+from configs.configs import GraphEnvironmentConfig
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.DialogueSimulation import DialogueSimulator
+from interactions.VoterModel import VectorizedVoterModel, VoterModel
+from personas.Persona import Persona
+from simulation.ContinuousTimeScheduler import (
+    ContinuousTimeScheduler,
+    activation_rates,
+)
+
+
+class MockLLMClient:
+    def generate_response(self, prompt):
+        return "I agree."
+
+
+def test_activations_follow_rates():
+    model = VectorizedVoterModel(nx.complete_graph(3), seed=0)
+    scheduler = ContinuousTimeScheduler(model, rates=[1.0, 3.0, 0.0], seed=0)
+    dispatched = scheduler.run(until_time=2000.0)
+
+    assert scheduler.time == 2000.0
+    assert dispatched == scheduler.activations.sum()
+    assert scheduler.activations[2] == 0
+    assert abs(dispatched / 2000.0 - 4.0) < 0.2
+    assert abs(scheduler.activations[1] / dispatched - 0.75) < 0.02
+
+
+def test_degree_rates_are_normalized():
+    rates = activation_rates("degree", 5, graph=nx.star_graph(4))
+
+    assert rates.mean() == pytest.approx(1.0)
+    assert rates[0] == pytest.approx(4 * rates[1])
+
+
+def test_persona_rates():
+    agents = [
+        SimpleAgent(
+            name=name,
+            agent_id=i,
+            persona=Persona(name=name, age=30, traits=traits, status="student"),
+        )
+        for i, (name, traits) in enumerate(
+            [("Ann", "extrovert, open-minded"), ("Ben", "introvert, flexible")]
+        )
+    ]
+    assert activation_rates("persona", 2, agents=agents).tolist() == [1.5, 0.5]
+
+
+def test_dispatches_agent_level_models():
+    config = GraphEnvironmentConfig(num_agents=6, topology="star")
+    env = GraphEnvironment(config=config)
+    agents = [BaseAgent(agent_id=i) for i in range(6)]
+    for i, agent in enumerate(agents):
+        agent.set_opinion(1 if i == 0 else -1)
+        env.graph.nodes[i]["agent"] = agent
+
+    scheduler = ContinuousTimeScheduler(VoterModel(), environment=env, seed=1)
+    assert scheduler.run(max_events=200) == 200
+
+    assert len({agent.get_opinion() for agent in agents}) == 1
+
+
+def test_dispatches_dialogue_speakers():
+    config = GraphEnvironmentConfig(num_agents=3, topology="star")
+    env = GraphEnvironment(config=config)
+    agents = [
+        SimpleAgent(name=name, agent_id=i, model=MockLLMClient())
+        for i, name in enumerate(["Ann", "Ben", "Cid"])
+    ]
+    for i, agent in enumerate(agents):
+        env.graph.nodes[i]["agent"] = agent
+    simulator = DialogueSimulator(
+        environment=env,
+        selection_function=lambda agents: 0,
+        agents=agents,
+        topic="Testing",
+    )
+
+    scheduler = ContinuousTimeScheduler(
+        simulator, rates=[0.0, 1.0, 1.0], seed=0, batch_size=4
+    )
+    scheduler.run(max_events=10)
+
+    speakers = [name for _, name, _ in simulator.history]
+    assert len(speakers) == 10
+    assert "Ann" not in speakers
+    assert simulator._step == 10
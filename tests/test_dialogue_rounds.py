@@ -0,0 +1,180 @@
+import threading
+import time
+
+import networkx as nx
+import pytest
+
+from agents.SimpleAgent import SimpleAgent
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.DialogueSimulation import DialogueSimulator
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+
+class SlowLLMClient:
+    """Answers after a delay that shrinks with the agent index, tracking overlap."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def generate_response(self, prompt):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        name = prompt.rsplit("\n", 1)[-1].rstrip(": ")
+        time.sleep(0.05 / (1 + int(name[5:])))
+        with self.lock:
+            self.in_flight -= 1
+        return f"{name} speaks"
+
+
+def make_simulator(graph):
+    client = SlowLLMClient()
+    agents = [
+        SimpleAgent(name=f"Agent{i}", agent_id=i, model=client) for i in graph.nodes()
+    ]
+    for i, agent in enumerate(agents):
+        graph.nodes[i]["agent"] = agent
+    simulator = DialogueSimulator(
+        environment=GraphEnvironment.from_graph(graph),
+        selection_function=lambda agents: 0,
+        agents=agents,
+        topic="Testing",
+    )
+    return simulator, client
+
+
+def assert_far_apart(graph, speakers):
+    for i, u in enumerate(speakers):
+        for v in speakers[i + 1 :]:
+            assert nx.shortest_path_length(graph, u, v) >= 3
+
+
+def test_speaker_classes_partition_agents():
+    graph = nx.watts_strogatz_graph(30, 4, 0.3, seed=1)
+    simulator, _ = make_simulator(graph)
+    classes = simulator.speaker_classes()
+
+    assert sorted(node for speakers in classes for node in speakers) == list(range(30))
+    for speakers in classes:
+        assert_far_apart(graph, speakers)
+
+
+def test_round_runs_speakers_concurrently_in_deterministic_order():
+    graph = nx.cycle_graph(12)
+    simulator, client = make_simulator(graph)
+    results = simulator.step_round()
+
+    speakers = simulator.speaker_classes()[0]
+    assert [name for name, _ in results] == [f"Agent{i}" for i in speakers]
+    assert [name for _, name, _ in simulator.history] == [f"Agent{i}" for i in speakers]
+    assert client.max_in_flight > 1
+    assert simulator._step == len(speakers)
+    # Neighbors of a speaker heard exactly that speaker.
+    heard = simulator.agents[speakers[0] + 1].message_history[1:]
+    assert heard == [f"Agent{speakers[0]}: Agent{speakers[0]} speaks"]
+
+
+def test_rounds_cycle_through_classes():
+    graph = nx.path_graph(7)
+    simulator, _ = make_simulator(graph)
+    classes = simulator.speaker_classes()
+    for _ in range(len(classes)):
+        simulator.step_round(max_workers=2)
+
+    spoken = sorted(int(name[5:]) for _, name, _ in simulator.history)
+    assert spoken == list(range(7))
+
+
+def test_random_rounds_sample_independent_speakers():
+    graph = nx.barabasi_albert_graph(40, 2, seed=2)
+    simulator, _ = make_simulator(graph)
+    for _ in range(3):
+        results = simulator.step_round(strategy="random")
+        assert_far_apart(graph, [int(name[5:]) for name, _ in results])
+
+    with pytest.raises(ValueError):
+        simulator.step_round(strategy="unknown")
+
+
+def test_audiences_are_cached_and_identity_based(monkeypatch):
+    graph = nx.star_graph(4)
+    simulator, _ = make_simulator(graph)
+    hub, leaf = simulator.agents[0], simulator.agents[1]
+
+    def no_equality(self, other):
+        raise AssertionError("agents compared by value")
+
+    monkeypatch.setattr(SimpleAgent, "__eq__", no_equality)
+    audience = simulator.audience(leaf)
+    assert len(audience) == 2
+    assert audience[0] is hub and audience[1] is simulator.mediating_agent
+    assert simulator.audience(leaf) is audience
+    assert len(simulator.audience(simulator.mediating_agent)) == 5
+
+    for speaker_idx in range(5):
+        simulator.step(speaker_idx=speaker_idx)
+    assert len(hub.message_history) == 1 + 4
+
+
+def test_equal_agents_resolve_to_their_own_nodes():
+    graph = nx.path_graph(4)
+    twins = [SimpleAgent(name="Twin", agent_id=0) for _ in range(4)]
+    for node, agent in enumerate(twins):
+        graph.nodes[node]["agent"] = agent
+    environment = GraphEnvironment.from_graph(graph)
+
+    assert environment.node_of(twins[3]) == 3
+    assert environment.get_neighbors(twins[3])[0] is twins[2]
+
+
+class PromptRecorder:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_response(self, prompt):
+        self.prompts.append(prompt)
+        if "JSON" in prompt:
+            return '{"Agent1": 0.1, "Agent2": 0.1, "Agent3": 0.1, "Agent4": 0.1}'
+        return "0.1"
+
+
+def test_incremental_analysis_skips_agents_that_heard_nothing():
+    graph = nx.path_graph(6)
+    simulator, _ = make_simulator(graph)
+    recorder = PromptRecorder()
+    simulator.opinion_analyzer = OpinionAnalyzer(
+        recorder, update_frequency=2, incremental=True
+    )
+
+    simulator.step(speaker_idx=0)
+    assert simulator.opinion_analyzer.pending_messages(simulator.agents[1]) == [
+        simulator.history[0]
+    ]
+    assert simulator.opinion_analyzer.pending_messages(simulator.agents[2]) == []
+    simulator.step(speaker_idx=5)
+
+    # Only the neighbors of the two speakers were analyzed, on what they heard.
+    assert len(recorder.prompts) == 2
+    assert "Agent0 speaks" in recorder.prompts[0]
+    assert "Agent5 speaks" not in recorder.prompts[0]
+    assert "Agent5 speaks" in recorder.prompts[1]
+    opinions = [agent.get_opinion() for agent in simulator.agents]
+    assert opinions == [0, 0.1, 0, 0, 0.1, 0]
+    assert simulator.opinion_analyzer.pending_messages(simulator.agents[1]) == []
+
+
+def test_incremental_analysis_groups_agents_with_the_same_messages():
+    graph = nx.star_graph(4)
+    simulator, _ = make_simulator(graph)
+    recorder = PromptRecorder()
+    simulator.opinion_analyzer = OpinionAnalyzer(
+        recorder, update_frequency=1, batch_size=10, incremental=True
+    )
+
+    simulator.step(speaker_idx=0)
+    # The four leaves heard the hub and share one prompt.
+    assert len(recorder.prompts) == 1
+    assert all(f"- Agent{i}" in recorder.prompts[0] for i in range(1, 5))
+    assert [agent.get_opinion() for agent in simulator.agents] == [0] + [0.1] * 4
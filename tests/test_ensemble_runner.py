@@ -0,0 +1,103 @@
+import numpy as np
+
+from configs.configs import InteractionType, SimulationConfig, TopologyType
+from simulation.EnsembleRunner import EnsembleRunner, EnsembleSummary, ReplicaResult
+
+
+class FakeLLMClient:
+    """Deterministic stand-in for an LLM; picklable for worker processes."""
+
+    def generate_response(self, prompt):
+        return "0.1"
+
+
+def voter_config(**overrides):
+    values = dict(
+        num_agents=30,
+        topic="Ensembles",
+        num_rounds=500,
+        topology=TopologyType.SMALL_WORLD,
+        interaction_type=InteractionType.VOTER,
+        seed=11,
+    )
+    values.update(overrides)
+    return SimulationConfig(**values)
+
+
+def test_ensemble_is_reproducible_across_worker_counts():
+    serial = EnsembleRunner(voter_config(), num_replicas=8, max_workers=1).run()
+    parallel = EnsembleRunner(voter_config(), num_replicas=8, max_workers=2).run()
+
+    assert serial.num_replicas == parallel.num_replicas == 8
+    assert np.array_equal(serial.consensus_times(), parallel.consensus_times())
+    assert serial.summary() == parallel.summary()
+
+
+def test_ensemble_streams_results_into_summary():
+    seen = []
+    summary = EnsembleRunner(
+        voter_config(interaction_type=InteractionType.MAJORITY, num_rounds=50),
+        num_replicas=5,
+        max_workers=1,
+    ).run(callback=seen.append)
+
+    assert sorted(result.replica for result in seen) == list(range(5))
+    stats = summary.summary()
+    assert stats["num_replicas"] == 5
+    assert sum(stats["final_opinion_histogram"]) == 5 * 30
+
+
+def test_ensemble_runs_dialogue_replicas_with_fake_client():
+    config = SimulationConfig(
+        num_agents=4,
+        topic="Ensembles",
+        num_rounds=3,
+        topology=TopologyType.STAR,
+        opinion_update_frequency=2,
+        seed=5,
+    )
+    summary = EnsembleRunner(
+        config, num_replicas=2, max_workers=1, llm_client_factory=FakeLLMClient
+    ).run()
+
+    assert summary.num_replicas == 2
+    assert all(result.elapsed_time <= 3 for result in summary.results.values())
+
+
+def test_batched_ensemble_runs_all_replicas_in_one_engine():
+    summary = EnsembleRunner(voter_config(), num_replicas=50, batched=True).run()
+
+    assert summary.num_replicas == 50
+    assert summary.summary()["consensus_fraction"] == 1.0
+    assert sum(summary.summary()["final_opinion_histogram"]) == 50 * 30
+
+
+def test_ensemble_runs_continuous_models():
+    config = voter_config(interaction_type=InteractionType.DEFFUANT, num_rounds=200)
+    for batched in (False, True):
+        summary = EnsembleRunner(
+            config, num_replicas=4, max_workers=1, batched=batched
+        ).run()
+        assert summary.num_replicas == 4
+        assert sum(summary.summary()["final_opinion_histogram"]) == 4 * 30
+
+
+def test_summary_is_independent_of_arrival_order():
+    means = [0.1, 1e16, -1e16, 0.3, 0.7]
+    results = [
+        ReplicaResult(
+            replica=i,
+            elapsed_time=1.0,
+            mean_opinion=mean,
+            opinion_variance=0.0,
+            histogram=[1, 0],
+        )
+        for i, mean in enumerate(means)
+    ]
+    forward, backward = EnsembleSummary(histogram_bins=2), EnsembleSummary(2)
+    for result in results:
+        forward.add(result)
+    for result in reversed(results):
+        backward.add(result)
+
+    assert forward.summary() == backward.summary()
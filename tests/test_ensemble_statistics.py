@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from configs.configs import InteractionType, ModelType, SimulationConfig, TopologyType
+from metrics.EnsembleStatistics import EnsembleStatistics, bootstrap_means
+from metrics.StreamingMetrics import StreamingMetrics
+from simulation.EnsembleRunner import EnsembleRunner
+
+
+def config(topology, model_type=ModelType.GPT3, **overrides):
+    values = dict(num_agents=10, topic="Ensembles", num_rounds=5)
+    values.update(overrides)
+    return SimulationConfig(topology=topology, model_type=model_type, **values)
+
+
+def metric_stream(rng, steps, level):
+    """Snapshots of a run whose opinions drift to ``level``."""
+    metrics = StreamingMetrics(rng.uniform(-1, 1, 20))
+    for step in range(steps):
+        yield metrics.snapshot(step)
+        metrics.update_many(np.arange(20), np.full(20, level) + rng.normal(0, 0.01, 20))
+
+
+def test_bootstrap_is_reproducible_across_worker_counts():
+    rng = np.random.default_rng(0)
+    samples = [rng.normal(1.0, 2.0, 500), np.empty(0), rng.normal(size=3000)]
+
+    serial = bootstrap_means(samples, n_resamples=1000, seed=7, max_workers=1)
+    parallel = bootstrap_means(samples, n_resamples=1000, seed=7, max_workers=2)
+
+    assert [len(means) for means in serial] == [1000, 0, 1000]
+    for a, b in zip(serial, parallel):
+        assert np.array_equal(a, b)
+    # The bootstrap spread of a mean is close to the standard error.
+    assert np.std(serial[0]) == pytest.approx(2.0 / np.sqrt(500), rel=0.15)
+
+
+def test_groups_runs_by_topology_and_model():
+    rng = np.random.default_rng(1)
+    statistics = EnsembleStatistics(n_resamples=500)
+    levels = {TopologyType.STAR: 0.6, TopologyType.SMALL_WORLD: -0.2}
+    for topology, level in levels.items():
+        for _ in range(10):
+            statistics.add_run(config(topology), metric_stream(rng, 6, level))
+    statistics.add_run(
+        config(TopologyType.STAR, ModelType.LLAMA2), metric_stream(rng, 3, 0.0)
+    )
+
+    rows = statistics.summary("mean")
+    assert [(row["topology"], row["model_type"], row["runs"]) for row in rows] == [
+        ("small-world", "gpt-3.5-turbo", 10),
+        ("star", "gpt-3.5-turbo", 10),
+        ("star", "llama2:13b-chat", 1),
+    ]
+    for row, level in zip(rows, [-0.2, 0.6]):
+        assert row["mean"] == pytest.approx(level, abs=0.01)
+        assert row["ci_low"] <= row["mean"] <= row["ci_high"]
+        assert row["q5"] <= row["q50"] <= row["q95"]
+    assert rows[2]["std"] == 0.0
+    assert "histogram" not in statistics.metrics()
+
+    trajectory = statistics.trajectory((TopologyType.STAR, ModelType.GPT3), "positive")
+    assert trajectory["step"].tolist() == list(range(6))
+    assert trajectory["count"].tolist() == [10] * 6
+    assert trajectory["mean"][1:].tolist() == [20.0] * 5
+
+    table = statistics.comparison_table("mean")
+    assert table.splitlines()[0] == "mean"
+    assert "small-world" in table and "ci_high" in table
+
+
+def test_collects_ensemble_runner_results():
+    voter = config(
+        TopologyType.SMALL_WORLD,
+        num_rounds=200,
+        interaction_type=InteractionType.VOTER,
+        seed=3,
+    )
+    statistics = EnsembleStatistics(n_resamples=200)
+    EnsembleRunner(voter, num_replicas=6, max_workers=1).run(
+        callback=statistics.collector(voter)
+    )
+
+    (row,) = statistics.summary("mean_opinion")
+    assert row["runs"] == 6
+    assert statistics.summary("histogram") == []
+    assert "replica" not in statistics.metrics()
+
+
+def test_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        EnsembleStatistics(confidence=1.0)
+    with pytest.raises(ValueError):
+        EnsembleStatistics(n_resamples=0)
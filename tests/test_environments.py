@@ -59,3 +59,23 @@ def test_edge_case_k1_n2():
             num_agents=2, topology="small-world", small_world_k=1, small_world_p=0.5
         )
         env = GraphEnvironment(config=config)
+
+
+def test_csr_graph_matches_networkx():
+    config = GraphEnvironmentConfig(
+        num_agents=30, topology="small-world", small_world_k=4, small_world_p=0.3
+    )
+    env = GraphEnvironment(config=config)
+    csr = env.to_csr()
+
+    assert csr.num_nodes == 30
+    assert csr.num_edges == env.graph.number_of_edges()
+    for node in env.graph.nodes():
+        assert sorted(csr.neighbors(node).tolist()) == sorted(env.graph[node])
+    assert env.to_csr() is csr
+
+    nodes = [3, 0, 3]
+    owners, positions = csr.neighbor_positions(nodes)
+    for k, node in enumerate(nodes):
+        neighbors = csr.indices[positions[owners == k]]
+        assert neighbors.tolist() == csr.neighbors(node).tolist()
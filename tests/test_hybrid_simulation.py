@@ -0,0 +1,90 @@
+import networkx as nx
+import numpy as np
+
+from agents.SimpleAgent import SimpleAgent
+from environments.CSRGraph import CSRGraph
+from interactions.BoundedConfidence import DeffuantModel
+from interactions.VoterModel import ActiveLinkVoterModel, VectorizedVoterModel
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+from simulation.HybridSimulation import HybridSimulation, select_core_nodes
+
+
+class CountingLLMClient:
+    def __init__(self, response="I agree."):
+        self.response = response
+        self.calls = 0
+
+    def generate_response(self, prompt):
+        self.calls += 1
+        return self.response
+
+
+def core_agents(client, opinions):
+    agents = []
+    for i, opinion in enumerate(opinions):
+        agent = SimpleAgent(name=f"Core{i}", agent_id=i, model=client)
+        agent.set_opinion(opinion)
+        agents.append(agent)
+    return agents
+
+
+def test_select_core_nodes():
+    graph = CSRGraph.from_networkx(nx.star_graph(9))
+
+    assert select_core_nodes(graph, 1).tolist() == [0]
+    sample = select_core_nodes(graph, 4, strategy="random", seed=0)
+    assert len(set(sample.tolist())) == 4
+
+
+def test_hybrid_step_couples_dialogue_and_population():
+    graph = CSRGraph.from_networkx(nx.barabasi_albert_graph(2000, 2, seed=0))
+    model = VectorizedVoterModel(graph, seed=0, batch_size=500)
+    core = select_core_nodes(graph, 4)
+    client = CountingLLMClient()
+    agents = core_agents(client, [0.8, -0.6, 0.3, -0.2])
+    hybrid = HybridSimulation.build(model, agents, core, topic="Testing")
+
+    hybrid.run(3)
+
+    # One LLM call per core agent and step; the population never calls it.
+    assert client.calls == 3 * 4
+    assert model.opinions[core].tolist() == [1, -1, 1, -1]
+    assert all(
+        any(line.startswith("Community: Of your") for line in agent.message_history)
+        for agent in agents
+    )
+    # The core dialogue runs on the subgraph induced by the hubs.
+    assert hybrid.simulator.environment.graph.number_of_nodes() == 4
+
+
+def test_population_pulls_core_opinions():
+    graph = CSRGraph.from_networkx(nx.star_graph(20))
+    opinions = np.full(21, 0.5)
+    model = DeffuantModel(graph, opinions=opinions, seed=0, confidence=2.0)
+    client = CountingLLMClient("0.0")
+    agents = core_agents(client, [-0.5])
+    hybrid = HybridSimulation.build(
+        model,
+        agents,
+        [0],
+        opinion_analyzer=OpinionAnalyzer(client, update_frequency=1),
+        neighborhood_weight=1.0,
+    )
+    assert model.opinions[0] == -0.5
+
+    hybrid.step()
+    assert agents[0].get_opinion() == 0.5
+    assert model.opinions[0] == 0.5
+
+
+def test_hybrid_runs_active_link_population():
+    graph = CSRGraph.from_networkx(nx.barabasi_albert_graph(500, 2, seed=1))
+    model = ActiveLinkVoterModel(graph, seed=1)
+    core = select_core_nodes(graph, 2)
+    client = CountingLLMClient()
+    hybrid = HybridSimulation.build(model, core_agents(client, [0.9, -0.9]), core)
+
+    hybrid.run(2)
+
+    assert model.opinions[core].tolist() == [1, -1]
+    assert not model.is_consensus()
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only when a feature needs them (clients, persona names, plots).
+DEFERRED_MODULES = ("faker", "plotly", "openai", "ollama")
+# Generous for slow machines: these imports take about 0.3 s here.
+IMPORT_BUDGET_SECONDS = 1.5
+
+
+def import_times(*args):
+    """
+    Modules imported by ``python -X importtime *args``.
+
+    Returns:
+        ``(name, seconds, top_level)`` per module, with the cumulative time
+        and whether it was imported directly rather than by another module
+    """
+    environment = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=environment,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=False,
+    )
+    assert process.returncode == 0, process.stderr
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            top_level = len(name) - len(name.lstrip()) == 1
+            modules.append((name.strip(), int(cumulative) / 1e6, top_level))
+    return modules
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ("-c", "import simulation.SimulationRunner"),
+        ("-c", "import simulation.EnsembleRunner"),
+        ("run_simulation.py", "--help"),
+    ],
+)
+def test_entry_points_defer_heavy_imports(args):
+    modules = import_times(*args)
+
+    loaded = {name.split(".")[0] for name, _, _ in modules}
+    assert not loaded & set(DEFERRED_MODULES)
+    total = sum(seconds for _, seconds, top_level in modules if top_level)
+    assert total < IMPORT_BUDGET_SECONDS
@@ -89,6 +89,24 @@ def test_voter_model_interaction():
     assert agent1.get_opinion() == -1
 
 
+def test_majority_rule_interaction():
+    """Test MajorityRule interaction with a clear majority and a tie."""
+    from agents.base_agent import BaseAgent
+    from interactions.MajorityRule import MajorityRule
+
+    agent = BaseAgent(agent_id=0)
+    neighbors = [BaseAgent(agent_id=i) for i in range(1, 4)]
+    for neighbor, opinion in zip(neighbors, [1, 1, -1]):
+        neighbor.set_opinion(opinion)
+
+    rule = MajorityRule()
+    rule.interact(agent, neighbors)
+    assert agent.get_opinion() == 1
+
+    rule.interact(agent, neighbors[1:])
+    assert agent.get_opinion() == 0
+
+
 def test_inject(setup_graph_environment):
     """Test injecting messages into the simulation."""
     simulator = setup_graph_environment
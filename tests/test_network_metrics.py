@@ -0,0 +1,117 @@
+import networkx as nx
+import numpy as np
+import pytest
+from scipy import stats
+
+from environments.CSRGraph import CSRGraph
+from environments.GraphEnvironment import GraphEnvironment
+from metrics.NetworkMetrics import (
+    NetworkMetrics,
+    bimodality_coefficient,
+    modularity,
+    network_metrics,
+)
+
+
+def reference_metrics(graph, opinions, communities):
+    """Straightforward per-edge and per-node versions of every metric."""
+    x = np.asarray(opinions)
+    sources, targets = np.array(list(graph.edges())).T
+    ends = np.concatenate([x[sources], x[targets]])
+    other_ends = np.concatenate([x[targets], x[sources]])
+
+    connected = [node for node in graph if graph.degree(node)]
+    neighbor_mean = [np.mean([x[j] for j in graph[node]]) for node in connected]
+
+    camps = np.sign(x)
+    camp_sets = [set(np.flatnonzero(camps == camp)) for camp in (-1, 0, 1)]
+    n = len(x)
+    skewness = stats.skew(x, bias=False)
+    kurtosis = stats.kurtosis(x, bias=False)
+
+    means = {c: x[communities == c].mean() for c in np.unique(communities)}
+    between = sum(
+        np.sum(communities == c) * (m - x.mean()) ** 2 for c, m in means.items()
+    )
+
+    return {
+        "assortativity": np.corrcoef(ends, other_ends)[0, 1],
+        "discordant_fraction": np.mean(camps[sources] * camps[targets] == -1),
+        "echo_chamber": np.corrcoef(x[connected], neighbor_mean)[0, 1],
+        "bimodality": (skewness**2 + 1)
+        / (kurtosis + 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))),
+        "camp_modularity": nx.community.modularity(
+            graph, [camp for camp in camp_sets if camp]
+        ),
+        "community_alignment": between / (n * x.var()),
+    }
+
+
+@pytest.fixture
+def graph():
+    graph = nx.watts_strogatz_graph(200, 6, 0.2, seed=3)
+    graph.add_node(200)  # an isolated node
+    return graph
+
+
+def test_metrics_match_reference(graph):
+    rng = np.random.default_rng(0)
+    opinions = np.round(rng.uniform(-1, 1, 201), 1)
+    communities = GraphEnvironment.from_graph(graph).communities()
+    expected = reference_metrics(graph, opinions, communities)
+
+    metrics = network_metrics(graph, opinions, communities)
+
+    assert metrics == pytest.approx(expected)
+    assert modularity(graph, communities) == pytest.approx(
+        nx.community.modularity(
+            graph, [np.flatnonzero(communities == c) for c in np.unique(communities)]
+        )
+    )
+
+
+def test_segregated_camps_are_polarized():
+    # Two cliques joined by a single edge, each holding one camp.
+    graph = nx.barbell_graph(10, 0)
+    opinions = np.r_[np.full(10, -0.8), np.full(10, 0.8)]
+    metrics = network_metrics(graph, opinions)
+
+    assert metrics["assortativity"] > 0.9
+    assert metrics["echo_chamber"] > 0.9
+    assert metrics["discordant_fraction"] == pytest.approx(1 / 91)
+    assert metrics["camp_modularity"] > 0.45
+    assert (
+        bimodality_coefficient(20, *[np.sum(opinions**k) for k in range(1, 5)]) > 5 / 9
+    )
+
+
+def test_updates_match_recomputation(graph):
+    rng = np.random.default_rng(1)
+    opinions = rng.uniform(-1, 1, 201)
+    communities = rng.integers(0, 5, 201)
+    tracker = NetworkMetrics(CSRGraph.from_networkx(graph), opinions, communities, 0.1)
+
+    for _ in range(300):
+        node = int(rng.integers(201))
+        value = float(rng.uniform(-1, 1)) if rng.random() < 0.8 else 0.0
+        tracker.update(node, value)
+        opinions[node] = value
+
+    expected = network_metrics(graph, opinions, communities, neutral_band=0.1)
+    assert tracker.snapshot() == pytest.approx(expected)
+    assert (
+        tracker.camps.tolist()
+        == NetworkMetrics(graph, opinions, None, 0.1).camps.tolist()
+    )
+
+
+def test_degenerate_inputs():
+    graph = nx.empty_graph(5)
+    metrics = network_metrics(graph, np.zeros(5))
+    assert np.isnan(metrics["assortativity"])
+    assert np.isnan(metrics["echo_chamber"])
+    assert metrics["discordant_fraction"] == 0.0
+    with pytest.raises(ValueError):
+        NetworkMetrics(graph, np.zeros(4))
+    with pytest.raises(ValueError):
+        NetworkMetrics(graph, np.zeros(5)).community_alignment()
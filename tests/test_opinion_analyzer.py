@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from agents.SimpleAgent import SimpleAgent
 from personas.Persona import Persona
 from configs.configs import LLMConfig, ModelType
@@ -158,4 +159,177 @@ class TestOpinionAnalyzer:
         
         # Bob has status-quo traits  
         bob_opinion = analyzer.initialize_opinion_from_persona(sample_agents[1])
-        assert bob_opinion > 0  # Should be positive (status-quo)
\ No newline at end of file
+        assert bob_opinion > 0  # Should be positive (status-quo)
+
+
+class ScriptedLLMClient:
+    """Returns queued responses in order and records every prompt."""
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_response(self, prompt):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+class TestBatchedOpinionAnalysis:
+    """Test suite for batched opinion analysis."""
+
+    @pytest.fixture
+    def agents(self):
+        agents = []
+        for i in range(5):
+            agent = SimpleAgent(name=f"Agent{i}", agent_id=i)
+            agent.set_opinion(0.0)
+            agents.append(agent)
+        return agents
+
+    def test_one_call_per_batch(self, agents):
+        """The conversation is sent once per batch and deltas are keyed by name."""
+        from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+        llm_client = ScriptedLLMClient(
+            'Sure: {"Agent0": 0.1, "Agent1": -0.2, "Agent2": 0.3}',
+            '{"Agent3": "0.4", "Agent4": 5}',
+        )
+        analyzer = OpinionAnalyzer(llm_client, batch_size=3)
+        history = [(1, "Agent0", "A unique remark")]
+
+        analyzer.analyze_opinion_changes(history, agents)
+
+        assert len(llm_client.prompts) == 2
+        assert all(prompt.count("A unique remark") == 1 for prompt in llm_client.prompts)
+        assert "Agent2" in llm_client.prompts[0] and "Agent3" not in llm_client.prompts[0]
+        assert [agent.get_opinion() for agent in agents] == [0.1, -0.2, 0.3, 0.4, 1.0]
+
+    def test_invalid_entries_fall_back_per_agent(self, agents):
+        """Missing, non-numeric and ambiguous entries are asked for one by one."""
+        from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+        agents[4].name = "Agent3"
+        llm_client = ScriptedLLMClient(
+            '{"Agent0": 0.5, "Agent1": "a lot", "Agent3": 0.2}',
+            "-0.1",
+            "-0.3",
+            "-0.4",
+            "-0.5",
+        )
+        analyzer = OpinionAnalyzer(llm_client, batch_size=10)
+
+        analyzer.analyze_opinion_changes([(1, "Agent0", "Hello")], agents)
+
+        assert len(llm_client.prompts) == 5
+        assert [agent.get_opinion() for agent in agents] == [0.5, -0.1, -0.3, -0.4, -0.5]
+
+    def test_unparsable_response_falls_back(self, agents):
+        """Without a JSON object every agent gets its own call."""
+        from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+        llm_client = ScriptedLLMClient("no idea", *["0.1"] * 5)
+        analyzer = OpinionAnalyzer(llm_client, batch_size=5)
+
+        analyzer.analyze_opinion_changes([(1, "Agent0", "Hello")], agents)
+
+        assert len(llm_client.prompts) == 6
+        assert all(agent.get_opinion() == 0.1 for agent in agents)
+        with pytest.raises(ValueError):
+            OpinionAnalyzer(llm_client, batch_size=0)
+
+
+class TestTraitCoefficients:
+    """Test suite for precompiled trait coefficients and vectorized updates."""
+
+    def test_precedence_matches_trait_order(self):
+        from opinion_dynamics.OpinionAnalyzer import trait_coefficients
+
+        assert trait_coefficients("Change-oriented, status-quo") == (-0.7, 1.0)
+        assert trait_coefficients("open-minded, weakly held") == (0.0, 1.5)
+        assert trait_coefficients("closed-minded, strongly held") == (0.0, 0.3)
+        assert trait_coefficients("Open-Minded") == (0.0, 1.2)
+        assert trait_coefficients("curious") == (0.0, 1.0)
+
+    def test_vectorized_update_matches_scalar_resistance(self):
+        from opinion_dynamics.OpinionAnalyzer import (
+            OpinionAnalyzer,
+            apply_opinion_deltas,
+            persona_coefficients,
+        )
+
+        traits = ["strongly held", "weakly held", "closed-minded", "open-minded", ""]
+        agents = []
+        for i, trait in enumerate(traits):
+            persona = Persona(name=f"P{i}", age=30, traits=trait, status="employed")
+            agents.append(SimpleAgent(name=f"P{i}", agent_id=i, persona=persona))
+        agents.append(SimpleAgent(name="NoPersona", agent_id=9))
+        analyzer = OpinionAnalyzer(MockLLMClient())
+
+        deltas = np.array([0.4, -0.8, 0.25, 0.9, -0.3, 0.5])
+        opinions = np.array([0.1, -0.5, 0.9, 0.3, 0.0, -0.2])
+        _, resistance, has_traits = persona_coefficients(agents)
+        expected = []
+        for agent, opinion, delta in zip(agents, opinions, deltas):
+            opinion += analyzer._apply_personality_resistance(agent, delta)
+            expected.append(max(-1.0, min(1.0, opinion)))
+
+        assert apply_opinion_deltas(opinions, deltas, resistance).tolist() == expected
+        assert has_traits.tolist() == [True] * 4 + [False] * 2
+
+    def test_initialize_opinions(self):
+        from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+        traits = ["change-oriented", "status-quo", "curious"] * 100
+        agents = [
+            SimpleAgent(
+                name=f"P{i}",
+                agent_id=i,
+                persona=Persona(name=f"P{i}", age=30, traits=trait, status="employed"),
+            )
+            for i, trait in enumerate(traits)
+        ]
+        agents.append(SimpleAgent(name="NoPersona", agent_id=-2))
+        opinions = OpinionAnalyzer(MockLLMClient()).initialize_opinions(
+            agents, rng=np.random.default_rng(0)
+        )
+
+        assert [agent.get_opinion() for agent in agents] == opinions.tolist()
+        assert np.all((opinions[0:300:3] >= -0.9) & (opinions[0:300:3] <= -0.5))
+        assert np.all((opinions[1:300:3] >= 0.5) & (opinions[1:300:3] <= 0.9))
+        assert np.all(np.abs(opinions[2:300:3]) <= 0.2)
+        assert opinions[-1] == 0.0
+
+    def test_coefficients_are_cached_per_agent(self):
+        from opinion_dynamics.OpinionAnalyzer import (
+            OpinionAnalyzer,
+            persona_coefficients,
+        )
+
+        agents = [
+            SimpleAgent(
+                name=f"P{i}",
+                agent_id=i,
+                persona=Persona(name=f"P{i}", age=30, traits=trait, status="employed"),
+            )
+            for i, trait in enumerate(["strongly held", "open-minded", "curious"])
+        ]
+        analyzer = OpinionAnalyzer(MockLLMClient())
+        for agent in agents:
+            agent.set_opinion(0.5)
+
+        analyzer.analyze_opinion_changes([], agents)
+        subset = [agents[2], agents[0]]
+        expected = persona_coefficients(subset)
+        for cached, direct in zip(analyzer.coefficients(subset), expected):
+            assert cached.tolist() == direct.tolist()
+        assert len(analyzer._population) == 3
+
+        for agent in agents:
+            agent.set_opinion(0.5)
+        analyzer._get_opinion_deltas = lambda agents, history: [0.1, 0.0]
+        analyzer.analyze_opinion_changes([], [agents[0], agents[1]])
+        assert agents[0].get_opinion() == pytest.approx(0.53)
+        assert agents[1].get_opinion() == 0.5
+
+        agents[0].persona.traits = "weakly held"
+        analyzer.invalidate_coefficients()
+        assert analyzer.coefficients([agents[0]])[1].tolist() == [1.5]
@@ -0,0 +1,91 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from agents.SimpleAgent import SimpleAgent
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.DialogueSimulation import DialogueSimulator
+from metrics.OpinionHistory import OpinionHistory
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+
+def fill(history, num_steps=50, num_agents=30, seed=0):
+    rng = np.random.default_rng(seed)
+    trajectories = rng.uniform(-1, 1, size=(num_steps, num_agents)).astype(np.float32)
+    for step in range(num_steps):
+        history.record(step, trajectories[step])
+    return trajectories
+
+
+def test_queries_span_spilled_chunks_and_buffer(tmp_path):
+    history = OpinionHistory(str(tmp_path / "history"), chunk_size=64)
+    trajectories = fill(history)
+
+    assert len(history) == 50 * 30
+    assert len(history.chunks) == 50 * 30 // 64
+    steps, opinions = history.agent_trajectory(7)
+    assert steps.tolist() == list(range(50))
+    assert np.array_equal(opinions, trajectories[:, 7])
+
+    steps, agents, opinions = history.step_range(10, 12)
+    assert steps.tolist() == [10] * 30 + [11] * 30 + [12] * 30
+    assert agents.tolist() == list(range(30)) * 3
+    assert np.array_equal(opinions, trajectories[10:13].ravel())
+
+    aggregates = history.step_aggregates()
+    assert aggregates["step"].tolist() == list(range(50))
+    assert np.all(aggregates["count"] == 30)
+    np.testing.assert_allclose(aggregates["mean"], trajectories.mean(axis=1), atol=1e-6)
+    np.testing.assert_allclose(aggregates["std"], trajectories.std(axis=1), atol=1e-6)
+    assert np.array_equal(aggregates["min"], trajectories.min(axis=1))
+    assert np.array_equal(aggregates["max"], trajectories.max(axis=1))
+    assert history.step_aggregates(48, 60)["step"].tolist() == [48, 49]
+
+
+def test_reopen_and_extend(tmp_path):
+    directory = str(tmp_path / "history")
+    history = OpinionHistory(directory, chunk_size=100)
+    trajectories = fill(history, num_steps=10, num_agents=15)
+    history.close()
+
+    reopened = OpinionHistory.open(directory)
+    assert len(reopened) == 150
+    with pytest.raises(ValueError):
+        reopened.record(3, [0.0])
+    reopened.record(10, [0.5, -0.5], agents=[3, 4])
+    steps, opinions = reopened.agent_trajectory(3)
+    assert steps.tolist() == list(range(11))
+    assert opinions.tolist() == trajectories[:, 3].tolist() + [0.5]
+    with pytest.raises(FileExistsError):
+        OpinionHistory(directory)
+
+
+class ConstantLLMClient:
+    def generate_response(self, prompt):
+        return "0.1"
+
+
+def test_listener_records_opinion_changes():
+    graph = nx.path_graph(4)
+    agents = []
+    for i in graph.nodes():
+        agents.append(
+            SimpleAgent(name=f"Agent{i}", agent_id=i, model=ConstantLLMClient())
+        )
+        graph.nodes[i]["agent"] = agents[-1]
+    simulator = DialogueSimulator(
+        environment=GraphEnvironment.from_graph(graph),
+        selection_function=lambda agents: 0,
+        agents=agents,
+        opinion_analyzer=OpinionAnalyzer(ConstantLLMClient(), update_frequency=2),
+    )
+    history = OpinionHistory(chunk_size=8)
+    simulator.add_listener(history.listener())
+    for _ in range(6):
+        simulator.step()
+
+    # A full snapshot after step 1, then one record per agent and update.
+    assert len(history) == 4 + 3 * 4
+    steps, opinions = history.agent_trajectory(2)
+    assert steps.tolist() == [1, 2, 4, 6]
+    np.testing.assert_allclose(opinions, [0.0, 0.1, 0.2, 0.3], atol=1e-6)
@@ -0,0 +1,187 @@
+import functools
+import time
+import uuid
+
+import pytest
+
+from configs.configs import InteractionType, SimulationConfig, TopologyType
+from simulation.ParameterSweep import (
+    ParameterSweep,
+    SweepStore,
+    expand_grid,
+    point_key,
+    uses_llm,
+)
+
+
+class FakeLLMClient:
+    """Deterministic stand-in for an LLM; picklable for worker processes."""
+
+    def generate_response(self, prompt):
+        return "0.1"
+
+
+def voter_config(**overrides):
+    values = dict(
+        num_agents=20,
+        topic="Sweeps",
+        num_rounds=100,
+        topology=TopologyType.SMALL_WORLD,
+        interaction_type=InteractionType.VOTER,
+        seed=7,
+    )
+    values.update(overrides)
+    return SimulationConfig(**values)
+
+
+GRID = {
+    "num_agents": [10, 20],
+    "topology": [TopologyType.STAR, TopologyType.SMALL_WORLD],
+    "small_world_p": [0.1, 0.5],
+}
+
+
+def test_expand_grid_covers_every_combination():
+    configs = expand_grid(voter_config(), GRID)
+
+    assert len(configs) == 8
+    assert {(c.num_agents, c.topology, c.small_world_p) for c in configs} == {
+        (n, t, p)
+        for n in GRID["num_agents"]
+        for t in GRID["topology"]
+        for p in GRID["small_world_p"]
+    }
+    assert all(c.topic == "Sweeps" for c in configs)
+    assert len({point_key(c) for c in configs}) == 8
+    assert point_key(configs[0]) != point_key(configs[0], replicas=2)
+    with pytest.raises(ValueError):
+        expand_grid(voter_config(), {"num_nodes": [1]})
+
+
+def test_sweep_skips_stored_points(tmp_path):
+    path = str(tmp_path / "sweep.sqlite")
+    store = SweepStore(path)
+    first = ParameterSweep(voter_config(), GRID, store, replicas=2, max_workers=2)
+    counts = first.run()
+
+    assert counts == {"points": 8, "skipped": 0, "completed": 8, "failed": 0}
+    assert len(store) == 8
+    result = store.get(point_key(first.configs[0], replicas=2))
+    assert result["num_replicas"] == 2
+    store.close()
+
+    reopened = SweepStore(path)
+    grown = dict(GRID, num_agents=[10, 20, 30])
+    counts = ParameterSweep(voter_config(), grown, reopened, replicas=2).run()
+    assert counts == {"points": 12, "skipped": 8, "completed": 4, "failed": 0}
+    assert {c.num_agents for c, _ in reopened.rows()} == {10, 20, 30}
+
+
+def test_sweep_matches_inline_results(tmp_path):
+    inline = SweepStore(str(tmp_path / "inline.sqlite"))
+    pooled = SweepStore(str(tmp_path / "pooled.sqlite"))
+    ParameterSweep(voter_config(), GRID, inline, max_workers=1).run()
+    ParameterSweep(voter_config(), GRID, pooled, max_workers=3).run()
+
+    for config in expand_grid(voter_config(), GRID):
+        assert inline.get(point_key(config)) == pooled.get(point_key(config))
+
+
+class FailingLLMClient:
+    def generate_response(self, prompt):
+        raise RuntimeError("service unavailable")
+
+
+def test_sweep_runs_llm_points_and_retries_failures(tmp_path):
+    store = SweepStore(str(tmp_path / "sweep.sqlite"))
+    dialogue = voter_config(
+        num_agents=4,
+        num_rounds=2,
+        topology=TopologyType.STAR,
+        interaction_type=InteractionType.DIALOGUE,
+        opinion_update_frequency=2,
+    )
+    grid = {"temperature": [0.3, 0.7]}
+
+    failing = ParameterSweep(
+        dialogue, grid, store, max_workers=2, llm_client_factory=FailingLLMClient
+    )
+    assert all(uses_llm(config) for config in failing.configs)
+    assert failing.run() == {"points": 2, "skipped": 0, "completed": 0, "failed": 2}
+    assert all("service unavailable" in error for error in failing.failures.values())
+    assert len(store) == 0
+
+    counts = ParameterSweep(
+        dialogue,
+        grid,
+        store,
+        max_workers=2,
+        llm_concurrency=1,
+        llm_client_factory=FakeLLMClient,
+    ).run()
+    assert counts == {"points": 2, "skipped": 0, "completed": 2, "failed": 0}
+    assert len(store) == 2
+    with pytest.raises(ValueError):
+        ParameterSweep(dialogue, grid, store, llm_concurrency=0)
+
+
+class LoggingLLMClient:
+    """Logs when it is created and used, to measure concurrent points."""
+
+    def __init__(self, path):
+        self.path = path
+        self.token = uuid.uuid4().hex
+        self._log()
+
+    def _log(self):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(f"{self.token} {time.time()}\n")
+
+    def generate_response(self, prompt):
+        time.sleep(0.01)
+        self._log()
+        return "0.1"
+
+
+def peak_concurrency(path):
+    spans = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            token, stamp = line.split()
+            start, end = spans.get(token, (float(stamp), float(stamp)))
+            spans[token] = (min(start, float(stamp)), max(end, float(stamp)))
+    events = sorted(
+        [(start, 1) for start, _ in spans.values()]
+        + [(end, -1) for _, end in spans.values()]
+    )
+    running = peak = 0
+    for _, change in events:
+        running += change
+        peak = max(peak, running)
+    return peak
+
+
+def test_sweep_caps_concurrent_llm_points(tmp_path):
+    log = str(tmp_path / "clients.log")
+    dialogue = voter_config(
+        num_agents=4,
+        num_rounds=3,
+        topology=TopologyType.STAR,
+        interaction_type=InteractionType.DIALOGUE,
+        opinion_update_frequency=2,
+    )
+    store = SweepStore(str(tmp_path / "sweep.sqlite"))
+    sweep = ParameterSweep(
+        dialogue,
+        {"temperature": [0.1, 0.3, 0.5, 0.7]},
+        store,
+        max_workers=4,
+        llm_concurrency=2,
+        llm_client_factory=functools.partial(LoggingLLMClient, log),
+    )
+
+    try:
+        assert sweep.run()["completed"] == 4
+    finally:
+        store.close()
+    assert 1 <= peak_concurrency(log) <= 2
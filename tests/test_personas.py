@@ -1,7 +1,15 @@
+import pathlib
+import pickle
+
+import numpy as np
 import pytest
 
+from agents.SimpleAgent import SimpleAgent
 from personas.generate_personas import generate_persona
 from personas.Persona import Persona
+from personas.PersonaPool import PersonaPool
+from personas.PersonaTable import PersonaTable
+from simulation.AgentManager import AgentManager
 
 
 @pytest.fixture
@@ -41,3 +49,101 @@ def test_generate_persona(template):
     for trait in generated_traits:
         # Check that each trait belongs to one of the trait categories in the template
         assert any(trait in trait_list for trait_list in template["traits"].values())
+
+
+def test_persona_table_matches_template(template):
+    table = PersonaTable.generate(5000, template, seed=1, name_pool_size=50)
+
+    assert len(table) == 5000
+    assert len(set(table.names)) <= 50
+    assert table.ages.min() >= 18 and table.ages.max() <= 80
+    # Every value of every category gets drawn, with roughly equal frequency.
+    for column, values in enumerate(template["traits"].values()):
+        counts = np.bincount(table.trait_codes[:, column], minlength=len(values))
+        assert counts.min() > 0.8 * 5000 / len(values)
+
+    persona = table.persona(3)
+    assert isinstance(persona, Persona)
+    assert persona.traits == table.traits(3)
+    assert persona.status in template["status"]
+    for trait, values in zip(persona.traits.split(", "), template["traits"].values()):
+        assert trait in values
+
+    strings, inverse = table.trait_strings()
+    assert all(strings[inverse[i]] == table.traits(i) for i in range(100))
+
+
+def test_persona_table_is_reproducible_and_sliced_without_copies():
+    first = PersonaTable.generate(100, seed=7)
+    second = PersonaTable.generate(100, seed=7)
+    assert [first.persona(i) for i in range(100)] == second.personas()
+
+    rows = first[10:20]
+    assert len(rows) == 10
+    assert np.shares_memory(rows.trait_codes, first.trait_codes)
+    assert rows.persona(0) == first.persona(10)
+    with pytest.raises(TypeError):
+        _ = first[3]
+
+
+def test_persona_table_validation():
+    table = PersonaTable.generate(10, seed=2)
+    table.ages[0] = 17
+    with pytest.raises(ValueError):
+        table.validate()
+
+    table = PersonaTable.generate(10, seed=2)
+    table.trait_codes[0, 0] = 9
+    with pytest.raises(ValueError):
+        table.validate()
+
+
+def test_agent_manager_uses_persona_table():
+    table = PersonaTable.generate(8, seed=3)
+    agents = AgentManager(num_agents=5, agent_class=SimpleAgent, personas=table).agents
+
+    assert [agent.agent_id for agent in agents] == list(range(5))
+    assert [agent.persona for agent in agents] == table[:5].personas()
+    assert agents[2].name == table.name(2)
+    with pytest.raises(ValueError):
+        AgentManager(num_agents=9, agent_class=SimpleAgent, personas=table)
+
+
+def test_persona_pool_round_trip(tmp_path):
+    table = PersonaTable.generate(1000, seed=4, name_pool_size=20)
+    descriptions = [f"Persona number {i} 😀" if i % 3 else "" for i in range(1000)]
+    path = str(tmp_path / "personas.pool")
+
+    with PersonaPool.write(path, table, descriptions) as pool:
+        assert len(pool) == 1000
+        assert pool.table.personas() == table.personas()
+        assert pool.table.description(1) == "Persona number 1 😀"
+        assert pool.table.description(3) is None
+
+        rows = pool[500:510]
+        assert np.shares_memory(rows.trait_codes, pool.table.trait_codes)
+        assert not rows.trait_codes.flags.writeable
+        assert rows.description(2) == "Persona number 502 😀"
+
+        agents = AgentManager(num_agents=10, agent_class=SimpleAgent, personas=rows)
+        assert [agent.persona for agent in agents.agents] == table[500:510].personas()
+        assert agents.agents[2].agent_description == "Persona number 502 😀"
+        assert agents.agents[1].agent_description is None
+
+        copy = pickle.loads(pickle.dumps(pool))
+        assert copy.path == path and copy.table.persona(7) == table.persona(7)
+        copy.close()
+
+
+def test_persona_pool_rejects_other_files(tmp_path):
+    path = tmp_path / "other.pool"
+    path.write_bytes(b"not a persona pool at all")
+    with pytest.raises(ValueError):
+        PersonaPool.open(str(path))
+
+    pool_path = str(tmp_path / "personas.pool")
+    PersonaPool.write(pool_path, PersonaTable.generate(50, seed=5)).close()
+    data = pathlib.Path(pool_path).read_bytes()
+    path.write_bytes(data[:-10])
+    with pytest.raises(ValueError):
+        PersonaPool.open(str(path))
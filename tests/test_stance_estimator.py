@@ -0,0 +1,85 @@
+import pytest
+
+from agents.SimpleAgent import SimpleAgent
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+from opinion_dynamics.StanceEstimator import StanceEstimator
+
+
+class LabellingLLMClient:
+    """Labels a window +0.2 if it mentions keeping things, else -0.2."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_response(self, prompt):
+        self.calls += 1
+        return "0.2" if "keep" in prompt else "-0.2"
+
+
+KEEP = [(1, "Ann", "We should keep things as they are.")]
+CHANGE = [(1, "Ann", "We must reform the whole system.")]
+
+
+def make_agents(count):
+    agents = []
+    for i in range(count):
+        agent = SimpleAgent(name=f"Agent{i}", agent_id=i)
+        agent.set_opinion(0.0)
+        agents.append(agent)
+    return agents
+
+
+def test_untrained_estimator_escalates_everything():
+    estimator = StanceEstimator(audit_rate=0.0)
+    delta, confidence = estimator.predict("We should keep the old ways")
+    assert delta > 0
+    assert confidence == 0.0
+    assert estimator.screen(make_agents(3), KEEP) == [None, None, None]
+    assert estimator.stats()["escalation_rate"] == 1.0
+
+
+def test_labels_train_the_estimator():
+    estimator = StanceEstimator(refit_every=10, audit_rate=0.0)
+    agents = make_agents(5)
+    for _ in range(4):
+        estimator.learn(agents, KEEP, [0.2] * 5)
+        estimator.learn(agents, CHANGE, [-0.2] * 5)
+
+    text = StanceEstimator.window_text(KEEP)
+    delta, confidence = estimator.predict(text)
+    assert delta == pytest.approx(0.2, abs=0.02)
+    assert confidence > 0.9
+    assert estimator.predict(StanceEstimator.window_text(CHANGE))[0] < 0
+    assert estimator.predict("Something entirely different")[1] < 0.5
+
+
+def test_analyzer_escalates_only_uncertain_agents(tmp_path):
+    client = LabellingLLMClient()
+    estimator = StanceEstimator(refit_every=10, audit_rate=0.0)
+    analyzer = OpinionAnalyzer(client, stance_estimator=estimator)
+    agents = make_agents(10)
+
+    analyzer.analyze_opinion_changes(KEEP, agents)
+    assert client.calls == 10
+    assert all(agent.get_opinion() == 0.2 for agent in agents)
+
+    analyzer.analyze_opinion_changes(KEEP, agents)
+    assert client.calls == 10
+    assert all(agent.get_opinion() == pytest.approx(0.4, abs=0.02) for agent in agents)
+
+    stats = estimator.stats()
+    assert stats["escalations"] == 10 and stats["estimates"] == 20
+    assert stats["labels"] == 10
+
+    path = str(tmp_path / "labels.json")
+    estimator.save(path)
+    restored = StanceEstimator.load(path, audit_rate=1.0)
+    assert restored.screen(agents[:2], KEEP) == [None, None]
+    assert restored.stats()["audits"] == 2
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        StanceEstimator(threshold=1.5)
+    with pytest.raises(ValueError):
+        StanceEstimator(audit_rate=-0.1)
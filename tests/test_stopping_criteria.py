@@ -0,0 +1,156 @@
+import random
+
+import networkx as nx
+import pytest
+
+from agents.SimpleAgent import SimpleAgent
+from configs.configs import ModelType, SimulationConfig, TopologyType
+from environments.GraphEnvironment import GraphEnvironment
+from interactions.DialogueSimulation import DialogueSimulator
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+from simulation.SimulationRunner import SimulationRunner
+from simulation.StoppingCriteria import (
+    MessageStagnation,
+    OpinionStability,
+    OpinionVariance,
+    first_stop_reason,
+    shingles,
+)
+
+
+class EchoLLMClient:
+    """Repeats one reply, optionally numbered to make every reply distinct."""
+
+    def __init__(self, reply="0.0", numbered=False):
+        self.reply = reply
+        self.numbered = numbered
+        self.calls = 0
+
+    def generate_response(self, prompt):
+        self.calls += 1
+        if self.numbered:
+            return f"{self.reply} {self.calls} " + " ".join(
+                f"word{self.calls}_{i}" for i in range(5)
+            )
+        return self.reply
+
+
+def make_simulator(client, opinions, update_frequency=2):
+    graph = nx.cycle_graph(len(opinions))
+    agents = []
+    for i, opinion in enumerate(opinions):
+        agent = SimpleAgent(name=f"Agent{i}", agent_id=i, model=client)
+        agent.set_opinion(opinion)
+        graph.nodes[i]["agent"] = agent
+        agents.append(agent)
+    return DialogueSimulator(
+        environment=GraphEnvironment.from_graph(graph),
+        selection_function=lambda agents: random.randrange(len(agents) - 1),
+        agents=agents,
+        topic="Testing",
+        opinion_analyzer=OpinionAnalyzer(client, update_frequency=update_frequency),
+    )
+
+
+def test_opinion_variance():
+    simulator = make_simulator(EchoLLMClient(), [0.5, 0.52, 0.48])
+    assert OpinionVariance(min_steps=1).check(simulator) is None
+    assert "variance" in OpinionVariance(min_steps=0).check(simulator)
+    # The default warm-up keeps a near-consensus start from ending the run.
+    assert OpinionVariance().check(simulator) is None
+    simulator._step = 10
+    assert "variance" in OpinionVariance().check(simulator)
+    simulator.agents[0].set_opinion(-1.0)
+    assert OpinionVariance().check(simulator) is None
+
+
+def test_opinion_variance_reads_opinions_once_per_window():
+    simulator = make_simulator(EchoLLMClient(), [0.5, -0.5, 0.1])
+    criterion = OpinionVariance(min_steps=0)
+    simulator._step = 4
+    assert criterion.check(simulator) is None
+
+    for agent in simulator.agents:
+        agent.set_opinion(0.2)
+    simulator._step = 5
+    assert criterion.check(simulator) is None
+    simulator._step = 6
+    assert "variance" in criterion.check(simulator)
+    criterion.reset()
+    simulator._step = 7
+    assert "variance" in criterion.check(simulator)
+
+
+def test_opinion_stability_counts_analyzer_windows():
+    simulator = make_simulator(EchoLLMClient("0.0"), [0.5, -0.5, 0.1])
+    criterion = OpinionStability(windows=2)
+    reasons = []
+    for _ in range(6):
+        simulator.step()
+        reasons.append(criterion.check(simulator))
+
+    # Step 1 takes the first snapshot, steps 2 and 4 start new windows.
+    assert reasons[:3] == [None] * 3
+    assert reasons[3] == "no opinion change for 2 analyzer windows"
+    assert reasons[4] is None
+
+
+def test_opinion_stability_resets_on_change():
+    client = EchoLLMClient("0.0")
+    simulator = make_simulator(client, [0.5, -0.5, 0.1])
+    criterion = OpinionStability(windows=1)
+    simulator.step()
+    criterion.check(simulator)
+    client.reply = "0.1"
+    simulator.step()
+    assert criterion.check(simulator) is None
+
+
+def test_message_stagnation():
+    repetitive = make_simulator(
+        EchoLLMClient("We should keep things as they are"), [0.0] * 4
+    )
+    criterion = MessageStagnation(window=3, threshold=0.9)
+    reasons = []
+    for _ in range(6):
+        repetitive.step()
+        reasons.append(criterion.check(repetitive))
+    assert reasons[:5] == [None] * 5
+    assert "similarity 1.00" in reasons[5]
+
+    lively = make_simulator(EchoLLMClient("Point", numbered=True), [0.0] * 4)
+    criterion = MessageStagnation(window=3, threshold=0.5)
+    for _ in range(10):
+        lively.step()
+        assert criterion.check(lively) is None
+
+    assert shingles("A b, a B!") == {("a", "b"), ("b", "a")}
+    with pytest.raises(ValueError):
+        MessageStagnation(threshold=2.0)
+
+
+def test_first_stop_reason_and_runner_stops_early():
+    simulator = make_simulator(EchoLLMClient(), [0.0, 0.5])
+    assert first_stop_reason([OpinionVariance(threshold=0.0)], simulator) is None
+
+    config = SimulationConfig(
+        num_agents=4,
+        topic="Testing",
+        num_rounds=50,
+        topology=TopologyType.SMALL_WORLD,
+        model_type=ModelType.LLAMA2,
+        small_world_k=2,
+        opinion_update_frequency=2,
+    )
+    runner = SimulationRunner(
+        config=config,
+        interaction_model=DialogueSimulator,
+        llm_client=EchoLLMClient("0.0"),
+    )
+    reason = runner.run_simulation(
+        stopping_criteria=[OpinionStability(windows=2), MessageStagnation()]
+    )
+
+    assert reason is not None
+    assert runner.rounds_completed < config.num_rounds
+    assert len(runner.interaction_model.history) == runner.rounds_completed
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from agents.SimpleAgent import SimpleAgent
+from metrics.Metrics import Metrics
+from metrics.StreamingMetrics import StreamingMetrics
+from opinion_dynamics.OpinionAnalyzer import OpinionAnalyzer
+
+
+def reference(opinions, bins=20, neutral_band=0.0, extreme=0.8):
+    return StreamingMetrics(opinions, bins, neutral_band, extreme).snapshot()
+
+
+def assert_same(snapshot, expected):
+    for key, value in expected.items():
+        if key == "step":
+            continue
+        if key == "histogram":
+            assert snapshot[key].tolist() == value.tolist()
+        elif isinstance(value, float):
+            assert snapshot[key] == pytest.approx(value, abs=1e-9)
+        else:
+            assert snapshot[key] == value, key
+
+
+def test_updates_match_recomputation():
+    rng = np.random.default_rng(0)
+    opinions = rng.uniform(-1, 1, 200)
+    opinions[:10] = [-1, 0, 1, 0.8, -0.8, 0.05, -0.05, 0.0, 1, -1]
+    metrics = StreamingMetrics(opinions, neutral_band=0.05)
+
+    for _ in range(500):
+        index = int(rng.integers(200))
+        value = float(rng.choice([-1.0, 0.0, 1.0, rng.uniform(-1, 1)]))
+        metrics.update(index, value)
+        opinions[index] = value
+    assert_same(metrics.snapshot(), reference(opinions, neutral_band=0.05))
+
+    indices = rng.choice(200, size=50, replace=False)
+    values = rng.uniform(-1, 1, 50)
+    metrics.update_many(indices, values)
+    opinions[indices] = values
+    snapshot = metrics.snapshot(step=7)
+    assert snapshot["step"] == 7
+    assert snapshot["mean"] == pytest.approx(opinions.mean())
+    assert snapshot["variance"] == pytest.approx(opinions.var())
+    assert_same(snapshot, reference(opinions, neutral_band=0.05))
+
+
+class ConstantLLMClient:
+    def generate_response(self, prompt):
+        return "0.5"
+
+
+def test_follows_analyzer_updates():
+    agents = [SimpleAgent(name=f"Agent{i}", agent_id=i) for i in range(4)]
+    for agent, opinion in zip(agents, [-1.0, -0.4, 0.0, 0.6]):
+        agent.set_opinion(opinion)
+    metrics = StreamingMetrics.from_agents(agents, bins=4)
+    analyzer = OpinionAnalyzer(ConstantLLMClient())
+    analyzer.add_listener(metrics.on_opinions_changed)
+
+    analyzer.analyze_opinion_changes([(1, "Agent0", "Hi")], agents[1:3])
+
+    opinions = [agent.get_opinion() for agent in agents]
+    assert opinions == pytest.approx([-1.0, 0.1, 0.5, 0.6])
+    assert_same(metrics.snapshot(), reference(opinions, bins=4))
+    assert metrics.snapshot()["histogram"].tolist() == [1, 0, 1, 2]
+
+
+def test_distribution_counts_continuous_opinions():
+    agents = [SimpleAgent(name=f"Agent{i}", agent_id=i) for i in range(5)]
+    for agent, opinion in zip(agents, [-1, -0.3, 0, 0.02, 0.7]):
+        agent.set_opinion(opinion)
+
+    assert Metrics.compute_opinion_distribution(agents) == {
+        "positive": 2,
+        "neutral": 1,
+        "negative": 2,
+    }
+    assert Metrics.compute_opinion_distribution(agents, neutral_band=0.05) == {
+        "positive": 1,
+        "neutral": 2,
+        "negative": 2,
+    }